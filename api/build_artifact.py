@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Build the read-only snapshot artifact bundled with serverless deployments.
+
+Reads the latest snapshot of every season (and the all-time leaderboards, if
+the ETL has built them) out of the SQLite database once, at build time, and
+writes a single compact JSON file that coldstart.py parses on first request.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+from datetime import datetime
+
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "snapshot_artifact.json")
+
+PLAYER_COLUMNS = """
+    r.huss_rank as rank, p.player_id, p.full_name as player_name,
+    t.abbr as team, p.primary_pos as position, r.huss_score,
+    s.per, r.per_rank, s.ws, r.ws_rank, s.ws48, r.ws48_rank,
+    s.bpm, r.bpm_rank, s.vorp, r.vorp_rank,
+    s.g as games, s.mp as minutes, r.qualified
+"""
+
+def _tables(conn):
+    names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'view')")}
+    # delta-stored snapshots must be read through the ETL's resolved views
+    stats = "resolved_snapshot_stats" if "resolved_snapshot_stats" in names else "player_snapshot_stats"
+    ranks = "resolved_snapshot_ranks" if "resolved_snapshot_ranks" in names else "player_snapshot_ranks"
+    return names, stats, ranks
+
+def build(db_path: str) -> dict:
+    with sqlite3.connect(db_path) as conn:
+        conn.row_factory = sqlite3.Row
+        names, stats_table, ranks_table = _tables(conn)
+
+        seasons = {}
+        for (season_id,) in conn.execute("SELECT DISTINCT season_id FROM snapshots ORDER BY season_id").fetchall():
+            snapshot = conn.execute("""
+                SELECT snapshot_id, snapshot_date FROM snapshots
+                WHERE season_id = ?
+                ORDER BY snapshot_date DESC, snapshot_id DESC
+                LIMIT 1
+            """, (season_id,)).fetchone()
+            players = [dict(row) for row in conn.execute(f"""
+                SELECT {PLAYER_COLUMNS}
+                FROM {ranks_table} r
+                JOIN players p ON r.player_id = p.player_id
+                JOIN {stats_table} s ON r.snapshot_id = s.snapshot_id AND r.player_id = s.player_id
+                LEFT JOIN teams t ON s.team_id = t.team_id
+                WHERE r.snapshot_id = ?
+                ORDER BY r.huss_rank
+            """, (snapshot["snapshot_id"],))]
+            for player in players:
+                player["qualified"] = bool(player["qualified"])
+            seasons[str(season_id)] = {
+                "snapshot_id": snapshot["snapshot_id"],
+                "last_updated": snapshot["snapshot_date"],
+                "players": players,
+            }
+
+        leaderboards = None
+        if "leaderboard_rows" in names:
+            leaderboards = {"best_single_seasons": [], "most_number_ones": [], "most_top_tens": []}
+            for row in conn.execute("SELECT * FROM leaderboard_rows ORDER BY board, position"):
+                if row["board"] == "best_single_seasons":
+                    leaderboards[row["board"]].append({
+                        "player_id": row["player_id"], "player_name": row["player_name"],
+                        "season": row["season_id"], "huss_score": row["value"],
+                    })
+                elif row["board"] in leaderboards:
+                    leaderboards[row["board"]].append({
+                        "player_id": row["player_id"], "player_name": row["player_name"],
+                        "count": int(row["value"]),
+                    })
+
+    body = {"seasons": seasons, "leaderboards": leaderboards}
+    digest = hashlib.sha256(json.dumps(body, sort_keys=True).encode()).hexdigest()[:16]
+    return {"version": digest, "built_at": datetime.now().isoformat(timespec="seconds"), **body}
+
+def main(argv):
+    db_path = argv[1] if len(argv) > 1 else os.getenv(
+        "DATABASE_PATH", "./husseyquation.sqlite" if os.path.exists("./husseyquation.sqlite") else "../db/husseyquation.sqlite"
+    )
+    output = argv[2] if len(argv) > 2 else DEFAULT_OUTPUT
+
+    artifact = build(db_path)
+    tmp = output + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(artifact, f, separators=(",", ":"), ensure_ascii=False)
+    os.replace(tmp, output)
+
+    counts = ", ".join(f"{s}: {len(v['players'])}" for s, v in artifact["seasons"].items())
+    print(f"Wrote {output} (version {artifact['version']}; {counts})")
+
+if __name__ == "__main__":
+    main(sys.argv)
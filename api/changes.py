@@ -0,0 +1,148 @@
+"""
+Snapshot change feed: tells this worker when the ETL has published.
+
+PostgreSQL: the ETL sends NOTIFY huss_snapshots with the event as JSON
+(etl/publish.py); PostgresWatcher holds a LISTEN connection and hands each
+notification over as it arrives.
+
+SQLite: SQLiteWatcher keeps one read-only connection and checks
+PRAGMA data_version every POLL_SEC. The value only moves when another
+connection commits, so an idle database costs one pragma per tick; on a
+move it reads the publish_log rows it hasn't seen yet.
+
+Both run on a daemon thread and call on_change(event) there, with
+event = {"season", "snapshot_id", "snapshot_date"}.
+"""
+import json
+import os
+import select
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from migrate import sqlite_readonly
+
+CHANNEL = "huss_snapshots"
+POLL_SEC = float(os.getenv("CHANGE_POLL_SEC", "0.5"))
+RECONNECT_SEC = 5.0
+
+OnChange = Callable[[Dict[str, Any]], None]
+
+class _Watcher:
+    def __init__(self, on_change: OnChange):
+        self.on_change = on_change
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name=type(self).__name__, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+
+    def _emit(self, event: Dict[str, Any]) -> None:
+        try:
+            self.on_change(event)
+        except Exception as e:
+            print(f"Snapshot change handler failed for {event}: {e}")
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self._watch()
+            except Exception as e:
+                print(f"{type(self).__name__} lost its connection ({e}); retrying in {RECONNECT_SEC:.0f}s")
+                self._stop.wait(RECONNECT_SEC)
+
+    def _watch(self) -> None:
+        raise NotImplementedError
+
+class SQLiteWatcher(_Watcher):
+    def __init__(self, db_path: str, on_change: OnChange, interval: float = POLL_SEC):
+        super().__init__(on_change)
+        self.db_path = db_path
+        self.interval = interval
+        # newest publish_log row handled; kept across reconnects so publishes
+        # made while the connection was down are still announced
+        self.last_id: Optional[int] = None
+
+    def _last_id(self, conn: sqlite3.Connection) -> int:
+        try:
+            return conn.execute("SELECT COALESCE(MAX(publish_id), 0) FROM publish_log").fetchone()[0]
+        except sqlite3.OperationalError:
+            # ETL hasn't created publish_log in this database yet
+            return 0
+
+    def _emit_new(self, conn: sqlite3.Connection) -> None:
+        try:
+            rows = conn.execute("""
+                SELECT publish_id, season_id, snapshot_id, snapshot_date
+                FROM publish_log WHERE publish_id > ? ORDER BY publish_id
+            """, (self.last_id,)).fetchall()
+        except sqlite3.OperationalError:
+            return
+        for publish_id, season, snapshot_id, snapshot_date in rows:
+            self.last_id = publish_id
+            self._emit({"season": season, "snapshot_id": snapshot_id, "snapshot_date": snapshot_date})
+
+    def _watch(self) -> None:
+        conn = sqlite_readonly(self.db_path)
+        try:
+            version = conn.execute("PRAGMA data_version").fetchone()[0]
+            if self.last_id is None:
+                self.last_id = self._last_id(conn)
+            else:
+                # reconnected: announce what was published while the connection was down
+                self._emit_new(conn)
+            while not self._stop.wait(self.interval):
+                current = conn.execute("PRAGMA data_version").fetchone()[0]
+                if current == version:
+                    continue
+                version = current
+                self._emit_new(conn)
+        finally:
+            conn.close()
+
+class PostgresWatcher(_Watcher):
+    def __init__(self, database_url: str, on_change: OnChange, interval: float = POLL_SEC):
+        super().__init__(on_change)
+        self.database_url = database_url
+        self.interval = interval
+
+    def _watch(self) -> None:
+        import psycopg2
+        conn = psycopg2.connect(self.database_url)
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute(f"LISTEN {CHANNEL}")
+            print(f"Listening on {CHANNEL}")
+            while not self._stop.is_set():
+                # the timeout only bounds how long stop() waits
+                if select.select([conn], [], [], self.interval) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    notify = conn.notifies.pop(0)
+                    try:
+                        event = json.loads(notify.payload)
+                    except ValueError:
+                        print(f"Ignoring malformed {CHANNEL} payload: {notify.payload!r}")
+                        continue
+                    self._emit(event)
+        finally:
+            conn.close()
+
+def watcher_from_env(db_path: str, on_change: OnChange) -> Optional[_Watcher]:
+    """LISTEN when DATABASE_URL is set, poll the SQLite file when it exists, else nothing."""
+    if os.getenv("CHANGE_WATCH", "on").lower() in ("0", "off", "false"):
+        return None
+    database_url = os.getenv("DATABASE_URL")
+    if database_url:
+        return PostgresWatcher(database_url, on_change)
+    if os.path.exists(db_path):
+        return SQLiteWatcher(db_path, on_change)
+    return None
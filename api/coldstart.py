@@ -0,0 +1,179 @@
+"""
+Cold-start-optimized entry point for serverless deployments (Vercel, Railway
+scale-to-zero).
+
+Module import touches only the standard library: no FastAPI, no database
+driver, no schema/DDL work, no sample-data generation. Data comes from the
+prebuilt read-only artifact written by build_artifact.py, parsed on the first
+request that needs it. Check import cost with profile_imports.py.
+
+Exposes a plain ASGI `app` plus `handle()` for BaseHTTPRequestHandler shims.
+"""
+import json
+import os
+from datetime import datetime
+from urllib.parse import parse_qs
+
+ARTIFACT_PATH = os.getenv(
+    "SNAPSHOT_ARTIFACT",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "snapshot_artifact.json"),
+)
+
+CACHE_HEADERS = {
+    "Cache-Control": "no-cache, no-store, must-revalidate",
+    "Pragma": "no-cache",
+    "Expires": "0",
+    "Vary": "Accept-Encoding",
+}
+
+CORS_HEADERS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Methods": "GET, OPTIONS",
+    "Access-Control-Allow-Headers": "*",
+}
+
+_artifact = None
+_qualified = {}
+
+def load_artifact() -> dict:
+    global _artifact
+    if _artifact is None:
+        with open(ARTIFACT_PATH, "rb") as f:
+            _artifact = json.loads(f.read())
+    return _artifact
+
+def _players(season: str, qualified: bool) -> list:
+    season_data = load_artifact()["seasons"].get(season)
+    if season_data is None:
+        return []
+    if not qualified:
+        return season_data["players"]
+    if season not in _qualified:
+        _qualified[season] = [p for p in season_data["players"] if p["qualified"]]
+    return _qualified[season]
+
+def _json(status: int, content, etag: str = None):
+    headers = {**CORS_HEADERS, **CACHE_HEADERS, "Content-Type": "application/json"}
+    if etag:
+        headers["ETag"] = etag
+    return status, headers, json.dumps(content, separators=(",", ":")).encode()
+
+def _error(status: int, detail: str):
+    return _json(status, {"detail": detail})
+
+def _int_param(params: dict, name: str, default, low=None, high=None):
+    raw = params.get(name, [None])[0]
+    if raw in (None, ""):
+        return default
+    value = int(raw)
+    if (low is not None and value < low) or (high is not None and value > high):
+        raise ValueError(f"{name} must be between {low} and {high}")
+    return value
+
+def _bool_param(params: dict, name: str, default: bool) -> bool:
+    raw = params.get(name, [None])[0]
+    if raw is None:
+        return default
+    if raw.lower() in ("true", "1", "yes", "on"):
+        return True
+    if raw.lower() in ("false", "0", "no", "off"):
+        return False
+    raise ValueError(f"{name} must be a boolean")
+
+def season_rankings(season: int, qualified: bool, limit, offset: int, if_none_match: str = None):
+    artifact = load_artifact()
+    etag = f'"{artifact["version"]}-{season}-{int(qualified)}-{limit}-{offset}"'
+    if if_none_match == etag:
+        return 304, {**CORS_HEADERS, **CACHE_HEADERS, "ETag": etag}, b""
+
+    players = _players(str(season), qualified)
+    page = players[offset:offset + limit] if limit is not None else players[offset:]
+    season_data = artifact["seasons"].get(str(season), {})
+    return _json(200, {
+        "players": page,
+        "total_count": len(players),
+        "season": season,
+        "season_name": f"{season-1}-{str(season)[2:]}",
+        "last_updated": season_data.get("last_updated"),
+        "qualified": qualified,
+        "limit": limit,
+        "offset": offset,
+    }, etag)
+
+def handle(method: str, path: str, query: str = "", if_none_match: str = None):
+    """Route one request. Returns (status, headers, body bytes)."""
+    if method == "OPTIONS":
+        return 200, dict(CORS_HEADERS), b""
+    if method not in ("GET", "HEAD"):
+        return _error(405, "Method Not Allowed")
+
+    path = path.rstrip("/") or "/"
+    if path == "/health":
+        return _json(200, {
+            "status": "healthy",
+            "timestamp": datetime.now().isoformat(),
+            "service": "husseyquation-api",
+        })
+
+    parts = path.strip("/").split("/")
+    if len(parts) == 4 and parts[:2] == ["api", "seasons"] and parts[3] == "rankings":
+        params = parse_qs(query)
+        try:
+            season = int(parts[2])
+            if not 2016 <= season <= 2030:
+                raise ValueError("season must be between 2016 and 2030")
+            qualified = _bool_param(params, "qualified", True)
+            limit = _int_param(params, "limit", None, 1, 1000)
+            offset = _int_param(params, "offset", 0, 0)
+        except ValueError as e:
+            return _error(422, str(e))
+        try:
+            return season_rankings(season, qualified, limit, offset, if_none_match)
+        except FileNotFoundError:
+            return _error(503, "Snapshot artifact not built")
+
+    if path == "/api/leaderboards/all-time":
+        try:
+            artifact = load_artifact()
+        except FileNotFoundError:
+            return _error(503, "Snapshot artifact not built")
+        etag = f'"leaderboards-{artifact["version"]}"'
+        if if_none_match == etag:
+            return 304, {**CORS_HEADERS, **CACHE_HEADERS, "ETag": etag}, b""
+        boards = artifact.get("leaderboards") or {"best_single_seasons": [], "most_number_ones": [], "most_top_tens": []}
+        return _json(200, {**boards, "last_updated": artifact["built_at"]}, etag)
+
+    return _error(404, "Not Found")
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    if scope["type"] != "http":
+        return
+
+    if_none_match = None
+    for name, value in scope.get("headers", []):
+        if name == b"if-none-match":
+            if_none_match = value.decode("latin-1")
+            break
+
+    status, headers, body = handle(
+        scope["method"], scope["path"], scope.get("query_string", b"").decode("latin-1"), if_none_match
+    )
+    if scope["method"] == "HEAD":
+        body = b""
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers.items()],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+# Vercel looks for `app` (ASGI) or `handler`
+handler = app
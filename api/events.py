@@ -0,0 +1,99 @@
+"""
+Server-Sent Events for snapshot publication.
+
+One Broadcaster per worker fans each event out to every open /api/events
+stream. A subscriber is a small asyncio.Queue, so an idle dashboard costs a
+queue and a parked coroutine; between publishes the only traffic is a
+comment line every HEARTBEAT_SEC to keep proxies from closing the stream.
+
+The last HISTORY events are kept so a browser reconnecting with
+Last-Event-ID gets whatever it missed. Event ids come from the caller (the
+snapshot_id for snapshot events), not a per-worker counter, so the id a
+browser saw on one worker means the same thing on any other.
+"""
+import asyncio
+import json
+import os
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Set, Tuple
+
+HEARTBEAT_SEC = float(os.getenv("SSE_HEARTBEAT_SEC", "15"))
+HISTORY = 64
+QUEUE_SIZE = 16
+RETRY_MS = 5000
+
+Event = Tuple[int, str, Dict[str, Any]]  # (id, event name, data)
+
+def format_event(event: Event) -> str:
+    event_id, name, data = event
+    return f"id: {event_id}\nevent: {name}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+class Broadcaster:
+    def __init__(self, history: int = HISTORY, queue_size: int = QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._history: Deque[Event] = deque(maxlen=history)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def attach(self) -> None:
+        """Bind to the running event loop so other threads can publish before anyone subscribes."""
+        self._loop = asyncio.get_running_loop()
+
+    def subscribe(self, last_event_id: Optional[int] = None) -> asyncio.Queue:
+        self._loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        if last_event_id is not None:
+            for event in self._history:
+                if event[0] > last_event_id:
+                    self._offer(queue, event)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+
+    def _offer(self, queue: asyncio.Queue, event: Event) -> None:
+        # a subscriber that stopped reading loses its oldest events, never blocks the rest
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(event)
+
+    def _publish(self, event: Event) -> None:
+        self._history.append(event)
+        for queue in self._subscribers:
+            self._offer(queue, event)
+
+    def publish(self, event_id: int, name: str, data: Dict[str, Any]) -> None:
+        """Send an event to every subscriber; safe to call from other threads.
+
+        event_id must increase with each publish and be the same on every
+        worker for the same event (Last-Event-ID replay compares ids).
+        """
+        event = (event_id, name, data)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is not None or self._loop is None:
+            self._publish(event)
+        else:
+            self._loop.call_soon_threadsafe(self._publish, event)
+
+    async def stream(self, request, last_event_id: Optional[int] = None) -> AsyncIterator[str]:
+        queue = self.subscribe(last_event_id)
+        try:
+            yield f"retry: {RETRY_MS}\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), HEARTBEAT_SEC)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_event(event)
+        finally:
+            self.unsubscribe(queue)
+
+broadcaster = Broadcaster()
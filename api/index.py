@@ -1,4 +1,4 @@
-from vercel_handler import app
+from coldstart import app
 
 # Vercel expects a variable named 'app' or a handler function
-handler = app
\ No newline at end of file
+handler = app
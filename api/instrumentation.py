@@ -0,0 +1,161 @@
+"""
+Request and stage instrumentation for the API.
+
+- The timing middleware records a latency histogram per route template and
+  status, and a response-size histogram per route.
+- stage("db") / stage("etag") / stage("serialize") time pieces of a request:
+  each duration goes into a per-stage histogram and into the response's
+  Server-Timing header, so browser dev tools show where a request's time went.
+- cache_hit()/cache_miss() count lookups in the in-process caches.
+
+metrics.render() produces the Prometheus text exposition format served at
+/metrics. Everything is in-process and per worker; no client library needed.
+"""
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: Tuple[float, ...]):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        # labels -> (bucket counts, sum, count)
+        self.series: Dict[Labels, List] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        series = self.series.get(key)
+        if series is None:
+            series = self.series.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[0][i] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total, count) in sorted(self.series.items()):
+            for bound, n in zip(self.buckets, counts):
+                lines.append(f"{self.name}_bucket{_labels(key + (('le', _num(bound)),))} {n}")
+            lines.append(f"{self.name}_bucket{_labels(key + (('le', '+Inf'),))} {count}")
+            lines.append(f"{self.name}_sum{_labels(key)} {_num(total)}")
+            lines.append(f"{self.name}_count{_labels(key)} {count}")
+        return lines
+
+class Counter:
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.series: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        self.series[key] = self.series.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_labels(key)} {_num(v)}" for key, v in sorted(self.series.items())]
+        return lines
+
+def _labels(key: Labels) -> str:
+    if not key:
+        return ""
+    escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in key)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(key, escaped)) + "}"
+
+def _num(value: float) -> str:
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.requests = Histogram("huss_http_request_duration_seconds",
+                                  "Request latency by route template, method and status.", LATENCY_BUCKETS)
+        self.sizes = Histogram("huss_http_response_size_bytes", "Response body size by route.", SIZE_BUCKETS)
+        self.stages = Histogram("huss_stage_duration_seconds",
+                                "Time spent in a request stage (db, etag, serialize, ...).", LATENCY_BUCKETS)
+        self.cache = Counter("huss_cache_lookups_total", "In-process cache lookups by cache and result.")
+
+    def observe_request(self, route: str, method: str, status: int, seconds: float, size: Optional[int]) -> None:
+        with self._lock:
+            self.requests.observe(seconds, route=route, method=method, status=str(status))
+            if size is not None:
+                self.sizes.observe(size, route=route)
+
+    def observe_stage(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.stages.observe(seconds, stage=name)
+
+    def count_cache(self, cache: str, result: str) -> None:
+        with self._lock:
+            self.cache.inc(cache=cache, result=result)
+
+    def render(self) -> str:
+        with self._lock:
+            lines = [
+                "# HELP huss_uptime_seconds Seconds since this worker started.",
+                "# TYPE huss_uptime_seconds gauge",
+                f"huss_uptime_seconds {_num(round(time.time() - self.started, 3))}",
+            ]
+            for metric in (self.requests, self.sizes, self.stages, self.cache):
+                lines += metric.render()
+        return "\n".join(lines) + "\n"
+
+metrics = Metrics()
+
+# (stage, seconds) timed during the current request, for Server-Timing
+_request_stages: contextvars.ContextVar[Optional[List[Tuple[str, float]]]] = contextvars.ContextVar(
+    "request_stages", default=None
+)
+
+@contextmanager
+def stage(name: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - started
+        metrics.observe_stage(name, seconds)
+        stages = _request_stages.get()
+        if stages is not None:
+            stages.append((name, seconds))
+
+def cache_hit(cache: str) -> None:
+    metrics.count_cache(cache, "hit")
+
+def cache_miss(cache: str) -> None:
+    metrics.count_cache(cache, "miss")
+
+def server_timing(stages: List[Tuple[str, float]], total: float) -> str:
+    parts = [f"{name};dur={1000 * seconds:.2f}" for name, seconds in stages]
+    parts.append(f"total;dur={1000 * total:.2f}")
+    return ", ".join(parts)
+
+async def timing_middleware(request, call_next):
+    """Register with app.middleware("http")(timing_middleware)."""
+    stages: List[Tuple[str, float]] = []
+    token = _request_stages.set(stages)
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        _request_stages.reset(token)
+    total = time.perf_counter() - started
+
+    # route template keeps label cardinality bounded (/api/seasons/{season}/rankings, not every season)
+    route = request.scope.get("route")
+    path = getattr(route, "path", None) or "unmatched"
+    length = response.headers.get("content-length")
+    metrics.observe_request(path, request.method, response.status_code, total, int(length) if length else None)
+    response.headers["Server-Timing"] = server_timing(stages, total)
+    return response
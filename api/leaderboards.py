@@ -0,0 +1,77 @@
+"""
+In-memory all-time leaderboards.
+
+The ETL keeps ready-to-serve rows in leaderboard_rows and bumps
+leaderboard_meta.version whenever they change. This store holds the last
+loaded payload and only re-reads the rows when the version moves, so the
+ETag is simply the version.
+"""
+import sqlite3
+import threading
+from contextlib import closing
+from typing import Any, Dict, Optional, Tuple
+
+from instrumentation import cache_hit, cache_miss
+from migrate import sqlite_readonly
+
+BOARDS = ("best_single_seasons", "most_number_ones", "most_top_tens")
+
+class LeaderboardStore:
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._current: Tuple[Optional[int], Dict[str, Any]] = (None, {})
+
+    @staticmethod
+    def etag_for(version: int) -> str:
+        return f'"leaderboards-v{version}"'
+
+    def _read_version(self, conn: sqlite3.Connection) -> Tuple[int, Optional[str]]:
+        try:
+            row = conn.execute("SELECT version, updated_at FROM leaderboard_meta WHERE id = 1").fetchone()
+        except sqlite3.OperationalError:
+            # ETL hasn't created the leaderboard tables in this database yet
+            return 0, None
+        return (row[0], row[1]) if row else (0, None)
+
+    def _load(self, conn: sqlite3.Connection, version: int, updated_at: Optional[str]) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {board: [] for board in BOARDS}
+        if version:
+            rows = conn.execute("""
+                SELECT board, player_id, player_name, season_id, value
+                FROM leaderboard_rows
+                ORDER BY board, position
+            """).fetchall()
+            for board, player_id, player_name, season_id, value in rows:
+                if board == "best_single_seasons":
+                    payload[board].append({
+                        "player_id": player_id,
+                        "player_name": player_name,
+                        "season": season_id,
+                        "huss_score": value,
+                    })
+                elif board in payload:
+                    payload[board].append({
+                        "player_id": player_id,
+                        "player_name": player_name,
+                        "count": int(value),
+                    })
+        payload["version"] = version
+        payload["last_updated"] = updated_at
+        return payload
+
+    def get(self) -> Tuple[Dict[str, Any], str]:
+        """Return (payload, etag), reloading only if the ETL published a new version."""
+        with closing(sqlite_readonly(self.db_path)) as conn:
+            version, updated_at = self._read_version(conn)
+            current = self._current
+            if version != current[0]:
+                with self._lock:
+                    current = self._current
+                    if version != current[0]:
+                        current = (version, self._load(conn, version, updated_at))
+                        self._current = current
+                cache_miss("leaderboards")
+            else:
+                cache_hit("leaderboards")
+        return current[1], self.etag_for(current[0])
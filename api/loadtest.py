@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Load-test /api/seasons/{season}/rankings against each rankings backend.
+
+Seeds a scaled-up sample database (several seasons of daily snapshots),
+runs the FastAPI app in-process under uvicorn with one backend at a time,
+and drives it with an async httpx load generator over a mix of seasons,
+qualified/all, page sizes and offsets. Reports requests/sec and latency
+percentiles per backend:
+
+    python loadtest.py                                  # cached + sqlite
+    python loadtest.py --database-url postgresql://...  # + DatabaseConfig on Postgres
+    python loadtest.py --concurrency 64 --duration 20 --json results.json
+
+Backends: cached (CachedDataAdapter), sqlite (Database), postgres
+(DatabaseConfig; needs --database-url and sqlalchemy). The load generator
+shares the process with the server, so absolute numbers are conservative;
+compare backends and runs on the same machine. Needs httpx
+(requirements-full.txt).
+"""
+
+import argparse
+import asyncio
+import atexit
+import json
+import os
+import random
+import shutil
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+import httpx
+import uvicorn
+
+import migrate
+import seed
+
+SEASONS = list(range(2021, 2026))
+SNAPSHOTS_PER_SEASON = 180   # daily, roughly opening night to the end of the regular season
+PLAYERS_PER_SEASON = 450
+PAGE_SIZES = [None, 25, 50, 100]
+
+# Scaled sample data
+
+def scaled_rows(seasons: List[int], snapshots: int, players: int, team_count: int, seed_value: int = 0):
+    """
+    Yield (season, day, stats rows, rank rows) for every daily
+    snapshot. Player ids are 1..players; each season's players drift a little
+    day to day so ranks move like the real thing.
+    """
+    rng = random.Random(seed_value)
+    for season in seasons:
+        base = [(rng.gauss(15, 5), rng.gauss(0, 3), rng.randint(1, team_count)) for _ in range(players)]
+        for day in range(snapshots):
+            games = max(1, day * 82 // snapshots)
+            stats = []
+            for player_id, (per, bpm, team_id) in enumerate(base, 1):
+                per += rng.gauss(0, 0.3)
+                bpm += rng.gauss(0, 0.2)
+                mp = int(games * max(5.0, min(38.0, 20 + per - 15)))
+                ws = max(0.0, (per - 8) * mp / 3000)
+                stats.append({
+                    "player_id": player_id, "team_id": team_id, "g": games, "mp": mp,
+                    "per": round(per, 2), "ws": round(ws, 2), "ws48": round(48 * ws / mp, 4) if mp else 0.0,
+                    "bpm": round(bpm, 2), "vorp": round((bpm + 2) * mp / 4000, 2),
+                })
+            yield season, day, stats, seed.rank_stats(stats)
+
+def _date(season: int, day: int) -> str:
+    return (date(season - 1, 10, 22) + timedelta(days=day)).isoformat()
+
+def seed_scaled_sqlite(path: str, seasons: List[int], snapshots: int, players: int) -> None:
+    migrate.migrate_sqlite(path)
+    conn = migrate.sqlite3.connect(path)
+    try:
+        with conn:
+            conn.executemany("INSERT OR IGNORE INTO teams (abbr, name) VALUES (?, ?)", seed.TEAMS)
+            conn.executemany("INSERT OR IGNORE INTO players (player_id, person_id, nba_player_id, full_name, primary_pos) "
+                             "VALUES (?, ?, ?, ?, ?)",
+                             [(i, i, f"lt{i}", f"Load Test Player {i}", "F") for i in range(1, players + 1)])
+            for season in seasons:
+                conn.execute("INSERT OR IGNORE INTO seasons (season_id, status) VALUES (?, ?)",
+                             (season, "active" if season == seasons[-1] else "historical"))
+        for season, day, stats, ranks in scaled_rows(seasons, snapshots, players, len(seed.TEAMS)):
+            with conn:
+                snapshot_id = conn.execute("INSERT INTO snapshots (season_id, snapshot_date) VALUES (?, ?)",
+                                           (season, _date(season, day))).lastrowid
+                for table, columns, rows in (("player_snapshot_stats", seed.STATS_COLUMNS, stats),
+                                             ("player_snapshot_ranks", seed.RANKS_COLUMNS, ranks)):
+                    conn.executemany(
+                        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                        [tuple({"snapshot_id": snapshot_id, **row}[c] for c in columns) for row in rows],
+                    )
+    finally:
+        conn.close()
+
+def seed_scaled_postgres(database_url: str, seasons: List[int], snapshots: int, players: int) -> None:
+    from sqlalchemy import create_engine, text
+
+    migrate.migrate_postgres(database_url)
+    engine = create_engine(database_url)
+    with engine.begin() as conn:
+        if conn.execute(text("SELECT COUNT(*) FROM snapshots WHERE season_id = ANY(:s)"), {"s": seasons}).scalar():
+            print("Postgres already has load-test snapshots; reusing them")
+            engine.dispose()
+            return
+        conn.execute(text("INSERT INTO teams (abbr, name) VALUES (:abbr, :name) ON CONFLICT (abbr) DO NOTHING"),
+                     [{"abbr": a, "name": n} for a, n in seed.TEAMS])
+        conn.execute(text("INSERT INTO players (nba_player_id, full_name, primary_pos) VALUES (:nba_id, :name, 'F') "
+                          "ON CONFLICT (nba_player_id) DO NOTHING"),
+                     [{"nba_id": f"lt{i}", "name": f"Load Test Player {i}"} for i in range(1, players + 1)])
+        conn.execute(text("UPDATE players SET person_id = player_id WHERE person_id IS NULL"))
+        conn.execute(text("INSERT INTO seasons (season_id, status) VALUES (:s, 'historical') ON CONFLICT (season_id) DO NOTHING"),
+                     [{"s": s} for s in seasons])
+        player_ids = dict(conn.execute(text("SELECT nba_player_id, player_id FROM players WHERE nba_player_id LIKE 'lt%'")).fetchall())
+        team_ids = [r[0] for r in conn.execute(text("SELECT team_id FROM teams ORDER BY team_id"))]
+    for season, day, stats, ranks in scaled_rows(seasons, snapshots, players, len(team_ids)):
+        with engine.begin() as conn:
+            snapshot_id = conn.execute(text("INSERT INTO snapshots (season_id, snapshot_date) VALUES (:s, :d) RETURNING snapshot_id"),
+                                       {"s": season, "d": _date(season, day)}).scalar()
+            for table, columns, rows in (("player_snapshot_stats", seed.STATS_COLUMNS, stats),
+                                         ("player_snapshot_ranks", seed.RANKS_COLUMNS, ranks)):
+                mapped = [{**row, "snapshot_id": snapshot_id, "player_id": player_ids[f"lt{row['player_id']}"],
+                           **({"team_id": team_ids[row["team_id"] - 1]} if "team_id" in row else {})} for row in rows]
+                conn.execute(text(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(':' + c for c in columns)})"),
+                             mapped)
+    engine.dispose()
+
+# Backends
+
+def make_backend(name: str, sqlite_path: str, database_url: Optional[str]):
+    if name == "cached":
+        from main import CachedDataAdapter
+        return CachedDataAdapter()
+    if name == "sqlite":
+        from database import Database
+        return Database(sqlite_path)
+    if name == "postgres":
+        os.environ["DATABASE_URL"] = database_url
+        from database_config import DatabaseConfig
+        return DatabaseConfig()
+    raise ValueError(f"unknown backend {name}")
+
+# In-process server
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+class AppServer:
+    """uvicorn serving main.app on a background thread."""
+
+    def __init__(self, port: int):
+        import main
+        self.config = uvicorn.Config(main.app, host="127.0.0.1", port=port, log_level="warning",
+                                     access_log=False, lifespan="off")
+        self.server = uvicorn.Server(self.config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join()
+
+# Load generator
+
+def request_mix(seasons: List[int], rng: random.Random) -> str:
+    season = rng.choice(seasons)
+    qualified = rng.random() < 0.7
+    limit = rng.choice(PAGE_SIZES)
+    params = [f"qualified={'true' if qualified else 'false'}"]
+    if limit is not None:
+        params.append(f"limit={limit}")
+        params.append(f"offset={rng.choice([0, 0, 0, limit, 2 * limit, 4 * limit])}")
+    return f"/api/seasons/{season}/rankings?{'&'.join(params)}"
+
+async def drive(base_url: str, seasons: List[int], concurrency: int, duration: float,
+                warmup: float = 1.0, seed_value: int = 0) -> Dict[str, float]:
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    errors = 0
+    rng = random.Random(seed_value)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        async def worker(deadline: float, record: bool):
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                url = request_mix(seasons, rng)
+                started = time.perf_counter()
+                try:
+                    resp = await client.get(url)
+                    await resp.aread()
+                except httpx.HTTPError:
+                    errors += record
+                    continue
+                if record:
+                    latencies.append(time.perf_counter() - started)
+                    statuses[resp.status_code] = statuses.get(resp.status_code, 0) + 1
+
+        await asyncio.gather(*(worker(time.perf_counter() + warmup, False) for _ in range(concurrency)))
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(started + duration, True) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    if not latencies:
+        return {"requests": 0, "errors": errors}
+    ms = sorted(1000 * x for x in latencies)
+    pct = lambda p: ms[min(len(ms) - 1, int(p / 100 * len(ms)))]
+    return {
+        "requests": len(ms),
+        "rps": round(len(ms) / elapsed, 1),
+        "p50_ms": round(pct(50), 2),
+        "p90_ms": round(pct(90), 2),
+        "p99_ms": round(pct(99), 2),
+        "max_ms": round(ms[-1], 2),
+        "mean_ms": round(statistics.fmean(ms), 2),
+        "non_200": sum(n for code, n in statuses.items() if code != 200),
+        "errors": errors,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=["cached", "sqlite", "postgres"],
+                        choices=["cached", "sqlite", "postgres"])
+    parser.add_argument("--database-url", default=os.getenv("LOADTEST_DATABASE_URL"),
+                        help="Postgres for the DatabaseConfig backend (it gets seeded; use a scratch database)")
+    parser.add_argument("--db", default=None, help="reuse this seeded SQLite file instead of building one")
+    parser.add_argument("--seasons", type=int, default=len(SEASONS))
+    parser.add_argument("--snapshots", type=int, default=SNAPSHOTS_PER_SEASON, help="daily snapshots per season")
+    parser.add_argument("--players", type=int, default=PLAYERS_PER_SEASON)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of measured load per backend")
+    parser.add_argument("--json", help="also write the results here")
+    args = parser.parse_args()
+
+    seasons = list(range(2026 - args.seasons, 2026))
+    sqlite_path = args.db
+    if sqlite_path is None and "sqlite" in args.backends:
+        scratch = tempfile.mkdtemp(prefix="api-loadtest-")
+        atexit.register(shutil.rmtree, scratch, ignore_errors=True)
+        sqlite_path = os.path.join(scratch, "loadtest.sqlite")
+        started = time.perf_counter()
+        seed_scaled_sqlite(sqlite_path, seasons, args.snapshots, args.players)
+        print(f"Seeded {sqlite_path}: {len(seasons)} seasons x {args.snapshots} snapshots x {args.players} players "
+              f"in {time.perf_counter() - started:.1f}s")
+
+    backends = list(args.backends)
+    if "postgres" in backends:
+        if not args.database_url:
+            print("postgres: skipped (no --database-url)")
+            backends.remove("postgres")
+        else:
+            try:
+                seed_scaled_postgres(args.database_url, seasons, args.snapshots, args.players)
+            except ImportError:
+                print("postgres: skipped (sqlalchemy not installed)")
+                backends.remove("postgres")
+
+    import main as app_module
+    results = {}
+    for name in backends:
+        app_module.db = make_backend(name, sqlite_path, args.database_url)
+        port = _free_port()
+        with AppServer(port):
+            results[name] = asyncio.run(drive(f"http://127.0.0.1:{port}", seasons, args.concurrency, args.duration))
+        print(f"{name}: done")
+
+    print(f"\n{'backend':<10}{'rps':>10}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}{'non-200':>9}{'errors':>8}")
+    for name, r in results.items():
+        if not r.get("requests"):
+            print(f"{name:<10}{'no successful requests':>40}")
+            continue
+        print(f"{name:<10}{r['rps']:>10.1f}{r['p50_ms']:>10.2f}{r['p90_ms']:>10.2f}{r['p99_ms']:>10.2f}"
+              f"{r['max_ms']:>10.2f}{r['non_200']:>9}{r['errors']:>8}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"concurrency": args.concurrency, "duration": args.duration, "seasons": seasons,
+                       "snapshots": args.snapshots, "players": args.players, "results": results}, f, indent=2)
+    if any(r.get("non_200") or r.get("errors") for r in results.values()):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
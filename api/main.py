@@ -1,18 +1,44 @@
-from fastapi import FastAPI, HTTPException, Query, Path
+from fastapi import FastAPI, HTTPException, Query, Path, Header, Request, Body
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from typing import Optional, List, Dict, Any
+from fastapi.responses import JSONResponse, Response, PlainTextResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from typing import Optional, List, Dict, Any, Tuple
+import asyncio
 import os
+import time
 from datetime import datetime, timedelta
+import gzip
 import hashlib
+import hmac
 import json
+import threading
 from dotenv import load_dotenv
+from pydantic import BaseModel, Field
 
 # Load environment variables
 load_dotenv()
 
 # Import cached data (for production deployment reliability)
 from cached_data import get_cached_rankings
+from leaderboards import LeaderboardStore
+from search import PlayerSearch
+from events import broadcaster
+from changes import watcher_from_env
+from response_cache import MemoryCache, cache_from_env, cache_key
+from singleflight import SingleFlight
+from instrumentation import metrics, stage, cache_hit, cache_miss, timing_middleware
+
+DATABASE_PATH = os.getenv("DATABASE_PATH", "./husseyquation.sqlite" if os.path.exists("./husseyquation.sqlite") else "../db/husseyquation.sqlite")
+# Columnar snapshots published by the ETL (etl/columnar.py); used when present
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "./snapshots" if os.path.exists("./snapshots") else "../db/snapshots")
+ACTIVE_SEASON = int(os.getenv("ACTIVE_SEASON", "2025"))
+# Keep serving a query's previous response while the new snapshot's one builds
+SERVE_STALE = os.getenv("SERVE_STALE", "on").lower() not in ("0", "off", "false")
+# Most ranking queries / player ids one /api/batch call may ask for
+BATCH_MAX_QUERIES = 20
+BATCH_MAX_PLAYERS = 200
+# Shared secret the ETL sends with publish notifications; unset disables the endpoint
+PUBLISH_TOKEN = os.getenv("PUBLISH_TOKEN")
 
 app = FastAPI(
     title="HussEyquation API",
@@ -26,10 +52,13 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=cors_origins,
     allow_credentials=True,
-    allow_methods=["GET"],
+    allow_methods=["GET", "POST"],
     allow_headers=["*"],
 )
 
+# Per-route latency/size histograms and Server-Timing headers (see /metrics)
+app.middleware("http")(timing_middleware)
+
 # Cache control headers
 CACHE_HEADERS = {
     "Cache-Control": "no-cache, no-store, must-revalidate",  # Disable cache
@@ -40,8 +69,26 @@ CACHE_HEADERS = {
 
 def generate_etag(content: Any) -> str:
     """Generate ETag from content hash."""
-    content_str = json.dumps(content, sort_keys=True, default=str)
-    return f'"{hashlib.md5(content_str.encode()).hexdigest()}"'
+    with stage("etag"):
+        content_str = json.dumps(content, sort_keys=True, default=str)
+        return f'"{hashlib.md5(content_str.encode()).hexdigest()}"'
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """True if Accept-Encoding allows gzip: listed (or covered by *) with a non-zero q-value."""
+    q_values: Dict[str, float] = {}
+    for part in (accept_encoding or "").split(","):
+        coding, *params = [p.strip() for p in part.split(";")]
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding:
+            q_values[coding.lower()] = q
+    return q_values.get("gzip", q_values.get("x-gzip", q_values.get("*", 0.0))) > 0
 
 @app.get("/health")
 async def health_check():
@@ -49,9 +96,16 @@ async def health_check():
     return {
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
-        "service": "husseyquation-api"
+        "service": "husseyquation-api",
+        "uptime_seconds": round(time.time() - metrics.started, 1),
+        "event_subscribers": len(broadcaster)
     }
 
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Request, stage and cache metrics in Prometheus text format (this worker only)."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 # Using cached data adapter for production reliability
 class CachedDataAdapter:
     def get_season_rankings(self, season: int, qualified: bool = True, limit: int = None, offset: int = 0) -> Dict[str, Any]:
@@ -63,7 +117,25 @@ class CachedDataAdapter:
         
         return result
 
-db = CachedDataAdapter()
+def rankings_backend():
+    """Memory-mapped snapshot files when the ETL has published them, cached data otherwise."""
+    if os.path.isdir(SNAPSHOT_DIR):
+        try:
+            from snapshot_store import SnapshotStore
+            return SnapshotStore(SNAPSHOT_DIR)
+        except ImportError:
+            # pyarrow isn't part of the slim deployment requirements
+            pass
+    return CachedDataAdapter()
+
+db = rankings_backend()
+leaderboard_store = LeaderboardStore(DATABASE_PATH)
+player_search = PlayerSearch(db)
+# serialized responses, in process or shared through RESPONSE_CACHE_URL (response_cache.py)
+response_cache = cache_from_env()
+# query -> last response this worker served for it, whatever the snapshot (stale-while-revalidate)
+last_served = MemoryCache()
+rankings_flight = SingleFlight("rankings_build")
 
 @app.get("/")
 async def root():
@@ -74,8 +146,12 @@ async def root():
         "endpoints": [
             "/api/seasons/{season}/rankings",
             "/api/seasons/{season}/trending", 
+            "/api/players/search?q=",
             "/api/players/{player_id}",
-            "/api/players/{player_id}/history"
+            "/api/players/{player_id}/history",
+            "/api/batch",
+            "/api/events",
+            "/metrics"
         ]
     }
 
@@ -88,23 +164,209 @@ async def get_season_rankings(
 ):
     """Get player rankings for a season."""
     try:
+        body, etag = await rankings_response(season, qualified, limit, offset)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    return Response(content=body, media_type="application/json", headers={**CACHE_HEADERS, "ETag": etag})
+
+def rankings_payload(season: int, qualified: bool = True, limit: Optional[int] = None, offset: int = 0):
+    """(response body, ETag) for /api/seasons/{season}/rankings."""
+    with stage("db"):
         response_data = db.get_season_rankings(season, qualified, limit, offset)
-        response_data.update({
-            "qualified": qualified,
-            "limit": limit,
-            "offset": offset
-        })
-        
-        # Generate ETag
-        etag = generate_etag(response_data)
-        
-        return JSONResponse(
-            content=response_data,
-            headers={**CACHE_HEADERS, "ETag": etag}
-        )
+    response_data.update({
+        "qualified": qualified,
+        "limit": limit,
+        "offset": offset
+    })
+    return response_data, generate_etag(response_data)
+
+def snapshot_version(season: int) -> Any:
+    """Snapshot the backend serves for season; cached_data never changes."""
+    snapshot_id = getattr(db, "snapshot_id", None)
+    return snapshot_id(season) if snapshot_id else "static"
+
+async def cached_response(key: str) -> Optional[bytes]:
+    """response_cache.get without blocking the event loop: the Redis client waits on a socket."""
+    if isinstance(response_cache, MemoryCache):
+        return response_cache.get(key)
+    return await run_in_threadpool(response_cache.get, key)
+
+def rankings_keys(season: int, qualified: bool = True, limit: Optional[int] = None, offset: int = 0) -> Tuple[str, str]:
+    """(cache key for the snapshot being served, key for the same query on any snapshot)."""
+    params = {"qualified": qualified, "limit": limit, "offset": offset}
+    return cache_key("rankings", season, snapshot_version(season), **params), cache_key("rankings", season, "*", **params)
+
+def build_rankings(key: str, season: int, qualified: bool, limit: Optional[int], offset: int) -> bytes:
+    """
+    Build and cache one rankings response; the cache entry is ETag + newline + body.
+    Blocking (the response cache may be Redis): runs on the threadpool via rankings_flight.
+    """
+    response_data, etag = rankings_payload(season, qualified, limit, offset)
+    with stage("serialize"):
+        body = JSONResponse(content=response_data).body
+    entry = etag.encode() + b"\n" + body
+    response_cache.set(key, entry)
+    return entry
+
+async def rankings_response(season: int, qualified: bool = True, limit: Optional[int] = None, offset: int = 0) -> Tuple[bytes, str]:
+    """
+    (serialized body, ETag) for /api/seasons/{season}/rankings.
+
+    Misses are built once per key however many requests are waiting
+    (rankings_flight). If this worker already served the query from an
+    older snapshot, that response goes out while the new one builds in
+    the background.
+    """
+    key, query = rankings_keys(season, qualified, limit, offset)
+    with stage("cache"):
+        entry = await cached_response(key)
+    if entry is not None:
+        cache_hit("responses")
+    else:
+        cache_miss("responses")
+        build = rankings_flight.start(key, build_rankings, key, season, qualified, limit, offset)
+        stale = last_served.get(query) if SERVE_STALE else None
+        if stale is not None:
+            cache_hit("stale_responses")
+            etag, body = stale.split(b"\n", 1)
+            return body, etag.decode()
+        with stage("build"):
+            entry = await asyncio.shield(build)
+    last_served.set(query, entry)
+    etag, body = entry.split(b"\n", 1)
+    return body, etag.decode()
+
+class RankingsQuery(BaseModel):
+    season: int = Field(..., ge=2016, le=2030)
+    qualified: bool = True
+    limit: Optional[int] = Field(None, ge=1, le=1000)
+    offset: int = Field(0, ge=0)
+
+class BatchRequest(BaseModel):
+    rankings: List[RankingsQuery] = Field(default_factory=list, max_length=BATCH_MAX_QUERIES)
+    player_ids: List[int] = Field(default_factory=list, max_length=BATCH_MAX_PLAYERS)
+    # seasons to look player_ids up in (default: ACTIVE_SEASON)
+    seasons: List[int] = Field(default_factory=list, max_length=BATCH_MAX_QUERIES)
+
+@app.post("/api/batch")
+async def batch(
+    batch_request: BatchRequest,
+    accept_encoding: Optional[str] = Header(None)
+):
+    """
+    Several rankings queries and/or players in one round trip.
+
+    Response: {"rankings": [one /api/seasons/{season}/rankings body per query,
+    in order], "players": [{"player_id", "seasons": [row per season found]}]},
+    gzip-compressed when the client accepts it.
+    """
+    get_players = getattr(db, "get_players", None)
+    if batch_request.player_ids and get_players is None:
+        # cached_data rows carry no player_id
+        raise HTTPException(status_code=400, detail="player_ids need the snapshot store backend (SNAPSHOT_DIR); this deployment serves cached rankings only")
+
+    try:
+        # rankings bodies come from the response cache already serialized; splice them in as-is
+        bodies: Dict[Tuple, bytes] = {}
+        for query in batch_request.rankings:
+            params = (query.season, query.qualified, query.limit, query.offset)
+            if params not in bodies:
+                bodies[params], _ = await rankings_response(*params)
+
+        players: Dict[int, List[Dict[str, Any]]] = {player_id: [] for player_id in batch_request.player_ids}
+        if players:
+            with stage("db"):
+                for season in sorted(set(batch_request.seasons or [ACTIVE_SEASON])):
+                    for row in get_players(season, list(players)):
+                        players[row["player_id"]].append(row)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
+    with stage("serialize"):
+        rankings = b",".join(bodies[(q.season, q.qualified, q.limit, q.offset)] for q in batch_request.rankings)
+        players_json = json.dumps(
+            [{"player_id": player_id, "seasons": rows} for player_id, rows in players.items()],
+            ensure_ascii=False, separators=(",", ":")
+        ).encode()
+        body = b'{"rankings":[' + rankings + b'],"players":' + players_json + b"}"
+
+    headers = {**CACHE_HEADERS, "ETag": f'"{hashlib.md5(body).hexdigest()}"'}
+    if accepts_gzip(accept_encoding):
+        with stage("compress"):
+            body = gzip.compress(body, compresslevel=6)
+        headers["Content-Encoding"] = "gzip"
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@app.get("/api/events")
+async def snapshot_events(
+    request: Request,
+    last_event_id: Optional[int] = Header(None)
+):
+    """Server-Sent Events stream: a `snapshot` event each time the ETL publishes."""
+    return StreamingResponse(
+        broadcaster.stream(request, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.post("/api/internal/snapshots/published", include_in_schema=False)
+async def snapshot_published(
+    season: int = Body(..., ge=2016, le=2030),
+    snapshot_id: int = Body(...),
+    snapshot_date: Optional[str] = Body(None),
+    x_publish_token: Optional[str] = Header(None)
+):
+    """Called by the ETL after publishing; loads the new snapshot and notifies /api/events subscribers."""
+    if not PUBLISH_TOKEN or not hmac.compare_digest(x_publish_token or "", PUBLISH_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid publish token")
+
+    # rebuilding the snapshot's responses blocks, and the change watcher may hold the announce lock
+    event = await run_in_threadpool(
+        announce_snapshot, {"season": season, "snapshot_id": snapshot_id, "snapshot_date": snapshot_date}
+    )
+    return {"published": event, "subscribers": len(broadcaster)}
+
+# season -> last event announced; the POST hook and the change watcher both report each publish
+_announced: Dict[int, Dict[str, Any]] = {}
+_announce_lock = threading.Lock()
+
+def announce_snapshot(event: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Drop caches built on the season's old snapshot, reload it and send the
+    SSE event (once per snapshot). Blocking: call it off the event loop.
+    """
+    season, snapshot_id = int(event["season"]), int(event["snapshot_id"])
+    with _announce_lock:
+        announced = _announced.get(season)
+        if announced and announced["snapshot_id"] == snapshot_id:
+            return announced
+        player_search.invalidate(season)
+        # loading the default view here also warms the new snapshot (and the response cache) before clients ask for it
+        key, query = rankings_keys(season)
+        entry = response_cache.get(key) or build_rankings(key, season, True, None, 0)
+        last_served.set(query, entry)
+        etag = entry.split(b"\n", 1)[0].decode()
+        event = {"season": season, "snapshot_id": snapshot_id, "snapshot_date": event.get("snapshot_date"), "etag": etag}
+        _announced[season] = event
+    # snapshot ids are global and increasing, so every worker gives the event the same id
+    broadcaster.publish(snapshot_id, "snapshot", event)
+    print(f"Snapshot {snapshot_id} for {season} is live")
+    return event
+
+# LISTEN/NOTIFY on PostgreSQL, PRAGMA data_version polling on SQLite (changes.py)
+change_watcher = watcher_from_env(DATABASE_PATH, announce_snapshot)
+
+@app.on_event("startup")
+async def start_change_watcher():
+    broadcaster.attach()
+    if change_watcher:
+        change_watcher.start()
+
+@app.on_event("shutdown")
+async def stop_change_watcher():
+    if change_watcher:
+        change_watcher.stop()
+
 @app.get("/api/seasons/{season}/trending")
 async def get_trending_players(
     season: int = Path(..., description="Season ending year", ge=2016, le=2030),
@@ -127,6 +389,26 @@ async def get_trending_players(
         headers={**CACHE_HEADERS, "ETag": etag}
     )
 
+@app.get("/api/players/search")
+async def search_players(
+    q: str = Query(..., description="Name prefix (any word; accents optional)", min_length=1, max_length=64),
+    season: int = Query(ACTIVE_SEASON, description="Season whose ranks to return", ge=2016, le=2030),
+    limit: int = Query(10, description="Maximum matches", ge=1, le=50)
+):
+    """Typeahead player search with each match's current rank."""
+    try:
+        with stage("search"):
+            players = player_search.search(season, q, limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Search error: {str(e)}")
+
+    response_data = {"query": q, "season": season, "players": players}
+    with stage("serialize"):
+        return JSONResponse(
+            content=response_data,
+            headers={**CACHE_HEADERS, "ETag": generate_etag(response_data)}
+        )
+
 @app.get("/api/players/{player_id}")
 async def get_player_profile(
     player_id: int = Path(..., description="Player ID", ge=1)
@@ -170,32 +452,26 @@ async def get_player_history(
     )
 
 @app.get("/api/leaderboards/all-time")
-async def get_all_time_leaderboards():
+async def get_all_time_leaderboards(
+    if_none_match: Optional[str] = Header(None)
+):
     """Get all-time leaderboard stats (best single seasons, most #1s, etc.)."""
-    # TODO: Replace with actual database queries
-    
-    response_data = {
-        "best_single_seasons": [
-            {"player_name": "Nikola Jokic", "season": 2021, "huss_score": 1.8},
-            {"player_name": "Giannis Antetokounmpo", "season": 2020, "huss_score": 2.1}
-        ],
-        "most_number_ones": [
-            {"player_name": "LeBron James", "count": 4},
-            {"player_name": "Michael Jordan", "count": 6}
-        ],
-        "most_top_tens": [
-            {"player_name": "LeBron James", "count": 15},
-            {"player_name": "Tim Duncan", "count": 12}
-        ],
-        "last_updated": datetime.now().isoformat()
-    }
-    
-    etag = generate_etag(response_data)
-    
-    return JSONResponse(
-        content=response_data,
-        headers={**CACHE_HEADERS, "ETag": etag}
-    )
+    try:
+        with stage("db"):
+            response_data, etag = leaderboard_store.get()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+    if if_none_match == etag:
+        cache_hit("leaderboards_etag")
+        return Response(status_code=304, headers={**CACHE_HEADERS, "ETag": etag})
+    cache_miss("leaderboards_etag")
+
+    with stage("serialize"):
+        return JSONResponse(
+            content=response_data,
+            headers={**CACHE_HEADERS, "ETag": etag}
+        )
 
 # Vercel serverless function handler
 handler = app
@@ -57,6 +57,12 @@ class SimpleDB:
     def __init__(self):
         # Use environment variable for database path, fallback to local production DB or development path
         self.db_path = os.getenv("DATABASE_PATH", "./husseyquation.sqlite" if os.path.exists("./husseyquation.sqlite") else "../db/husseyquation.sqlite")
+        # Delta-stored snapshots only hold changed rows; the ETL's resolved_* views
+        # rebuild full snapshots. Older databases without them store every row.
+        with sqlite3.connect(self.db_path) as conn:
+            views = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'view'")}
+        self.stats_table = "resolved_snapshot_stats" if "resolved_snapshot_stats" in views else "player_snapshot_stats"
+        self.ranks_table = "resolved_snapshot_ranks" if "resolved_snapshot_ranks" in views else "player_snapshot_ranks"
     
     def get_season_rankings(self, season: int, qualified: bool = True, limit: int = None, offset: int = 0) -> Dict[str, Any]:
         with sqlite3.connect(self.db_path) as conn:
@@ -85,20 +91,20 @@ class SimpleDB:
                         ELSE 'SAME'
                     END as trend_direction,
                     0 as trend_1d, 0 as trend_7d, 0 as trend_14d
-                FROM player_snapshot_ranks r
+                FROM {self.ranks_table} r
                 JOIN players p ON r.player_id = p.player_id
-                JOIN player_snapshot_stats s ON r.snapshot_id = s.snapshot_id AND r.player_id = s.player_id
+                JOIN {self.stats_table} s ON r.snapshot_id = s.snapshot_id AND r.player_id = s.player_id
                 JOIN teams t ON s.team_id = t.team_id
-                -- Left join with previous season data using normalized names
+                -- Left join with previous season data on the canonical person_id
                 LEFT JOIN (
-                    SELECT pr.*, p_prev.normalized_name
-                    FROM player_snapshot_ranks pr 
+                    SELECT pr.*, p_prev.person_id
+                    FROM {self.ranks_table} pr 
                     JOIN players p_prev ON pr.player_id = p_prev.player_id
                     WHERE pr.snapshot_id = (
                         SELECT MAX(snapshot_id) FROM snapshots 
                         WHERE season_id = {season - 1}
                     )
-                ) prev ON prev.normalized_name = p.normalized_name
+                ) prev ON prev.person_id = p.person_id
                 {where_clause}
                 ORDER BY r.huss_rank
             """
@@ -107,7 +113,7 @@ class SimpleDB:
                 query += f" LIMIT {limit} OFFSET {offset}"
             
             players = [dict(row) for row in conn.execute(query).fetchall()]
-            total_count = len(players) if not limit else conn.execute(f"SELECT COUNT(*) FROM player_snapshot_ranks r JOIN players p ON r.player_id = p.player_id JOIN player_snapshot_stats s ON r.snapshot_id = s.snapshot_id AND r.player_id = s.player_id JOIN teams t ON s.team_id = t.team_id {where_clause}").fetchone()[0]
+            total_count = len(players) if not limit else conn.execute(f"SELECT COUNT(*) FROM {self.ranks_table} r JOIN players p ON r.player_id = p.player_id JOIN {self.stats_table} s ON r.snapshot_id = s.snapshot_id AND r.player_id = s.player_id JOIN teams t ON s.team_id = t.team_id {where_clause}").fetchone()[0]
             
             # Get season info
             season_info = conn.execute("SELECT start_date, end_date FROM seasons WHERE season_id = ?", (season,)).fetchone()
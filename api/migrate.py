@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Versioned schema migrations and sample-data seeding.
+
+Schema changes live in migrations/<dialect>/NNNN_name.sql and are applied in
+order inside one locked transaction, with each applied version recorded in
+schema_version. Run this once per deploy (release phase, or before starting
+uvicorn) -- never from the request-serving process:
+
+    python migrate.py                 # DATABASE_URL (Postgres) or DATABASE_PATH (SQLite)
+    python migrate.py --seed          # ...then load sample data into an empty database
+    python migrate.py --check         # exit 1 if migrations are pending
+
+The API opens the database read-only and only calls check_version().
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import sys
+from contextlib import closing
+from pathlib import Path
+from typing import List, Tuple
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent / "migrations"
+DATABASE_PATH = os.getenv("DATABASE_PATH", "husseyquation.db")
+
+# Arbitrary key for pg_advisory_xact_lock so concurrent deploys migrate one at a time
+PG_LOCK_KEY = 7254031
+
+SCHEMA_VERSION_DDL = """
+CREATE TABLE IF NOT EXISTS schema_version (
+  version INTEGER PRIMARY KEY,
+  name TEXT NOT NULL,
+  applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+class SchemaVersionError(RuntimeError):
+    """The database schema is older than this code expects."""
+
+def migrations(dialect: str) -> List[Tuple[int, str, Path]]:
+    """(version, name, path) for every migration file of a dialect, in order."""
+    found = []
+    for path in sorted((MIGRATIONS_DIR / dialect).glob("*.sql")):
+        match = re.match(r"(\d+)_(.+)\.sql$", path.name)
+        if match:
+            found.append((int(match.group(1)), match.group(2), path))
+    return found
+
+def latest_version(dialect: str) -> int:
+    found = migrations(dialect)
+    return found[-1][0] if found else 0
+
+def check_version(current: int, dialect: str) -> None:
+    """Raise SchemaVersionError unless every known migration has been applied."""
+    required = latest_version(dialect)
+    if current < required:
+        raise SchemaVersionError(
+            f"Database schema is at version {current} but this API needs {required}; "
+            f"run `python migrate.py` first"
+        )
+
+# SQLite
+
+def sqlite_readonly(path: str) -> sqlite3.Connection:
+    """Open a SQLite file read-only (fails instead of creating a missing file)."""
+    return sqlite3.connect(Path(path).resolve().as_uri() + "?mode=ro", uri=True)
+
+def sqlite_version(conn: sqlite3.Connection) -> int:
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_version'").fetchone()
+    if not exists:
+        return 0
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+
+def _statements(script: str):
+    """Split a SQL script into complete statements (executescript would COMMIT our transaction)."""
+    buffer = ""
+    for line in script.splitlines(keepends=True):
+        buffer += line
+        if sqlite3.complete_statement(buffer):
+            yield buffer
+            buffer = ""
+    if buffer.strip():
+        yield buffer
+
+def migrate_sqlite(path: str, seed: bool = False) -> List[int]:
+    conn = sqlite3.connect(path, isolation_level=None)
+    try:
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.execute("BEGIN IMMEDIATE")  # write lock: a second migrator waits here
+        try:
+            conn.execute(SCHEMA_VERSION_DDL)
+            current = sqlite_version(conn)
+            applied = []
+            for version, name, file in migrations("sqlite"):
+                if version <= current:
+                    continue
+                for statement in _statements(file.read_text()):
+                    try:
+                        conn.execute(statement)
+                    except sqlite3.OperationalError as e:
+                        # SQLite has no ADD COLUMN IF NOT EXISTS; an older script may have added it already
+                        if "duplicate column name" not in str(e):
+                            raise
+                conn.execute("INSERT INTO schema_version (version, name) VALUES (?, ?)", (version, name))
+                applied.append(version)
+            if seed:
+                import seed as sample
+                if sample.seed_sqlite(conn):
+                    print("Seeded sample data")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return applied
+    finally:
+        conn.close()
+
+# PostgreSQL
+
+def postgres_version(conn) -> int:
+    from sqlalchemy import text
+    if conn.execute(text("SELECT to_regclass('schema_version')")).scalar() is None:
+        return 0
+    return conn.execute(text("SELECT COALESCE(MAX(version), 0) FROM schema_version")).scalar()
+
+def migrate_postgres(database_url: str, seed: bool = False) -> List[int]:
+    from sqlalchemy import create_engine, text
+
+    engine = create_engine(database_url)
+    applied = []
+    with engine.begin() as conn:
+        conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": PG_LOCK_KEY})
+        conn.execute(text(SCHEMA_VERSION_DDL))
+        current = postgres_version(conn)
+        for version, name, file in migrations("postgres"):
+            if version <= current:
+                continue
+            conn.exec_driver_sql(file.read_text())
+            conn.execute(text("INSERT INTO schema_version (version, name) VALUES (:version, :name)"),
+                         {"version": version, "name": name})
+            applied.append(version)
+        if seed:
+            import seed as sample
+            if sample.seed_postgres(conn):
+                print("Seeded sample data")
+    engine.dispose()
+    return applied
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"), help="PostgreSQL URL (default: $DATABASE_URL)")
+    parser.add_argument("--db", default=DATABASE_PATH, help="SQLite file when no database URL is set")
+    parser.add_argument("--seed", action="store_true", help="load sample data if the database is empty")
+    parser.add_argument("--check", action="store_true", help="only report pending migrations")
+    args = parser.parse_args()
+
+    dialect = "postgres" if args.database_url else "sqlite"
+    target = args.database_url.rsplit("@", 1)[-1] if args.database_url else args.db
+
+    if args.check:
+        if args.database_url:
+            from sqlalchemy import create_engine
+            with create_engine(args.database_url).connect() as conn:
+                current = postgres_version(conn)
+        elif os.path.exists(args.db):
+            with closing(sqlite_readonly(args.db)) as conn:
+                current = sqlite_version(conn)
+        else:
+            current = 0
+        try:
+            check_version(current, dialect)
+        except SchemaVersionError as e:
+            print(e)
+            sys.exit(1)
+        print(f"{target}: schema at version {current} (up to date)")
+        return
+
+    if args.database_url:
+        applied = migrate_postgres(args.database_url, args.seed)
+    else:
+        applied = migrate_sqlite(args.db, args.seed)
+    if applied:
+        print(f"{target}: applied migrations {', '.join(map(str, applied))}")
+    print(f"{target}: schema at version {latest_version(dialect)}")
+
+if __name__ == "__main__":
+    main()
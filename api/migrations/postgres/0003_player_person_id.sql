@@ -0,0 +1,13 @@
+-- Canonical person_id: one per real player, shared by every players row that
+-- represents them (etl/identity.py keeps it up to date), so cross-season joins
+-- are integer equality joins instead of name comparisons. Existing rows are
+-- grouped by their accent-folded name; the oldest row's player_id is the person_id.
+
+ALTER TABLE players ADD COLUMN IF NOT EXISTS person_id INTEGER;
+
+UPDATE players SET person_id = COALESCE(
+    (SELECT MIN(p2.player_id) FROM players p2 WHERE p2.normalized_name = players.normalized_name),
+    player_id
+) WHERE person_id IS NULL;
+
+CREATE INDEX IF NOT EXISTS ix_players_person_id ON players (person_id);
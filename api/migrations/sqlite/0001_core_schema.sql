@@ -0,0 +1,61 @@
+-- Core rankings schema (players, teams, seasons, snapshots, per-snapshot stats and ranks)
+
+CREATE TABLE IF NOT EXISTS players (
+  player_id INTEGER PRIMARY KEY AUTOINCREMENT,
+  nba_player_id TEXT UNIQUE,
+  full_name TEXT NOT NULL,
+  primary_pos TEXT
+);
+
+CREATE TABLE IF NOT EXISTS teams (
+  team_id INTEGER PRIMARY KEY AUTOINCREMENT,
+  abbr TEXT UNIQUE NOT NULL,
+  name TEXT
+);
+
+CREATE TABLE IF NOT EXISTS seasons (
+  season_id INTEGER PRIMARY KEY,
+  start_date DATE,
+  end_date DATE,
+  status TEXT DEFAULT 'historical'
+);
+
+CREATE TABLE IF NOT EXISTS snapshots (
+  snapshot_id INTEGER PRIMARY KEY AUTOINCREMENT,
+  season_id INTEGER REFERENCES seasons(season_id),
+  snapshot_date DATE NOT NULL,
+  source_hash TEXT,
+  created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS player_snapshot_stats (
+  snapshot_id INTEGER REFERENCES snapshots(snapshot_id),
+  player_id INTEGER REFERENCES players(player_id),
+  team_id INTEGER REFERENCES teams(team_id),
+  g INTEGER,
+  mp INTEGER,
+  per REAL,
+  ws REAL,
+  ws48 REAL,
+  bpm REAL,
+  vorp REAL,
+  PRIMARY KEY (snapshot_id, player_id)
+);
+
+CREATE TABLE IF NOT EXISTS player_snapshot_ranks (
+  snapshot_id INTEGER REFERENCES snapshots(snapshot_id),
+  player_id INTEGER REFERENCES players(player_id),
+  per_rank INTEGER,
+  ws_rank INTEGER,
+  ws48_rank INTEGER,
+  bpm_rank INTEGER,
+  vorp_rank INTEGER,
+  huss_score REAL,
+  huss_rank INTEGER,
+  qualified INTEGER DEFAULT 1,
+  PRIMARY KEY (snapshot_id, player_id)
+);
+
+CREATE INDEX IF NOT EXISTS ix_ranks_snapshot ON player_snapshot_ranks (snapshot_id, huss_rank);
+CREATE INDEX IF NOT EXISTS ix_ranks_qual ON player_snapshot_ranks (snapshot_id, qualified, huss_rank);
+CREATE INDEX IF NOT EXISTS ix_players_nbaid ON players (nba_player_id);
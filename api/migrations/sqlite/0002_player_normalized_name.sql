@@ -0,0 +1,5 @@
+-- Accent-folded player names (etl/normalize_player_names.py) for cross-season joins
+
+ALTER TABLE players ADD COLUMN normalized_name TEXT;
+
+CREATE INDEX IF NOT EXISTS ix_players_normalized_name ON players (normalized_name);
@@ -0,0 +1,38 @@
+-- Keyframe + delta snapshots (etl/store.py write_snapshot): a delta snapshot
+-- stores only the player rows that changed since the previous snapshot of its
+-- keyframe chain. Readers go through the resolved_* views, which rebuild the
+-- full snapshot: the newest row of each player within the chain.
+
+ALTER TABLE snapshots ADD COLUMN keyframe_id INTEGER REFERENCES snapshots(snapshot_id);
+
+CREATE INDEX IF NOT EXISTS ix_stats_player ON player_snapshot_stats (player_id, snapshot_id);
+CREATE INDEX IF NOT EXISTS ix_ranks_player ON player_snapshot_ranks (player_id, snapshot_id);
+
+CREATE VIEW IF NOT EXISTS snapshot_chain AS
+SELECT s.snapshot_id, c.snapshot_id AS member_id
+FROM snapshots s
+JOIN snapshots c
+  ON COALESCE(c.keyframe_id, c.snapshot_id) = COALESCE(s.keyframe_id, s.snapshot_id)
+ AND c.snapshot_id <= s.snapshot_id;
+
+CREATE VIEW IF NOT EXISTS resolved_snapshot_stats AS
+SELECT ch.snapshot_id, st.player_id, st.team_id, st.g, st.mp,
+       st.per, st.ws, st.ws48, st.bpm, st.vorp
+FROM snapshot_chain ch
+JOIN player_snapshot_stats st ON st.snapshot_id = ch.member_id
+WHERE st.snapshot_id = (
+    SELECT MAX(x.snapshot_id) FROM snapshot_chain xc
+    JOIN player_snapshot_stats x ON x.snapshot_id = xc.member_id AND x.player_id = st.player_id
+    WHERE xc.snapshot_id = ch.snapshot_id
+);
+
+CREATE VIEW IF NOT EXISTS resolved_snapshot_ranks AS
+SELECT ch.snapshot_id, r.player_id, r.per_rank, r.ws_rank, r.ws48_rank, r.bpm_rank,
+       r.vorp_rank, r.huss_score, r.huss_rank, r.qualified
+FROM snapshot_chain ch
+JOIN player_snapshot_ranks r ON r.snapshot_id = ch.member_id
+WHERE r.snapshot_id = (
+    SELECT MAX(x.snapshot_id) FROM snapshot_chain xc
+    JOIN player_snapshot_ranks x ON x.snapshot_id = xc.member_id AND x.player_id = r.player_id
+    WHERE xc.snapshot_id = ch.snapshot_id
+);
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Import-time profile of the API entry points.
+
+Runs `python -X importtime` in a fresh interpreter for each entry point and
+prints the slowest imports by cumulative time. With --budget-ms the script
+exits non-zero when a serverless entry point exceeds its import budget, so a
+heavy top-level import (FastAPI, SQLAlchemy, pandas, ...) creeping back into
+the cold-start path fails CI instead of production latency.
+
+    python profile_imports.py                  # report
+    python profile_imports.py --budget-ms 50   # report + enforce on serverless entry points
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# (label, module to import, sys.path entry, checked against the budget)
+ENTRY_POINTS = [
+    ("coldstart (ASGI)", "coldstart", HERE, True),
+    ("index.py (Vercel ASGI)", "index", HERE, True),
+    ("api/index.py (Vercel handler)", "index", os.path.join(HERE, "api"), True),
+    ("main.py (full FastAPI app)", "main", HERE, False),
+]
+
+def profile(module: str, path: str):
+    """Return (total_us, [(cumulative_us, self_us, name)]) for importing module."""
+    env = {**os.environ, "PYTHONPATH": path}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=path, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import failed")
+
+    # Output is post-order (children first). Keep only the subtree that ends in
+    # the top-level line for `module`; interpreter startup (site, .pth hooks)
+    # is not ours to optimize.
+    rows, subtree = [], []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        subtree.append((int(cumulative_us), int(self_us), name.rstrip()))
+        if not name.startswith("  ", 1):  # depth 0
+            if name.strip() == module:
+                rows = subtree
+            subtree = []
+    total = rows[-1][0] if rows else 0
+    return total, rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list per entry point")
+    parser.add_argument("--budget-ms", type=float, default=None, help="fail if a serverless entry point imports slower")
+    args = parser.parse_args()
+
+    over_budget = []
+    for label, module, path, budgeted in ENTRY_POINTS:
+        try:
+            total, rows = profile(module, path)
+        except RuntimeError as e:
+            print(f"\n{label}: could not import ({e})")
+            continue
+
+        flag = ""
+        if budgeted and args.budget_ms is not None and total / 1000 > args.budget_ms:
+            over_budget.append(label)
+            flag = f"  OVER BUDGET ({args.budget_ms:.0f} ms)"
+        print(f"\n{label}: {total / 1000:.1f} ms{flag}")
+        print(f"  {'cumulative':>10}  {'self':>8}  module")
+        for cumulative, self_us, name in sorted(rows, reverse=True)[:args.top]:
+            print(f"  {cumulative / 1000:8.1f}ms  {self_us / 1000:6.1f}ms  {name}")
+
+    if over_budget:
+        print(f"\nImport budget exceeded: {', '.join(over_budget)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+Cache for serialized API responses, shared between replicas when Redis is configured.
+
+Keys carry the season and the snapshot the response was built from
+(cache_key), so a publish never needs to purge anything: requests simply
+start asking for keys with the new snapshot id and the old entries age out.
+
+- MemoryCache: per-worker LRU (the default).
+- RedisCache: any server speaking the Redis protocol (RESPONSE_CACHE_URL=
+  redis://host:6379/0). Every replica reads what any other replica built,
+  so a freshly started worker is warm from its first request. The client is
+  a few lines of RESP over a socket; an unreachable server turns into cache
+  misses, never request errors.
+
+`python response_cache.py serve` runs a small in-memory stand-in that speaks
+enough of the protocol (PING, GET, SET [EX], DEL, FLUSHDB) for local
+development and tests.
+"""
+import os
+import socket
+import socketserver
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+RESPONSE_CACHE_URL = os.getenv("RESPONSE_CACHE_URL")
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "512"))
+# keys are versioned by snapshot; the TTL only bounds how long superseded entries linger
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "86400"))
+KEY_PREFIX = "huss:"
+
+def cache_key(kind: str, season: int, version: Any, **params: Any) -> str:
+    """e.g. huss:rankings:2025:s1234:limit=50:offset=0:qualified=True"""
+    parts = [f"{name}={params[name]}" for name in sorted(params)]
+    return ":".join([f"{KEY_PREFIX}{kind}", str(season), f"s{version}", *parts])
+
+class MemoryCache:
+    def __init__(self, max_entries: int = RESPONSE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: int = RESPONSE_CACHE_TTL) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+class RedisError(Exception):
+    pass
+
+class RedisCache:
+    TIMEOUT_SEC = 0.25
+    # after a failure, skip the server this long instead of paying a timeout per request
+    RETRY_SEC = 5.0
+
+    def __init__(self, url: str):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.password = parsed.password
+        self._lock = threading.Lock()
+        self._sock: Optional[socket.socket] = None
+        self._reader = None
+        self._down_until = 0.0
+
+    def _connect(self) -> None:
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.TIMEOUT_SEC)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._reader = self._sock.makefile("rb")
+        if self.password:
+            self._call("AUTH", self.password)
+        if self.db:
+            self._call("SELECT", self.db)
+
+    def _close(self) -> None:
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = self._reader = None
+
+    def _call(self, *args: Any) -> Any:
+        encoded = [a if isinstance(a, bytes) else str(a).encode() for a in args]
+        request = b"*%d\r\n" % len(encoded) + b"".join(b"$%d\r\n%s\r\n" % (len(a), a) for a in encoded)
+        self._sock.sendall(request)
+        return _read_reply(self._reader)
+
+    def _command(self, *args: Any) -> Any:
+        """One command, or None if the server is unreachable."""
+        if time.monotonic() < self._down_until:
+            return None
+        with self._lock:
+            try:
+                if self._sock is None:
+                    self._connect()
+                return self._call(*args)
+            except (OSError, RedisError) as e:
+                print(f"Response cache at {self.host}:{self.port} unavailable ({e}); retrying in {self.RETRY_SEC:.0f}s")
+                self._close()
+                self._down_until = time.monotonic() + self.RETRY_SEC
+                return None
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._command("GET", key)
+
+    def set(self, key: str, value: bytes, ttl: int = RESPONSE_CACHE_TTL) -> None:
+        self._command("SET", key, value, "EX", ttl)
+
+def _read_reply(reader) -> Any:
+    line = reader.readline()
+    if not line.endswith(b"\r\n"):
+        raise RedisError("connection closed")
+    kind, rest = line[:1], line[1:-2]
+    if kind == b"+":
+        return rest.decode()
+    if kind == b"-":
+        raise RedisError(rest.decode())
+    if kind == b":":
+        return int(rest)
+    if kind == b"$":
+        length = int(rest)
+        if length < 0:
+            return None
+        data = reader.read(length + 2)
+        if len(data) != length + 2:
+            raise RedisError("connection closed")
+        return data[:-2]
+    if kind == b"*":
+        count = int(rest)
+        return None if count < 0 else [_read_reply(reader) for _ in range(count)]
+    raise RedisError(f"unexpected reply {line!r}")
+
+def cache_from_env():
+    """RedisCache when RESPONSE_CACHE_URL is set, MemoryCache otherwise."""
+    if RESPONSE_CACHE_URL:
+        return RedisCache(RESPONSE_CACHE_URL)
+    return MemoryCache()
+
+class _StandInHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        store: Dict[bytes, Tuple[bytes, Optional[float]]] = self.server.store
+        while True:
+            try:
+                args = _read_reply(self.rfile)
+            except (RedisError, ValueError):
+                return
+            if not isinstance(args, list) or not args:
+                return
+            command = args[0].upper()
+            if command == b"GET":
+                value, expires = store.get(args[1], (None, None))
+                if value is not None and expires is not None and expires < time.monotonic():
+                    store.pop(args[1], None)
+                    value = None
+                reply = b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+            elif command == b"SET":
+                ttl = int(args[4]) if len(args) >= 5 and args[3].upper() == b"EX" else None
+                store[args[1]] = (args[2], time.monotonic() + ttl if ttl else None)
+                reply = b"+OK\r\n"
+            elif command == b"DEL":
+                reply = b":%d\r\n" % sum(store.pop(key, None) is not None for key in args[1:])
+            elif command == b"FLUSHDB":
+                store.clear()
+                reply = b"+OK\r\n"
+            elif command in (b"PING", b"SELECT", b"AUTH"):
+                reply = b"+PONG\r\n" if command == b"PING" else b"+OK\r\n"
+            else:
+                reply = b"-ERR unknown command '%s'\r\n" % args[0]
+            self.wfile.write(reply)
+
+class StandInServer(socketserver.ThreadingTCPServer):
+    """In-memory Redis-protocol server for local development and tests."""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: Tuple[str, int]):
+        super().__init__(address, _StandInHandler)
+        self.store: Dict[bytes, Tuple[bytes, Optional[float]]] = {}
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Redis-protocol stand-in for the response cache")
+    parser.add_argument("command", choices=["serve"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6379)
+    args = parser.parse_args()
+
+    with StandInServer((args.host, args.port)) as server:
+        print(f"Response cache stand-in on redis://{args.host}:{args.port}/0")
+        server.serve_forever()
@@ -0,0 +1,119 @@
+"""
+Typeahead player search.
+
+PlayerIndex keeps every word-suffix of each folded name ("lebronjames",
+"james") in one sorted list, so a prefix query is two bisects plus a short
+scan. Names and queries are folded the same way (lowercase, accents
+stripped, punctuation and spaces dropped), so "sengun", "Şengün" and
+"gilgeous alex" all find their player.
+
+PlayerSearch holds one index per season and rebuilds it only when the
+rankings backend loads a new snapshot for that season.
+"""
+import threading
+import unicodedata
+from bisect import bisect_left
+from functools import lru_cache
+from heapq import nsmallest
+from typing import Any, Dict, List, Optional, Tuple
+
+from instrumentation import cache_hit, cache_miss
+
+FIELDS = ("player_id", "player_name", "team", "position", "rank")
+
+# same rules as etl/normalize_player_names.normalize_name (etl/ isn't deployed with the API)
+_EXTRA_FOLDS = {"ß": "ss", "æ": "ae", "œ": "oe", "ø": "o", "đ": "d", "ð": "d", "ł": "l", "ı": "i", "þ": "th"}
+
+@lru_cache(maxsize=65536)
+def fold(text: str) -> str:
+    """Lowercase, strip accents, keep [a-z0-9] only (spaces dropped too)."""
+    out = []
+    for c in text.lower():
+        c = _EXTRA_FOLDS.get(c, c)
+        out.extend(ch for ch in unicodedata.normalize("NFD", c) if ch.isascii() and ch.isalnum())
+    return "".join(out)
+
+class PlayerIndex:
+    def __init__(self, rows: List[Dict[str, Any]]):
+        self.players = [{field: row.get(field) for field in FIELDS} for row in rows]
+        entries: List[Tuple[str, int, int]] = []  # (folded suffix, player index, word position)
+        for i, player in enumerate(self.players):
+            words = [fold(w) for w in (player["player_name"] or "").split()]
+            words = [w for w in words if w]
+            for j in range(len(words)):
+                entries.append(("".join(words[j:]), i, j))
+        entries.sort()
+        self._keys = [e[0] for e in entries]
+        self._entries = entries
+
+    def __len__(self) -> int:
+        return len(self.players)
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        needle = fold(query)
+        if not needle:
+            return []
+        lo = bisect_left(self._keys, needle)
+        hi = bisect_left(self._keys, needle + "\x7f", lo)
+        # a player can match on several words; keep the earliest
+        best: Dict[int, int] = {}
+        for _, i, j in self._entries[lo:hi]:
+            if j < best.get(i, j + 1):
+                best[i] = j
+        # whole-name prefix first, then current rank (unranked last), then name
+        ranked = nsmallest(limit, best.items(), key=lambda item: (
+            item[1] > 0,
+            self.players[item[0]]["rank"] is None,
+            self.players[item[0]]["rank"] or 0,
+            self.players[item[0]]["player_name"] or "",
+        ))
+        return [self.players[i] for i, _ in ranked]
+
+class PlayerSearch:
+    """Per-season PlayerIndex over a rankings backend (SnapshotStore, CachedDataAdapter, Database)."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._lock = threading.Lock()
+        # season -> (source it was built from, index)
+        self._indexes: Dict[int, Tuple[Any, PlayerIndex]] = {}
+
+    def _source(self, season: int) -> Any:
+        # SnapshotStore hands back the same mapped table until a new snapshot is
+        # published; other backends serve fixed data, so their index is built once
+        table_for = getattr(self.backend, "table", None)
+        return table_for(season) if table_for is not None else None
+
+    def _rows(self, season: int, source: Any) -> List[Dict[str, Any]]:
+        if source is not None:
+            return source.select(list(FIELDS)).to_pylist()
+        players = self.backend.get_season_rankings(season, qualified=False, limit=1000).get("players", [])
+        # cached_data rows use name/rank and carry no player_id
+        return [{**p, "player_name": p.get("player_name", p.get("name"))} for p in players]
+
+    def index(self, season: int) -> PlayerIndex:
+        source = self._source(season)
+        cached = self._indexes.get(season)
+        if cached and cached[0] is source:
+            cache_hit("player_search")
+            return cached[1]
+
+        cache_miss("player_search")
+        with self._lock:
+            cached = self._indexes.get(season)
+            if cached and cached[0] is source:
+                return cached[1]
+            index = PlayerIndex(self._rows(season, source))
+            self._indexes[season] = (source, index)
+            return index
+
+    def invalidate(self, season: Optional[int] = None) -> None:
+        """Drop a season's index (all of them when season is None); rebuilt on next search."""
+        with self._lock:
+            if season is None:
+                self._indexes.clear()
+            else:
+                self._indexes.pop(season, None)
+
+    def search(self, season: int, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        return self.index(season).search(query, limit)
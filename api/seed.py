@@ -0,0 +1,230 @@
+"""
+Sample data for local development and demos.
+
+Only run by `python migrate.py --seed`; the API process never imports this
+module. Seeding is a no-op when the players table already has rows.
+"""
+import random
+from typing import Dict, List
+
+SEASON = (2025, '2024-10-15', '2025-06-30', 'active')
+SNAPSHOT_DATE = '2024-12-12'
+
+TEAMS = [
+    ('DEN', 'Denver Nuggets'),
+    ('DAL', 'Dallas Mavericks'),
+    ('BOS', 'Boston Celtics'),
+    ('LAL', 'Los Angeles Lakers'),
+    ('GSW', 'Golden State Warriors'),
+    ('MIL', 'Milwaukee Bucks'),
+    ('PHX', 'Phoenix Suns'),
+    ('OKC', 'Oklahoma City Thunder'),
+    ('NYK', 'New York Knicks'),
+    ('MIA', 'Miami Heat'),
+    ('ATL', 'Atlanta Hawks'),
+    ('BRK', 'Brooklyn Nets'),
+    ('CHA', 'Charlotte Hornets'),
+    ('CHI', 'Chicago Bulls'),
+    ('CLE', 'Cleveland Cavaliers'),
+    ('DET', 'Detroit Pistons'),
+    ('IND', 'Indiana Pacers'),
+    ('ORL', 'Orlando Magic'),
+    ('PHI', 'Philadelphia 76ers'),
+    ('TOR', 'Toronto Raptors'),
+    ('WAS', 'Washington Wizards'),
+    ('HOU', 'Houston Rockets'),
+    ('LAC', 'LA Clippers'),
+    ('MEM', 'Memphis Grizzlies'),
+    ('MIN', 'Minnesota Timberwolves'),
+    ('NOP', 'New Orleans Pelicans'),
+    ('POR', 'Portland Trail Blazers'),
+    ('SAC', 'Sacramento Kings'),
+    ('SAS', 'San Antonio Spurs'),
+    ('UTA', 'Utah Jazz'),
+]
+
+# (nba_player_id, full_name, primary_pos)
+PLAYERS = [
+    ('203999', 'Nikola Jokic', 'C'),
+    ('1629029', 'Luka Doncic', 'PG'),
+    ('1627759', 'Jayson Tatum', 'SF'),
+    ('2544', 'LeBron James', 'SF'),
+    ('201939', 'Stephen Curry', 'PG'),
+    ('203507', 'Giannis Antetokounmpo', 'PF'),
+    ('1628368', 'Devin Booker', 'SG'),
+    ('1628983', 'Shai Gilgeous-Alexander', 'PG'),
+    ('1627732', 'Jalen Brunson', 'PG'),
+    ('200765', 'Jimmy Butler', 'SF'),
+    ('1626164', 'Damian Lillard', 'PG'),
+    ('203076', 'Anthony Davis', 'PF'),
+    ('1627750', 'Donovan Mitchell', 'SG'),
+    ('1628369', 'De\'Aaron Fox', 'PG'),
+    ('202331', 'Paul George', 'SF'),
+    ('1627783', 'Pascal Siakam', 'PF'),
+    ('1628973', 'Tyler Herro', 'SG'),
+    ('1629630', 'Scottie Barnes', 'SF'),
+    ('1630163', 'Anthony Edwards', 'SG'),
+    ('1630567', 'Paolo Banchero', 'PF'),
+    ('203994', 'Rudy Gobert', 'C'),
+    ('203935', 'Marcus Smart', 'PG'),
+    ('1627734', 'Domantas Sabonis', 'PF'),
+    ('203924', 'CJ McCollum', 'SG'),
+    ('1628420', 'Mikal Bridges', 'SF'),
+    ('1629027', 'Tyler Herro', 'SG'),
+    ('1629651', 'Cade Cunningham', 'PG'),
+    ('1630169', 'Alperen Sengun', 'C'),
+    ('1630178', 'Evan Mobley', 'PF'),
+    ('1630173', 'Scottie Barnes', 'SF'),
+    ('203497', 'Kawhi Leonard', 'SF'),
+    ('201933', 'Blake Griffin', 'PF'),
+    ('1627742', 'Brandon Ingram', 'SF'),
+    ('202710', 'Julius Randle', 'PF'),
+    ('1628960', 'Jaren Jackson Jr.', 'PF'),
+    ('1629636', 'Franz Wagner', 'SF'),
+    ('1630532', 'Jalen Green', 'SG'),
+    ('1630224', 'Josh Giddey', 'PG'),
+    ('1628386', 'Anfernee Simons', 'SG'),
+    ('1628378', 'Gary Trent Jr.', 'SG'),
+    ('203114', 'Khris Middleton', 'SF'),
+    ('1628389', 'Wendell Carter Jr.', 'C'),
+    ('1628969', 'Michael Porter Jr.', 'SF'),
+    ('1629052', 'Nic Claxton', 'C'),
+    ('1630591', 'Chet Holmgren', 'C'),
+    ('1630550', 'Keegan Murray', 'PF'),
+    ('1630596', 'Bennedict Mathurin', 'SF'),
+    ('1630558', 'Jalen Williams', 'SF'),
+    ('1630602', 'Walker Kessler', 'C'),
+]
+
+# Stat ranges for different tiers of players
+ELITE_STATS = {'per': (28, 35), 'ws': (8, 12), 'ws48': (0.25, 0.35), 'bpm': (8, 12), 'vorp': (4, 7)}
+GOOD_STATS = {'per': (22, 28), 'ws': (5, 8), 'ws48': (0.18, 0.25), 'bpm': (3, 8), 'vorp': (2, 4)}
+AVERAGE_STATS = {'per': (15, 22), 'ws': (2, 5), 'ws48': (0.10, 0.18), 'bpm': (-2, 3), 'vorp': (0, 2)}
+BENCH_STATS = {'per': (10, 15), 'ws': (0, 2), 'ws48': (0.05, 0.10), 'bpm': (-5, -2), 'vorp': (-1, 0)}
+
+METRICS = ['per', 'ws', 'ws48', 'bpm', 'vorp']
+
+def sample_stats(player_ids: Dict[str, int], team_ids: List[int]) -> List[dict]:
+    """Generate realistic, repeatable stats for every sample player."""
+    random.seed(42)  # For consistent data
+
+    stats = []
+    for i, (nba_id, name, pos) in enumerate(PLAYERS, 1):
+        # Determine player tier based on name/reputation
+        if any(star in name for star in ['Jokic', 'Luka', 'Giannis', 'Tatum', 'LeBron', 'Curry', 'Anthony Davis']):
+            tier = ELITE_STATS
+        elif any(good in name for good in ['Booker', 'Shai', 'Butler', 'Lillard', 'Mitchell', 'Edwards']):
+            tier = GOOD_STATS
+        elif i <= 30:  # Top 30 players get average+ stats
+            tier = AVERAGE_STATS
+        else:  # Bench/role players
+            tier = BENCH_STATS
+
+        games = random.randint(25, 35) if i <= 40 else random.randint(15, 30)
+        minutes_per_game = random.uniform(25, 38) if i <= 20 else random.uniform(15, 30) if i <= 40 else random.uniform(8, 20)
+
+        stats.append({
+            'player_id': player_ids[nba_id],
+            'team_id': team_ids[(i - 1) % len(team_ids)],
+            'g': games,
+            'mp': int(games * minutes_per_game),
+            'per': round(random.uniform(*tier['per']), 1),
+            'ws': round(random.uniform(*tier['ws']), 1),
+            'ws48': round(random.uniform(*tier['ws48']), 3),
+            'bpm': round(random.uniform(*tier['bpm']), 1),
+            'vorp': round(random.uniform(*tier['vorp']), 1),
+        })
+    return stats
+
+def rank_stats(stats: List[dict]) -> List[dict]:
+    """Per-metric ranks (higher is better) and the HussEyquation average rank."""
+    ranks = {s['player_id']: {} for s in stats}
+    for metric in METRICS:
+        for position, s in enumerate(sorted(stats, key=lambda x: x[metric], reverse=True), 1):
+            ranks[s['player_id']][f'{metric}_rank'] = position
+
+    for s in stats:
+        r = ranks[s['player_id']]
+        r['huss_score'] = sum(r[f'{m}_rank'] for m in METRICS) / len(METRICS)
+
+    rows = []
+    for position, s in enumerate(sorted(stats, key=lambda x: ranks[x['player_id']]['huss_score']), 1):
+        r = ranks[s['player_id']]
+        rows.append({
+            'player_id': s['player_id'],
+            **{f'{m}_rank': r[f'{m}_rank'] for m in METRICS},
+            'huss_score': round(r['huss_score'], 1),
+            'huss_rank': position,
+            'qualified': 1 if s['mp'] >= 1000 else 0,
+        })
+    return rows
+
+STATS_COLUMNS = ['snapshot_id', 'player_id', 'team_id', 'g', 'mp'] + METRICS
+RANKS_COLUMNS = ['snapshot_id', 'player_id'] + [f'{m}_rank' for m in METRICS] + ['huss_score', 'huss_rank', 'qualified']
+
+def seed_sqlite(conn) -> bool:
+    """Insert the sample season into a sqlite3 connection. Returns False if data already exists."""
+    if conn.execute("SELECT COUNT(*) FROM players").fetchone()[0]:
+        return False
+
+    conn.execute("INSERT OR IGNORE INTO seasons (season_id, start_date, end_date, status) VALUES (?, ?, ?, ?)", SEASON)
+    conn.executemany("INSERT OR IGNORE INTO teams (abbr, name) VALUES (?, ?)", TEAMS)
+    conn.executemany("INSERT OR IGNORE INTO players (nba_player_id, full_name, primary_pos) VALUES (?, ?, ?)", PLAYERS)
+    conn.execute("UPDATE players SET person_id = player_id WHERE person_id IS NULL")
+    snapshot_id = conn.execute(
+        "INSERT INTO snapshots (season_id, snapshot_date) VALUES (?, ?)", (SEASON[0], SNAPSHOT_DATE)
+    ).lastrowid
+
+    player_ids = dict(conn.execute("SELECT nba_player_id, player_id FROM players"))
+    team_ids = [row[0] for row in conn.execute("SELECT team_id FROM teams ORDER BY team_id")]
+    stats = sample_stats(player_ids, team_ids)
+
+    for table, columns, rows in (
+        ('player_snapshot_stats', STATS_COLUMNS, stats),
+        ('player_snapshot_ranks', RANKS_COLUMNS, rank_stats(stats)),
+    ):
+        conn.executemany(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            [tuple({'snapshot_id': snapshot_id, **row}[c] for c in columns) for row in rows],
+        )
+    return True
+
+def seed_postgres(conn) -> bool:
+    """Insert the sample season through a SQLAlchemy connection. Returns False if data already exists."""
+    from sqlalchemy import text
+
+    if conn.execute(text("SELECT COUNT(*) FROM players")).scalar():
+        return False
+
+    conn.execute(text("""
+        INSERT INTO seasons (season_id, start_date, end_date, status)
+        VALUES (:season_id, :start_date, :end_date, :status)
+        ON CONFLICT (season_id) DO NOTHING
+    """), dict(zip(['season_id', 'start_date', 'end_date', 'status'], SEASON)))
+    conn.execute(
+        text("INSERT INTO teams (abbr, name) VALUES (:abbr, :name) ON CONFLICT (abbr) DO NOTHING"),
+        [{"abbr": abbr, "name": name} for abbr, name in TEAMS],
+    )
+    conn.execute(
+        text("INSERT INTO players (nba_player_id, full_name, primary_pos) VALUES (:nba_id, :name, :pos) ON CONFLICT (nba_player_id) DO NOTHING"),
+        [{"nba_id": nba_id, "name": name, "pos": pos} for nba_id, name, pos in PLAYERS],
+    )
+    conn.execute(text("UPDATE players SET person_id = player_id WHERE person_id IS NULL"))
+    snapshot_id = conn.execute(
+        text("INSERT INTO snapshots (season_id, snapshot_date) VALUES (:season, :date) RETURNING snapshot_id"),
+        {"season": SEASON[0], "date": SNAPSHOT_DATE},
+    ).scalar()
+
+    player_ids = dict(conn.execute(text("SELECT nba_player_id, player_id FROM players")).fetchall())
+    team_ids = [row[0] for row in conn.execute(text("SELECT team_id FROM teams ORDER BY team_id"))]
+    stats = sample_stats(player_ids, team_ids)
+
+    for table, columns, rows in (
+        ('player_snapshot_stats', STATS_COLUMNS, stats),
+        ('player_snapshot_ranks', RANKS_COLUMNS, rank_stats(stats)),
+    ):
+        conn.execute(
+            text(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(':' + c for c in columns)})"),
+            [{'snapshot_id': snapshot_id, **row} for row in rows],
+        )
+    return True
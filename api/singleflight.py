@@ -0,0 +1,45 @@
+"""
+Single-flight loads: concurrent requests for the same key share one build.
+
+The first caller starts fn on the threadpool (it is sync and may block on
+SQLite or pyarrow); everyone arriving while it runs awaits the same task.
+A caller that disconnects stops waiting without cancelling the build for
+the others, and a build nobody waits for (a background refresh) still runs
+to completion.
+"""
+import asyncio
+from typing import Any, Callable, Dict, Hashable
+
+from starlette.concurrency import run_in_threadpool
+
+from instrumentation import cache_hit, cache_miss
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def start(self, key: Hashable, fn: Callable[..., Any], *args: Any) -> asyncio.Task:
+        """The in-flight task for key, starting fn(*args) if there is none."""
+        task = self._tasks.get(key)
+        if task is not None:
+            cache_hit(self.name)
+            return task
+
+        cache_miss(self.name)
+        task = asyncio.ensure_future(run_in_threadpool(fn, *args))
+        self._tasks[key] = task
+        task.add_done_callback(lambda done: self._finished(key, done))
+        return task
+
+    def _finished(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled() and task.exception() is not None:
+            print(f"{self.name} load for {key} failed: {task.exception()}")
+
+    async def do(self, key: Hashable, fn: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.shield(self.start(key, fn, *args))
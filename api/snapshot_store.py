@@ -0,0 +1,145 @@
+"""
+Rankings served from the ETL's columnar snapshot files (etl/columnar.py).
+
+When the ETL has written a consolidated store (SNAPSHOT_DIR/CURRENT ->
+store-NNNNNN.arrow), every season's all-rows and qualified-rows views are
+record batches in that one file. Workers memory-map it read-only, so the
+data sits once in the page cache no matter how many workers serve it, and
+tables are zero-copy views into the mapping. Each request stats CURRENT;
+when the ETL swaps it, every worker moves to the new version on its next
+request.
+
+Without a store file, each season's LATEST .arrow file is memory-mapped
+on its own and the qualified view is filtered per worker.
+
+Filtering/pagination work on the mapped columns; only the requested page
+is converted to Python dicts.
+"""
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from instrumentation import cache_hit, cache_miss
+
+class SnapshotStore:
+    def __init__(self, root: str):
+        self.root = root
+        self._lock = threading.Lock()
+        # season -> (pointer mtime, all rows, qualified rows)
+        self._seasons: Dict[int, Tuple[float, pa.Table, pa.Table]] = {}
+        # (CURRENT inode, mtime) -> version, {(season, qualified): table}
+        self._store: Optional[Tuple[Tuple[int, int], int, Dict[Tuple[int, bool], pa.Table]]] = None
+
+    def _pointer(self, season: int) -> str:
+        return os.path.join(self.root, f"season={season}", "LATEST")
+
+    def _current(self) -> Optional[Tuple[Tuple[int, int], int, Dict[Tuple[int, bool], pa.Table]]]:
+        pointer = os.path.join(self.root, "CURRENT")
+        try:
+            st = os.stat(pointer)
+        except FileNotFoundError:
+            return None
+        key = (st.st_ino, st.st_mtime_ns)
+
+        store = self._store
+        if store and store[0] == key:
+            cache_hit("snapshots")
+            return store
+
+        cache_miss("snapshots")
+        with self._lock:
+            store = self._store
+            if store and store[0] == key:
+                return store
+            with open(pointer) as f:
+                path = os.path.join(self.root, f.read().strip())
+            reader = pa.ipc.open_file(pa.memory_map(path, "r"))
+            metadata = reader.schema.metadata
+            tables = {}
+            for season, batches in json.loads(metadata[b"index"]).items():
+                for view, i in batches.items():
+                    tables[(int(season), view == "qualified")] = pa.Table.from_batches([reader.get_batch(i)])
+            store = (key, int(metadata[b"version"]), tables)
+            self._store = store
+            return store
+
+    def _map(self, season: int) -> Optional[Tuple[float, pa.Table, pa.Table]]:
+        pointer = self._pointer(season)
+        try:
+            mtime = os.stat(pointer).st_mtime
+        except FileNotFoundError:
+            return None
+
+        cached = self._seasons.get(season)
+        if cached and cached[0] == mtime:
+            cache_hit("snapshots")
+            return cached
+
+        cache_miss("snapshots")
+        with self._lock:
+            cached = self._seasons.get(season)
+            if cached and cached[0] == mtime:
+                return cached
+            with open(pointer) as f:
+                path = os.path.join(os.path.dirname(pointer), f.read().strip())
+            table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+            qualified = table.filter(pc.equal(table["qualified"], True))
+            cached = (mtime, table, qualified)
+            self._seasons[season] = cached
+            return cached
+
+    def version(self) -> Optional[int]:
+        """Store version currently served (None when serving per-season files)."""
+        store = self._current()
+        return store[1] if store else None
+
+    def seasons(self) -> list:
+        store = self._current()
+        if store:
+            return sorted({season for season, _ in store[2]})
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(int(e.split("=", 1)[1]) for e in os.listdir(self.root) if e.startswith("season="))
+
+    def table(self, season: int, qualified: bool = False) -> Optional[pa.Table]:
+        store = self._current()
+        if store and (season, qualified) in store[2]:
+            return store[2][(season, qualified)]
+        mapped = self._map(season)
+        if mapped is None:
+            return None
+        return mapped[2] if qualified else mapped[1]
+
+    def snapshot_id(self, season: int) -> Optional[int]:
+        """Id of the snapshot served for season (None if there is none)."""
+        table = self.table(season)
+        return table["snapshot_id"][0].as_py() if table is not None and table.num_rows else None
+
+    def get_players(self, season: int, player_ids: List[int]) -> List[Dict[str, Any]]:
+        """The season's rows for any of player_ids, in rank order (one filter over the mapped table)."""
+        table = self.table(season)
+        if table is None or not player_ids:
+            return []
+        rows = table.filter(pc.is_in(table["player_id"], value_set=pa.array(player_ids, pa.int64())))
+        return rows.drop_columns(["snapshot_id", "snapshot_date"]).to_pylist()
+
+    def get_season_rankings(self, season: int, qualified: bool = True, limit: int = None, offset: int = 0) -> Dict[str, Any]:
+        table = self.table(season, qualified)
+        if table is None:
+            return {"players": [], "total_count": 0, "season": season}
+
+        page = table.slice(offset, limit) if limit is not None else table.slice(offset)
+        players = page.drop_columns(["snapshot_id", "season", "snapshot_date"]).to_pylist()
+        snapshot_date = table["snapshot_date"][0].as_py() if table.num_rows else None
+
+        return {
+            "players": players,
+            "total_count": table.num_rows,
+            "season": season,
+            "season_name": f"{season-1}-{str(season)[2:]}",
+            "last_updated": snapshot_date,
+        }
@@ -1,11 +1,15 @@
 -- HussEyquation Database Schema
 -- Postgres SQL
+-- Full current schema for a fresh database; existing databases are upgraded
+-- by api/migrations/<dialect>/ (python api/migrate.py), which this mirrors.
 
 create table players (
   player_id bigserial primary key,
   nba_player_id text unique,         -- from NBA.com via nba_api
   full_name text not null,
-  primary_pos text
+  primary_pos text,
+  normalized_name text,              -- accent-folded full_name (etl/normalize_player_names.py)
+  person_id bigint                   -- canonical row of the same real player (etl/identity.py)
 );
 
 create table teams (
@@ -25,7 +29,9 @@ create table snapshots (
   snapshot_id bigserial primary key,
   season_id int references seasons(season_id),
   snapshot_date date not null,
-  source_hash text,
+  source_hash text,                  -- content hash of the pulled season totals
+  last_checked_at timestamptz,       -- last run that found the source unchanged
+  keyframe_id bigint,                -- null/self = full snapshot; else delta on top of this keyframe chain
   created_at timestamptz default now()
 );
 
@@ -62,7 +68,82 @@ create table season_final_ranks (
   primary key (season_id, player_id)
 );
 
+-- team totals and pace per season, aggregated from team box scores in the pull
+create table team_season_context (
+  season_id int references seasons(season_id),
+  team_id int references teams(team_id),
+  g int,
+  pts int,
+  opp_pts int,
+  poss numeric(8,1),
+  pace numeric(5,2),
+  ortg numeric(5,1),
+  drtg numeric(5,1),
+  updated_at timestamptz default now(),
+  primary key (season_id, team_id)
+);
+
+-- running per-player aggregates, updated incrementally per season-final write
+create table player_career_aggregates (
+  player_id bigint primary key references players(player_id),
+  seasons_ranked int not null default 0,
+  number_ones int not null default 0,
+  top_tens int not null default 0,
+  best_huss_score numeric(7,3),
+  best_huss_season int
+);
+
+-- ready-to-serve all-time leaderboards
+create table leaderboard_rows (
+  board text not null,               -- 'best_single_seasons'|'most_number_ones'|'most_top_tens'
+  position int not null,
+  player_id bigint references players(player_id),
+  player_name text,
+  season_id int,
+  value numeric(7,3),
+  primary key (board, position)
+);
+
+create table leaderboard_meta (
+  id int primary key check (id = 1),
+  version int not null default 0,
+  updated_at timestamptz
+);
+
+insert into leaderboard_meta (id, version) values (1, 0);
+
 create index ix_ranks_snapshot on player_snapshot_ranks (snapshot_id, huss_rank);
 create index ix_ranks_qual on player_snapshot_ranks (snapshot_id, qualified, huss_rank);
 create index ix_stats_team on player_snapshot_stats (snapshot_id, team_id);
-create index ix_players_nbaid on players (nba_player_id);
\ No newline at end of file
+create index ix_players_nbaid on players (nba_player_id);
+create index ix_players_normalized_name on players (normalized_name);
+create index ix_players_person_id on players (person_id);
+create index ix_stats_player on player_snapshot_stats (player_id, snapshot_id);
+create index ix_ranks_player on player_snapshot_ranks (player_id, snapshot_id);
+create index ix_final_player on season_final_ranks (player_id, season_id);
+create index ix_career_ones on player_career_aggregates (number_ones desc);
+create index ix_career_tens on player_career_aggregates (top_tens desc);
+
+-- Delta-stored snapshots hold only the rows that changed since the previous
+-- snapshot of the same keyframe chain; these views rebuild full snapshots.
+create view snapshot_chain as
+select s.snapshot_id, c.snapshot_id as member_id
+from snapshots s
+join snapshots c
+  on coalesce(c.keyframe_id, c.snapshot_id) = coalesce(s.keyframe_id, s.snapshot_id)
+ and c.snapshot_id <= s.snapshot_id;
+
+create view resolved_snapshot_stats as
+select distinct on (ch.snapshot_id, st.player_id)
+       ch.snapshot_id, st.player_id, st.team_id, st.g, st.mp, st.per, st.ws, st.ws48, st.bmp, st.vorp
+from snapshot_chain ch
+join player_snapshot_stats st on st.snapshot_id = ch.member_id
+order by ch.snapshot_id, st.player_id, st.snapshot_id desc;
+
+create view resolved_snapshot_ranks as
+select distinct on (ch.snapshot_id, r.player_id)
+       ch.snapshot_id, r.player_id, r.per_rank, r.ws_rank, r.ws48_rank, r.bmp_rank, r.vorp_rank,
+       r.huss_score, r.huss_rank, r.qualified
+from snapshot_chain ch
+join player_snapshot_ranks r on r.snapshot_id = ch.member_id
+order by ch.snapshot_id, r.player_id, r.snapshot_id desc;
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Benchmark the daily ETL stage by stage and keep a history, so a slower or
+hungrier pipeline shows up here before it shows up in production.
+
+Stages:
+    pull          build_season_totals() against replay.py fixtures (in-process stand-in, no network)
+    per, ws, bpm_vorp, metrics    compute_per / compute_win_shares / compute_bmp_vorp / compute_all_metrics
+    ranks         compute_ranks_and_huss
+    trend         with_trend against a shuffled previous snapshot
+    db_write      store.write_snapshot into a fresh SQLite file (keyframe), then
+    db_write_delta  a second snapshot with ~10% of players changed
+
+Metric/rank/write stages run on synthetic season totals of 500, 5,000 and
+50,000 players. Each stage records best/median wall time over --repeat runs,
+peak RSS while it ran, and peak traced allocations (tracemalloc, on a
+separate untimed run). Results are appended to ETL_BENCH_HISTORY and compared
+with the median of the last few runs:
+
+    python bench.py                        # all sizes, synthetic 100-game pull
+    python bench.py --sizes 500 5000 --fixtures ../db/replay
+    python bench.py --check                # exit 1 on a regression
+"""
+
+from __future__ import annotations
+import argparse
+import atexit
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# the pull keeps a missing-games ledger on disk; keep a benchmark run away from the real one
+_scratch = tempfile.mkdtemp(prefix="etl-bench-")
+atexit.register(shutil.rmtree, _scratch, ignore_errors=True)
+os.environ["ETL_STATE_DIR"] = os.path.join(_scratch, "state")
+
+import pull
+import store
+from metrics import compute_all_metrics, compute_per, compute_win_shares, compute_bmp_vorp
+from pipeline import qualify, compute_ranks_and_huss, with_trend
+from replay import ReplayServer, synthesize, TEAM_CODES
+
+HISTORY_PATH = os.getenv("ETL_BENCH_HISTORY", "../db/bench/etl_history.json")
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "api" / "migrations" / "sqlite"
+SIZES = [500, 5_000, 50_000]
+
+# a stage regresses when it is this much slower (or allocates this much more)
+# than the median of the last BASELINE_RUNS runs, and by more than the noise floor
+TOLERANCE = 0.25
+BASELINE_RUNS = 5
+NOISE_FLOOR_SEC = 0.005
+NOISE_FLOOR_MB = 1.0
+
+def _rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        # no procfs: lifetime peak is the best we have (KB on Linux, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+class RssSampler:
+    """Peak resident set size while the block runs, sampled from a background thread."""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.peak = 0.0
+        self._stop = threading.Event()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.peak = max(self.peak, _rss_mb())
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> "RssSampler":
+        self.peak = _rss_mb()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, _rss_mb())
+
+def measure(fn: Callable[[], object], repeat: int = 3) -> Dict[str, float]:
+    """Wall time over `repeat` runs plus peak RSS and peak traced allocations."""
+    times = []
+    with RssSampler() as rss:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - started)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "wall_sec": round(min(times), 5),
+        "wall_median_sec": round(statistics.median(times), 5),
+        "peak_rss_mb": round(rss.peak, 1),
+        "peak_alloc_mb": round(peak / 2**20, 2),
+    }
+
+def synthetic_totals(n_players: int, seed: int = 0) -> pd.DataFrame:
+    """Season totals shaped like pull.aggregate_season_totals(), spread over 30 teams."""
+    rng = np.random.default_rng(seed)
+    mp = rng.gamma(1.6, 700, n_players).clip(1, 3200)
+    skill = rng.lognormal(0, 0.25, n_players)
+    rate = lambda per_min: rng.poisson(per_min * mp * skill)
+    fga, fta = rate(0.36), rate(0.10)
+    fg3a = rng.binomial(fga, 0.38)
+    fg3m = rng.binomial(fg3a, 0.36)
+    fgm = fg3m + rng.binomial(fga - fg3a, 0.50)
+    oreb, dreb = rate(0.045), rate(0.13)
+    totals = pd.DataFrame({
+        "nba_player_id": np.arange(n_players) + 1_000_000,
+        "player": [f"Bench Player {i}" for i in range(n_players)],
+        "mp": mp, "fga": fga, "fgm": fgm, "fg3a": fg3a, "fg3m": fg3m,
+        "fta": fta, "ftm": rng.binomial(fta, 0.78),
+        "oreb": oreb, "dreb": dreb, "trb": oreb + dreb,
+        "ast": rate(0.09), "stl": rate(0.03), "blk": rate(0.02), "tov": rate(0.05), "pf": rate(0.08),
+    })
+    totals["team"] = np.array(TEAM_CODES)[np.arange(n_players) % len(TEAM_CODES)]
+    totals["g"] = np.minimum(82, np.ceil(mp / 20)).astype(int)
+    return totals
+
+def _schema_db(path: str):
+    """Fresh SQLite file at the API's current schema plus the ETL tables."""
+    conn = store.sqlite3.connect(path)
+    for migration in sorted(MIGRATIONS_DIR.glob("*.sql")):
+        conn.executescript(migration.read_text())
+    conn.close()
+    return store.connect(path)
+
+def bench_pull(fixtures: Optional[str], games: int, repeat: int) -> Dict[str, float]:
+    if fixtures is None:
+        fixtures = os.path.join(_scratch, "replay")
+        synthesize(fixtures, season_end_year=2025, games=games)
+    with ReplayServer(fixtures, port=0) as server:
+        pull.NBAStatsHTTP.base_url = server.base_url
+        # no game cache, so every run fetches every game
+        result = measure(lambda: pull.build_season_totals(2025, throttle_sec=0, use_cache=False), repeat)
+        result["requests"] = server.stats["served"] // (repeat + 1)
+    return result
+
+def bench_size(n_players: int, repeat: int) -> Dict[str, Dict[str, float]]:
+    totals = synthetic_totals(n_players)
+    df = totals.join(compute_all_metrics(totals))
+    df["qualified"] = qualify(df, min_minutes=1000)
+    ranked = compute_ranks_and_huss(df)
+    prev = ranked[["nba_player_id", "huss_rank"]].copy()
+    prev["huss_rank"] = np.random.default_rng(1).permutation(prev["huss_rank"].to_numpy())
+    trended = with_trend(ranked, prev)
+    # next day: ~10% of players' lines move
+    changed = trended.copy()
+    moved = np.random.default_rng(2).random(len(changed)) < 0.1
+    changed.loc[moved, "PER"] += 0.5
+
+    def write(frames: List[pd.DataFrame]) -> Callable[[], None]:
+        def run():
+            fd, path = tempfile.mkstemp(suffix=".sqlite", dir=_scratch)
+            os.close(fd)
+            conn = _schema_db(path)
+            try:
+                for i, frame in enumerate(frames):
+                    store.write_snapshot(conn, 2025, f"2025-01-{i + 1:02d}", frame, storage="delta")
+            finally:
+                conn.close()
+                os.remove(path)
+        return run
+
+    stages = {
+        "per": lambda: compute_per(totals),
+        "ws": lambda: compute_win_shares(totals),
+        "bpm_vorp": lambda: compute_bmp_vorp(totals),
+        "metrics": lambda: compute_all_metrics(totals),
+        "ranks": lambda: compute_ranks_and_huss(df),
+        "trend": lambda: with_trend(ranked, prev),
+        "db_write": write([trended]),
+    }
+    results = {name: measure(fn, repeat) for name, fn in stages.items()}
+    # the delta write includes the keyframe it diffs against; report only the second snapshot
+    both = measure(write([trended, changed]), repeat)
+    keyframe = results["db_write"]
+    results["db_write_delta"] = {**both, "wall_sec": round(max(0.0, both["wall_sec"] - keyframe["wall_sec"]), 5),
+                                 "wall_median_sec": round(max(0.0, both["wall_median_sec"] - keyframe["wall_median_sec"]), 5)}
+    return results
+
+def load_history(path: str = HISTORY_PATH) -> List[dict]:
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+def save_history(history: List[dict], path: str = HISTORY_PATH) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(history, f, indent=1)
+    os.replace(tmp, path)
+
+def regressions(current: Dict[str, dict], history: List[dict], tolerance: float = TOLERANCE) -> List[str]:
+    """Stages that got slower or allocate more than the recent baseline."""
+    found = []
+    for key, result in current.items():
+        past = [run["results"][key] for run in history[-BASELINE_RUNS:] if key in run["results"]]
+        if not past:
+            continue
+        for field, floor, unit in (("wall_sec", NOISE_FLOOR_SEC, "s"), ("peak_alloc_mb", NOISE_FLOOR_MB, "MB")):
+            baseline = statistics.median(p[field] for p in past)
+            value = result[field]
+            if value > baseline * (1 + tolerance) and value - baseline > floor:
+                found.append(f"{key} {field}: {value:.3f}{unit} vs baseline {baseline:.3f}{unit} "
+                             f"(+{100 * (value / baseline - 1) if baseline else float('inf'):.0f}%)")
+    return found
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=Path(__file__).resolve().parent, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="players per synthetic season")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--fixtures", default=None, help="replay.py fixtures for the pull (default: synthesize)")
+    parser.add_argument("--games", type=int, default=100, help="games in the synthesized pull fixtures")
+    parser.add_argument("--skip-pull", action="store_true")
+    parser.add_argument("--history", default=HISTORY_PATH)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--check", action="store_true", help="exit 1 if any stage regressed")
+    parser.add_argument("--no-save", action="store_true", help="don't append this run to the history")
+    args = parser.parse_args()
+
+    results: Dict[str, dict] = {}
+    if not args.skip_pull:
+        results["pull"] = bench_pull(args.fixtures, args.games, args.repeat)
+    for n in args.sizes:
+        for stage, result in bench_size(n, args.repeat).items():
+            results[f"{stage}@{n}"] = result
+
+    print(f"{'stage':<22}{'wall':>10}{'median':>10}{'rss MB':>10}{'alloc MB':>10}")
+    for key, r in results.items():
+        print(f"{key:<22}{r['wall_sec']:>10.4f}{r['wall_median_sec']:>10.4f}{r['peak_rss_mb']:>10.1f}{r['peak_alloc_mb']:>10.2f}")
+
+    history = load_history(args.history)
+    found = regressions(results, history, args.tolerance)
+    for line in found:
+        print(f"REGRESSION {line}")
+    if not args.no_save:
+        history.append({
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "results": results,
+        })
+        save_history(history, args.history)
+    if args.check and found:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
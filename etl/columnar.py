@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Columnar snapshot files for history analysis and fast API cold starts.
+
+Every published snapshot is written under SNAPSHOT_DIR, partitioned by season:
+
+    season=2025/snapshot-000123.arrow    Arrow IPC, uncompressed -> mmap, zero-copy reads
+    season=2025/snapshot-000123.parquet  compressed copy for notebooks / DuckDB / pandas
+    season=2025/LATEST                   name of the newest .arrow file (atomically replaced)
+    season=2025/window-last10.arrow      latest rolling-window ranking (+ .parquet), replaced daily
+    store-000042.arrow                   latest snapshot of every season, consolidated
+    CURRENT                              name of the newest store file (atomically replaced)
+
+Rows are already in the API's rankings shape, so readers can filter and
+slice the mapped table without touching SQLite.
+
+The store file holds two record batches per season, all rows and qualified
+rows, both in rank order, so API workers serve either view straight out of
+one shared read-only mapping: the pages live once in the page cache however
+many workers map them. Each publish writes a new store file and swaps
+CURRENT; every worker picks it up on its next request.
+"""
+
+from __future__ import annotations
+import json
+import os
+import sqlite3
+from typing import Dict, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+import store
+
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "../db/snapshots")
+STORE_KEEP = 3  # store files kept around; a worker may still be serving from the previous one
+
+SCHEMA = pa.schema([
+    ("snapshot_id", pa.int64()),
+    ("season", pa.int32()),
+    ("snapshot_date", pa.string()),
+    ("rank", pa.int32()),
+    ("player_id", pa.int64()),
+    ("player_name", pa.string()),
+    ("team", pa.string()),
+    ("position", pa.string()),
+    ("huss_score", pa.float64()),
+    ("per", pa.float64()), ("per_rank", pa.int32()),
+    ("ws", pa.float64()), ("ws_rank", pa.int32()),
+    ("ws48", pa.float64()), ("ws48_rank", pa.int32()),
+    ("bpm", pa.float64()), ("bpm_rank", pa.int32()),
+    ("vorp", pa.float64()), ("vorp_rank", pa.int32()),
+    ("games", pa.int32()),
+    ("minutes", pa.int32()),
+    ("qualified", pa.bool_()),
+])
+
+def season_dir(season: int, root: str = SNAPSHOT_DIR) -> str:
+    return os.path.join(root, f"season={season}")
+
+def snapshot_frame(conn: sqlite3.Connection, snapshot_id: int) -> pd.DataFrame:
+    """Full (delta-resolved) snapshot rows ordered by HussEyquation rank."""
+    return pd.read_sql_query("""
+        SELECT r.snapshot_id, sn.season_id AS season, sn.snapshot_date,
+               r.huss_rank AS rank, p.player_id, p.full_name AS player_name,
+               t.abbr AS team, p.primary_pos AS position, r.huss_score,
+               st.per, r.per_rank, st.ws, r.ws_rank, st.ws48, r.ws48_rank,
+               st.bpm, r.bpm_rank, st.vorp, r.vorp_rank,
+               st.g AS games, st.mp AS minutes, r.qualified
+        FROM resolved_snapshot_ranks r
+        JOIN resolved_snapshot_stats st ON st.snapshot_id = r.snapshot_id AND st.player_id = r.player_id
+        JOIN snapshots sn ON sn.snapshot_id = r.snapshot_id
+        JOIN players p ON p.player_id = r.player_id
+        LEFT JOIN teams t ON t.team_id = st.team_id
+        WHERE r.snapshot_id = ?
+        ORDER BY r.huss_rank
+    """, conn, params=(snapshot_id,))
+
+def write_snapshot_files(df: pd.DataFrame, season: int, snapshot_id: int, root: str = SNAPSHOT_DIR) -> str:
+    """Write the .arrow/.parquet pair for one snapshot and repoint LATEST. Returns the .arrow path."""
+    out_dir = season_dir(season, root)
+    os.makedirs(out_dir, exist_ok=True)
+
+    df = df.assign(qualified=df["qualified"].astype(bool))
+    table = pa.Table.from_pandas(df, schema=SCHEMA, preserve_index=False)
+
+    name = f"snapshot-{snapshot_id:06d}"
+    arrow_path = os.path.join(out_dir, f"{name}.arrow")
+    tmp_path = arrow_path + ".tmp"
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, arrow_path)
+    pq.write_table(table, os.path.join(out_dir, f"{name}.parquet"), compression="zstd")
+
+    latest_tmp = os.path.join(out_dir, "LATEST.tmp")
+    with open(latest_tmp, "w") as f:
+        f.write(f"{name}.arrow")
+    os.replace(latest_tmp, os.path.join(out_dir, "LATEST"))
+    return arrow_path
+
+WINDOW_SCHEMA = pa.schema([
+    ("window", pa.string()),
+    ("as_of", pa.string()),
+    ("rank", pa.int32()),
+    ("nba_player_id", pa.string()),
+    ("player_name", pa.string()),
+    ("team", pa.string()),
+    ("huss_score", pa.float64()),
+    ("per", pa.float64()), ("per_rank", pa.int32()),
+    ("ws", pa.float64()), ("ws_rank", pa.int32()),
+    ("ws48", pa.float64()), ("ws48_rank", pa.int32()),
+    ("bpm", pa.float64()), ("bpm_rank", pa.int32()),
+    ("vorp", pa.float64()), ("vorp_rank", pa.int32()),
+    ("games", pa.int32()),
+    ("minutes", pa.float64()),
+    ("qualified", pa.bool_()),
+])
+
+def write_window_files(ranked: pd.DataFrame, season: int, window: str, as_of: str, root: str = SNAPSHOT_DIR) -> str:
+    """Write a rolling-window ranking (windows.rank_window output). Returns the .arrow path."""
+    out_dir = season_dir(season, root)
+    os.makedirs(out_dir, exist_ok=True)
+
+    df = ranked.rename(columns={
+        "huss_rank": "rank", "player": "player_name", "mp": "minutes",
+        "PER": "per", "WS": "ws", "WS/48": "ws48", "BPM": "bpm", "VORP": "vorp", "bmp_rank": "bpm_rank",
+    }).sort_values("rank")
+    df = df.assign(window=window, as_of=as_of, nba_player_id=df["nba_player_id"].astype(str),
+                   qualified=df["qualified"].astype(bool))
+    table = pa.Table.from_pandas(df[WINDOW_SCHEMA.names], schema=WINDOW_SCHEMA, preserve_index=False)
+
+    arrow_path = os.path.join(out_dir, f"window-{window}.arrow")
+    tmp_path = arrow_path + ".tmp"
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, arrow_path)
+    pq.write_table(table, os.path.join(out_dir, f"window-{window}.parquet"), compression="zstd")
+    return arrow_path
+
+def export_snapshot(conn: sqlite3.Connection, snapshot_id: int, root: str = SNAPSHOT_DIR) -> str:
+    season = conn.execute("SELECT season_id FROM snapshots WHERE snapshot_id = ?", (snapshot_id,)).fetchone()[0]
+    return write_snapshot_files(snapshot_frame(conn, snapshot_id), season, snapshot_id, root)
+
+def read_snapshot(path: str) -> pa.Table:
+    """Memory-map an .arrow snapshot; column buffers point straight into the page cache."""
+    return pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+
+def latest_path(season: int, root: str = SNAPSHOT_DIR) -> Optional[str]:
+    pointer = os.path.join(season_dir(season, root), "LATEST")
+    if not os.path.exists(pointer):
+        return None
+    with open(pointer) as f:
+        return os.path.join(season_dir(season, root), f.read().strip())
+
+def load_latest(root: str = SNAPSHOT_DIR) -> Dict[int, pa.Table]:
+    """Latest snapshot of every exported season: one mmap per season."""
+    tables = {}
+    if not os.path.isdir(root):
+        return tables
+    for entry in sorted(os.listdir(root)):
+        if entry.startswith("season="):
+            season = int(entry.split("=", 1)[1])
+            path = latest_path(season, root)
+            if path:
+                tables[season] = read_snapshot(path)
+    return tables
+
+def load_history(season: int, root: str = SNAPSHOT_DIR) -> pd.DataFrame:
+    """Every exported snapshot of a season stacked into one frame (for trend/history analysis)."""
+    out_dir = season_dir(season, root)
+    # window-*.arrow files share the directory but not the schema
+    paths = sorted(
+        p for p in os.listdir(out_dir) if p.startswith("snapshot-") and p.endswith(".arrow")
+    ) if os.path.isdir(out_dir) else []
+    if not paths:
+        return pd.DataFrame(columns=SCHEMA.names)
+    return pa.concat_tables([read_snapshot(os.path.join(out_dir, p)) for p in paths]).to_pandas()
+
+def _one_batch(table: pa.Table) -> pa.RecordBatch:
+    batches = table.combine_chunks().to_batches()
+    return batches[0] if batches else pa.RecordBatch.from_pylist([], schema=SCHEMA)
+
+def store_version(root: str = SNAPSHOT_DIR) -> int:
+    """Version of the store file CURRENT points at (0 if none)."""
+    try:
+        with open(os.path.join(root, "CURRENT")) as f:
+            return int(f.read().strip().split("-")[1].split(".")[0])
+    except (FileNotFoundError, IndexError, ValueError):
+        return 0
+
+def write_store(root: str = SNAPSHOT_DIR) -> Optional[str]:
+    """Consolidate every season's LATEST snapshot into a new store file and repoint CURRENT."""
+    tables = load_latest(root)
+    if not tables:
+        return None
+
+    batches, index = [], {}
+    for season, table in sorted(tables.items()):
+        index[str(season)] = {"all": len(batches), "qualified": len(batches) + 1}
+        batches.append(_one_batch(table))
+        batches.append(_one_batch(table.filter(pc.equal(table["qualified"], True))))
+
+    version = store_version(root) + 1
+    name = f"store-{version:06d}.arrow"
+    schema = SCHEMA.with_metadata({"version": str(version), "index": json.dumps(index)})
+    path = os.path.join(root, name)
+    with pa.OSFile(path + ".tmp", "wb") as sink:
+        with pa.ipc.new_file(sink, schema) as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+    os.replace(path + ".tmp", path)
+
+    pointer_tmp = os.path.join(root, "CURRENT.tmp")
+    with open(pointer_tmp, "w") as f:
+        f.write(name)
+    os.replace(pointer_tmp, os.path.join(root, "CURRENT"))
+
+    # unlinking is safe even if a worker still has an old file mapped
+    stale = sorted(e for e in os.listdir(root) if e.startswith("store-") and e.endswith(".arrow"))[:-STORE_KEEP]
+    for entry in stale:
+        os.remove(os.path.join(root, entry))
+    return path
+
+def export_all(conn: sqlite3.Connection, root: str = SNAPSHOT_DIR) -> None:
+    """Export the latest snapshot of every season (first-time setup)."""
+    for (season,) in conn.execute("SELECT DISTINCT season_id FROM snapshots ORDER BY season_id").fetchall():
+        snapshot_id = store.latest_snapshot_id(conn, season)
+        path = export_snapshot(conn, snapshot_id, root)
+        print(f"Season {season}: snapshot {snapshot_id} -> {path}")
+    print(f"Store -> {write_store(root)}")
+
+if __name__ == "__main__":
+    conn = store.connect()
+    export_all(conn)
+    conn.close()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Resilient calls into nba_api for the pull stage.
+
+- Fetcher.call() retries a request with bounded exponential backoff and full
+  jitter, and paces calls with an adaptive delay: it backs off sharply on
+  429s/timeouts and slow responses and creeps back toward the floor while
+  the endpoint is healthy.
+- A circuit breaker opens after several consecutive requests exhaust their
+  retries; further calls fail fast with CircuitOpen so a dead endpoint isn't
+  hammered for the rest of the run.
+- MissingGames is a small JSON ledger of game IDs that could not be fetched.
+  The next run fetches those first, so a hiccup never silently drops a game
+  from the season totals for good.
+"""
+
+from __future__ import annotations
+import json
+import os
+import random
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+import requests
+
+STATE_DIR = os.getenv("ETL_STATE_DIR", "../db/state")
+
+MAX_ATTEMPTS = 4          # per request, including the first try
+BACKOFF_BASE_SEC = 1.0    # first retry waits up to this long, doubling per attempt
+BACKOFF_CAP_SEC = 30.0
+MIN_DELAY_SEC = float(os.getenv("ETL_MIN_DELAY_SEC", "0.6"))  # floor between requests (0 against a local replay)
+MAX_DELAY_SEC = 15.0
+SLOW_RESPONSE_SEC = 5.0   # responses slower than this push the delay up
+BREAKER_THRESHOLD = 3     # consecutive failed requests before the circuit opens
+
+class FetchError(Exception):
+    """A request failed after all retries."""
+
+class CircuitOpen(FetchError):
+    """Too many consecutive failures; the endpoint is being left alone for this run."""
+
+def is_throttled(exc: BaseException) -> bool:
+    """429s and timeouts mean 'slow down', not 'this game is broken'."""
+    response = getattr(exc, "response", None)
+    if getattr(response, "status_code", None) == 429:
+        return True
+    if isinstance(exc, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)):
+        return True
+    return "429" in str(exc) or "Too Many Requests" in str(exc)
+
+class Fetcher:
+    def __init__(self, min_delay: float = MIN_DELAY_SEC, max_attempts: int = MAX_ATTEMPTS,
+                 breaker_threshold: int = BREAKER_THRESHOLD, sleep: Callable[[float], None] = time.sleep):
+        self.min_delay = min_delay
+        self.delay = min_delay
+        self.max_attempts = max_attempts
+        self.breaker_threshold = breaker_threshold
+        self.sleep = sleep
+        self.consecutive_failures = 0
+        self._last_call = 0.0
+        self.stats = {"requests": 0, "retries": 0, "throttled": 0, "failed": 0}
+
+    @property
+    def open(self) -> bool:
+        return self.consecutive_failures >= self.breaker_threshold
+
+    def _pace(self) -> None:
+        wait = self._last_call + self.delay - time.monotonic()
+        if wait > 0:
+            self.sleep(wait)
+        self._last_call = time.monotonic()
+
+    def _observe(self, latency: float, throttled: bool = False) -> None:
+        """AIMD-style delay: multiplicative increase on pressure, additive decrease when healthy."""
+        if throttled:
+            self.delay = min(MAX_DELAY_SEC, max(self.delay * 2, BACKOFF_BASE_SEC))
+        elif latency > SLOW_RESPONSE_SEC:
+            self.delay = min(MAX_DELAY_SEC, self.delay * 1.25)
+        else:
+            self.delay = max(self.min_delay, self.delay - 0.1)
+
+    def call(self, fn: Callable, *args, **kwargs):
+        if self.open:
+            raise CircuitOpen(f"{self.consecutive_failures} consecutive failures")
+
+        for attempt in range(1, self.max_attempts + 1):
+            self._pace()
+            started = time.monotonic()
+            self.stats["requests"] += 1
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                throttled = is_throttled(e)
+                self.stats["throttled"] += throttled
+                self._observe(time.monotonic() - started, throttled)
+                if attempt == self.max_attempts:
+                    self.consecutive_failures += 1
+                    self.stats["failed"] += 1
+                    raise FetchError(f"{getattr(fn, '__name__', fn)}{args}: {e}") from e
+                self.stats["retries"] += 1
+                # full jitter: uniform(0, min(cap, base * 2^n))
+                self.sleep(random.uniform(0, min(BACKOFF_CAP_SEC, BACKOFF_BASE_SEC * 2 ** (attempt - 1))))
+                continue
+            self._observe(time.monotonic() - started)
+            self.consecutive_failures = 0
+            return result
+
+class MissingGames:
+    """Per-season ledger of game IDs the pull could not fetch, retried first next run."""
+
+    def __init__(self, season: int, state_dir: str = STATE_DIR):
+        self.path = os.path.join(state_dir, f"missing_games_{season}.json")
+        self.games: Dict[str, dict] = {}
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                self.games = json.load(f)
+
+    def first(self, game_ids: Iterable[str]) -> List[str]:
+        """Order game_ids with previously missing games at the front."""
+        game_ids = list(game_ids)
+        known = set(game_ids)
+        retry = [g for g in self.games if g in known]
+        retry_set = set(retry)
+        return retry + [g for g in game_ids if g not in retry_set]
+
+    def record(self, game_id: str, error: Optional[BaseException] = None, game_date: Optional[str] = None) -> None:
+        entry = self.games.setdefault(game_id, {"attempts": 0})
+        entry["attempts"] += 1
+        if game_date:
+            entry["game_date"] = str(game_date)[:10]
+        entry["last_error"] = str(error)[:200] if error else None
+        entry["last_attempt"] = datetime.now().isoformat(timespec="seconds")
+
+    def earliest_date(self) -> Optional[str]:
+        """Oldest game date in the ledger (discovery has to reach back that far)."""
+        dates = [g["game_date"] for g in self.games.values() if g.get("game_date")]
+        return min(dates) if dates else None
+
+    def resolve(self, game_id: str) -> None:
+        self.games.pop(game_id, None)
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.games, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.path)
+
+    def __len__(self) -> int:
+        return len(self.games)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+On-disk cache of normalized per-game rows, plus the ledger of processed games.
+
+Each season keeps everything the pull has already fetched:
+
+    season=2025/player_rows.parquet   one row per player per game (pull.fetch_season_rows shape)
+    season=2025/team_rows.parquet     one row per team per game
+    season=2025/processed.json        {"last_game_date": ..., "game_ids": [...]}
+
+A daily run asks LeagueGameLog only for games on or after last_game_date,
+fetches the IDs not already in the ledger, and appends them here, so it
+makes a handful of requests instead of re-downloading the whole season.
+"""
+
+from __future__ import annotations
+import json
+import os
+from typing import Iterable, Optional, Set, Tuple
+
+import pandas as pd
+
+CACHE_DIR = os.getenv("ETL_CACHE_DIR", "../db/cache")
+
+# one row per key; a game refetched after an interrupted append replaces its earlier rows
+ROW_KEYS = {"player_rows": ["game_id", "nba_player_id"], "team_rows": ["game_id", "nba_team_id"]}
+
+class GameCache:
+    def __init__(self, season: int, root: str = CACHE_DIR):
+        self.season = season
+        self.dir = os.path.join(root, f"season={season}")
+        self.ledger_path = os.path.join(self.dir, "processed.json")
+        self.game_ids: Set[str] = set()
+        self.last_game_date: Optional[str] = None
+        if os.path.exists(self.ledger_path):
+            with open(self.ledger_path) as f:
+                ledger = json.load(f)
+            self.game_ids = set(ledger.get("game_ids", []))
+            self.last_game_date = ledger.get("last_game_date")
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.dir, f"{name}.parquet")
+
+    def _read(self, name: str) -> pd.DataFrame:
+        path = self._path(name)
+        return pd.read_parquet(path) if os.path.exists(path) and self.game_ids else pd.DataFrame()
+
+    def load(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """(player rows, team rows) for every processed game."""
+        return self._read("player_rows"), self._read("team_rows")
+
+    def _write(self, name: str, df: pd.DataFrame) -> None:
+        tmp = self._path(name) + ".tmp"
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, self._path(name))
+
+    def _merge(self, name: str, cached: pd.DataFrame, fetched: pd.DataFrame) -> pd.DataFrame:
+        if cached.empty:
+            return fetched
+        merged = pd.concat([cached, fetched], ignore_index=True)
+        return merged.drop_duplicates(subset=ROW_KEYS[name], keep="last", ignore_index=True)
+
+    def append(self, player_rows: pd.DataFrame, team_rows: pd.DataFrame, game_ids: Iterable[str]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Add newly fetched games; returns the full (player rows, team rows) for the season."""
+        cached_players, cached_teams = self.load()
+        game_ids = set(game_ids) - self.game_ids
+        if not game_ids:
+            return (cached_players if not cached_players.empty else player_rows,
+                    cached_teams if not cached_teams.empty else team_rows)
+
+        players = self._merge("player_rows", cached_players, player_rows)
+        teams = self._merge("team_rows", cached_teams, team_rows)
+
+        os.makedirs(self.dir, exist_ok=True)
+        self._write("player_rows", players)
+        self._write("team_rows", teams)
+
+        # ledger last: after a crash between writes these games are refetched next
+        # run, and _merge drops the copies the parquet files already hold
+        self.game_ids |= game_ids
+        dates = pd.to_datetime(players["game_date"]) if not players.empty else pd.Series(dtype="datetime64[ns]")
+        self.last_game_date = dates.max().date().isoformat() if not dates.empty else self.last_game_date
+        tmp = self.ledger_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"last_game_date": self.last_game_date, "game_ids": sorted(self.game_ids)}, f)
+        os.replace(tmp, self.ledger_path)
+        return players, teams
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Player identity resolution across seasons and sources.
+
+Every importer used to mint its own player key (the first ten letters of the
+name, a Basketball-Reference slug, an NBA.com PLAYER_ID), so the same person
+could end up as several players rows and different people could collide on
+one key. IdentityResolver maps incoming (name, bbref id, NBA id) records to
+players.player_id:
+
+1. exact id: a bbref or NBA id already in the crosswalk
+2. exact name: the accent-folded name (normalize_name) of a known player
+3. fuzzy: candidates come from a blocking index (Soundex of the last name +
+   first initial, of the first name + last initial, and of the first name +
+   joined surname), then every
+   candidate pair in the batch is scored at once as the cosine of hashed
+   character-trigram vectors. A match needs MATCH_THRESHOLD and a
+   MATCH_MARGIN lead over the next-best name; otherwise it's a new player.
+
+Ids that were linked are kept in player_crosswalk (one row per player_id),
+so later imports match on ids first.
+
+players.person_id is the canonical integer key for a real player: rows
+created before the resolver existed (one per import) share the person_id
+of their oldest row, and new players get their own player_id. Cross-season
+joins go through it instead of comparing names.
+"""
+
+import re
+import sqlite3
+import zlib
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from normalize_player_names import normalize_name, ensure_normalized_column, normalize_players
+
+MATCH_THRESHOLD = 0.9
+MATCH_MARGIN = 0.05
+HASH_DIMS = 512
+MAX_BLOCK = 200  # blocks this common don't narrow anything down; they're skipped
+SUFFIXES = {"jr", "sr", "ii", "iii", "iv", "v"}
+
+BBREF_ID = re.compile(r"^[a-z]{2,7}[0-9]{2}$")  # jamesle01
+NBA_ID = re.compile(r"^[0-9]+$")  # 2544
+
+_SOUNDEX = str.maketrans("bfpvcgjkqsxzdtlmnr", "111122222222334556")
+
+def extract_bbref_id(href) -> Optional[str]:
+    """Basketball-Reference id from a player URL (/players/j/jamesle01.html) or a bare id."""
+    if not isinstance(href, str):
+        return None
+    match = re.search(r"/players/[a-z]/([^./]+)\.html", href)
+    slug = match.group(1) if match else href.strip()
+    return slug if BBREF_ID.match(slug) else None
+
+def bbref_ids(df) -> List[Optional[str]]:
+    """Per-row bbref ids from a CSV's player URL column (or a BBRef export's Player-additional)."""
+    for column in ("player_url", "Player-additional"):
+        if column in df.columns:
+            return [extract_bbref_id(value) for value in df[column]]
+    return [None] * len(df)
+
+def _position(value) -> Optional[str]:
+    # CSV blanks arrive as NaN or ""; neither is a position
+    return (value.strip() or None) if isinstance(value, str) else None
+
+PERSON_INDEX_DDL = "CREATE INDEX IF NOT EXISTS ix_players_person_id ON players (person_id)"
+
+def create_tables(conn: sqlite3.Connection) -> None:
+    """Schema and backfills the resolver needs; commits, so run it once at setup, not mid-import."""
+    ensure_normalized_column(conn)
+    normalize_players(conn, only_missing=True)
+    try:
+        conn.execute("ALTER TABLE players ADD COLUMN person_id INTEGER")
+    except sqlite3.OperationalError:
+        pass
+    conn.execute(PERSON_INDEX_DDL)
+    # same grouping as api/migrations/*/0003_player_person_id.sql
+    conn.execute("""
+        UPDATE players SET person_id = COALESCE(
+            (SELECT MIN(p2.player_id) FROM players p2 WHERE p2.normalized_name = players.normalized_name),
+            player_id
+        ) WHERE person_id IS NULL
+    """)
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS player_crosswalk (
+            player_id INTEGER PRIMARY KEY REFERENCES players(player_id),
+            bbref_id TEXT UNIQUE,
+            nba_id TEXT UNIQUE,
+            method TEXT,  -- how the player was last matched: id, name, fuzzy, new
+            score REAL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+    """)
+    # players keyed before the crosswalk existed: their nba_player_id is a bbref
+    # slug (import_csv), an NBA.com PLAYER_ID (the ETL) or a name-derived key
+    rows = conn.execute("""
+        SELECT player_id, nba_player_id FROM players
+        WHERE player_id NOT IN (SELECT player_id FROM player_crosswalk)
+    """).fetchall()
+    conn.executemany(
+        "INSERT OR IGNORE INTO player_crosswalk (player_id, bbref_id, nba_id, method) VALUES (?, ?, ?, 'legacy')",
+        [(pid, key if BBREF_ID.match(key or "") else None, key if NBA_ID.match(key or "") else None)
+         for pid, key in rows],
+    )
+
+def soundex(token: str) -> str:
+    if not token:
+        return ""
+    digits = token.translate(_SOUNDEX)
+    code, last = token[0], digits[0]
+    for ch, d in zip(token[1:], digits[1:]):
+        if d.isdigit() and d != last:
+            code += d
+        if ch not in "hw":
+            last = d
+        if len(code) == 4:
+            break
+    return code.ljust(4, "0")
+
+def _core(normalized: str) -> List[str]:
+    """Name tokens without generational suffixes (unless that's all there is)."""
+    return [t for t in normalized.split() if t not in SUFFIXES] or normalized.split()
+
+def blocking_keys(normalized: str) -> List[str]:
+    tokens = _core(normalized)
+    if not tokens:
+        return []
+    first, last = tokens[0], tokens[-1]
+    if len(tokens) == 1:
+        return ["o" + soundex(first)]
+    # the third key joins the surname tokens, so "Gilgeous Alexander" meets "Gilgeous-Alexander"
+    return ["l" + soundex(last) + first[0], "f" + soundex(first) + last[0],
+            "c" + soundex(first) + soundex("".join(tokens[1:]))]
+
+def trigram_vectors(names: Sequence[str]) -> np.ndarray:
+    """
+    L2-normalized hashed character-trigram counts, one row per normalized
+    name, over the suffix-less tokens run together (so spacing, hyphens and
+    Jr./III don't count against a match).
+    """
+    rows, cols = [], []
+    for i, name in enumerate(names):
+        padded = "  " + "".join(_core(name)) + " "
+        for j in range(len(padded) - 2):
+            rows.append(i)
+            cols.append(zlib.crc32(padded[j:j + 3].encode()) % HASH_DIMS)
+    vectors = np.zeros((len(names), HASH_DIMS), dtype=np.float32)
+    np.add.at(vectors, (np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp)), 1.0)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+class Match(NamedTuple):
+    player_id: Optional[int]  # the person_id of the matched player
+    score: float
+    method: str  # id, name, fuzzy, new
+
+class IdentityResolver:
+    """
+    Snapshot of the players table for matching a batch of incoming records.
+    Expects create_tables to have run on conn (store.create_tables does); it
+    only reads here, and assign() only inserts, so both are safe mid-transaction.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, threshold: float = MATCH_THRESHOLD, margin: float = MATCH_MARGIN):
+        self.conn = conn
+        self.threshold = threshold
+        self.margin = margin
+        self.by_bbref: Dict[str, int] = {}
+        self.by_nba: Dict[str, int] = {}
+        self.keys = {key for (key,) in conn.execute("SELECT nba_player_id FROM players")}
+        # one entry per distinct normalized name, resolving to the person_id (the
+        # oldest players row of that person); ids are tracked per person too
+        self.names: List[str] = []
+        self.name_player: List[int] = []
+        self.name_index: Dict[str, int] = {}
+        self.player_ids: Dict[int, tuple] = {}  # person_id -> (bbref_id, nba_id)
+        for person_id, full_name, bbref_id, nba_id in conn.execute("""
+            SELECT p.person_id, p.full_name, c.bbref_id, c.nba_id
+            FROM players p LEFT JOIN player_crosswalk c ON c.player_id = p.player_id
+            ORDER BY p.player_id
+        """):
+            known_bbref, known_nba = self.player_ids.get(person_id, (None, None))
+            self.player_ids[person_id] = (known_bbref or bbref_id, known_nba or nba_id)
+            if bbref_id:
+                self.by_bbref[bbref_id] = person_id
+            if nba_id:
+                self.by_nba[nba_id] = person_id
+            self._add_name(normalize_name(full_name), person_id)
+        self._vectors = None
+
+    def _add_name(self, normalized: str, player_id: int) -> None:
+        if normalized and normalized not in self.name_index:
+            self.name_index[normalized] = len(self.names)
+            self.names.append(normalized)
+            self.name_player.append(player_id)
+            self._vectors = None
+
+    def _block_index(self) -> Dict[str, List[int]]:
+        index = defaultdict(list)
+        for i, name in enumerate(self.names):
+            for key in blocking_keys(name):
+                index[key].append(i)
+        return index
+
+    def _conflicts(self, player_id: int, bbref_id: Optional[str], nba_id: Optional[str]) -> bool:
+        known_bbref, known_nba = self.player_ids.get(player_id, (None, None))
+        return bool((bbref_id and known_bbref and bbref_id != known_bbref) or
+                    (nba_id and known_nba and nba_id != known_nba))
+
+    def resolve(self, names: Sequence[str], bbref_ids: Optional[Sequence] = None,
+                nba_ids: Optional[Sequence] = None) -> List[Match]:
+        """Match each record to a known player_id (player_id None means new player)."""
+        bbref_ids = list(bbref_ids) if bbref_ids is not None else [None] * len(names)
+        nba_ids = [str(x) if x not in (None, "") else None for x in nba_ids] if nba_ids is not None else [None] * len(names)
+        results: List[Optional[Match]] = [None] * len(names)
+        pending = []
+        for i, (name, bbref_id, nba_id) in enumerate(zip(names, bbref_ids, nba_ids)):
+            if bbref_id and bbref_id in self.by_bbref:
+                results[i] = Match(self.by_bbref[bbref_id], 1.0, "id")
+            elif nba_id and nba_id in self.by_nba:
+                results[i] = Match(self.by_nba[nba_id], 1.0, "id")
+            else:
+                normalized = normalize_name(name)
+                known = self.name_index.get(normalized)
+                if known is not None and not self._conflicts(self.name_player[known], bbref_id, nba_id):
+                    results[i] = Match(self.name_player[known], 1.0, "name")
+                else:
+                    pending.append(i)
+
+        # fuzzy: all (record, candidate) pairs from the blocking index, scored in one pass
+        if pending and self.names:
+            index = self._block_index()
+            pair_q, pair_c = [], []
+            for q, i in enumerate(pending):
+                blocks = (index.get(key, ()) for key in blocking_keys(normalize_name(names[i])))
+                candidates = {c for block in blocks if len(block) <= MAX_BLOCK for c in block}
+                for c in candidates:
+                    if not self._conflicts(self.name_player[c], bbref_ids[i], nba_ids[i]):
+                        pair_q.append(q)
+                        pair_c.append(c)
+            if pair_q:
+                if self._vectors is None:
+                    self._vectors = trigram_vectors(self.names)
+                queries = trigram_vectors([normalize_name(names[i]) for i in pending])
+                pair_q = np.array(pair_q)
+                pair_c = np.array(pair_c)
+                scores = np.einsum("ij,ij->i", queries[pair_q], self._vectors[pair_c])
+                # best and runner-up per record
+                order = np.lexsort((-scores, pair_q))
+                pair_q, pair_c, scores = pair_q[order], pair_c[order], scores[order]
+                first = np.flatnonzero(np.r_[True, pair_q[1:] != pair_q[:-1]])
+                has_second = (first + 1 < len(pair_q)) & (pair_q[np.minimum(first + 1, len(pair_q) - 1)] == pair_q[first])
+                runner_up = np.where(has_second, scores[np.minimum(first + 1, len(scores) - 1)], 0.0)
+                accept = (scores[first] >= self.threshold) & (scores[first] - runner_up >= self.margin)
+                for f, ok in zip(first, accept):
+                    if ok:
+                        results[pending[pair_q[f]]] = Match(self.name_player[pair_c[f]], round(float(scores[f]), 4), "fuzzy")
+
+        return [r if r is not None else Match(None, 0.0, "new") for r in results]
+
+    def _new_key(self, normalized: str, bbref_id: Optional[str], nba_id: Optional[str]) -> str:
+        for key in (nba_id, bbref_id):
+            if key and key not in self.keys:
+                return key
+        base = "hq-" + (normalized.replace(" ", "-") or "unknown")
+        key, n = base, 1
+        while key in self.keys:
+            n += 1
+            key = f"{base}-{n}"
+        return key
+
+    def assign(self, names: Sequence[str], positions: Optional[Sequence] = None,
+               bbref_ids: Optional[Sequence] = None, nba_ids: Optional[Sequence] = None) -> List[int]:
+        """
+        Resolve the records, insert players for the ones that didn't match and
+        record newly linked ids in player_crosswalk. Returns each record's
+        person_id (the player_id of the person's canonical row) in input order.
+        """
+        positions = [_position(p) for p in positions] if positions is not None else [None] * len(names)
+        bbref_ids = list(bbref_ids) if bbref_ids is not None else [None] * len(names)
+        nba_ids = [str(x) if x not in (None, "") else None for x in nba_ids] if nba_ids is not None else [None] * len(names)
+        matches = self.resolve(names, bbref_ids, nba_ids)
+
+        player_ids: List[int] = []
+        crosswalk: Dict[int, tuple] = {}
+        minted: Dict[str, int] = {}  # a traded player appears once per team in the same batch
+        for name, pos, bbref_id, nba_id, match in zip(names, positions, bbref_ids, nba_ids, matches):
+            player_id = match.player_id
+            if player_id is not None and self._conflicts(player_id, bbref_id, nba_id):
+                player_id = None  # an earlier record in this batch already linked a different id
+            if player_id is None:
+                normalized = normalize_name(name)
+                ident = bbref_id or nba_id or normalized
+                player_id = minted.get(ident)
+                if player_id is None:
+                    key = self._new_key(normalized, bbref_id, nba_id)
+                    player_id = self.conn.execute(
+                        "INSERT INTO players (nba_player_id, full_name, primary_pos, normalized_name) VALUES (?, ?, ?, ?)",
+                        (key, name, pos or None, normalized),
+                    ).lastrowid
+                    self.conn.execute("UPDATE players SET person_id = player_id WHERE player_id = ?", (player_id,))
+                    minted[ident] = player_id
+                    self.keys.add(key)
+                    self.player_ids[player_id] = (None, None)
+                    self._add_name(normalized, player_id)
+            # link only ids nobody holds yet; a person's other rows may already carry some
+            new_bbref = bbref_id if bbref_id and bbref_id not in self.by_bbref else None
+            new_nba = nba_id if nba_id and nba_id not in self.by_nba else None
+            if new_bbref or new_nba or match.player_id is None:
+                known_bbref, known_nba = self.player_ids[player_id]
+                self.player_ids[player_id] = (known_bbref or new_bbref, known_nba or new_nba)
+                if new_bbref:
+                    self.by_bbref[new_bbref] = player_id
+                if new_nba:
+                    self.by_nba[new_nba] = player_id
+                _, linked_bbref, linked_nba, _, _ = crosswalk.get(player_id, (None,) * 5)
+                crosswalk[player_id] = (player_id, linked_bbref or new_bbref, linked_nba or new_nba,
+                                        match.method, match.score or None)
+            player_ids.append(player_id)
+
+        self.conn.executemany("""
+            INSERT INTO player_crosswalk (player_id, bbref_id, nba_id, method, score) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (player_id) DO UPDATE SET
+                bbref_id = COALESCE(player_crosswalk.bbref_id, excluded.bbref_id),
+                nba_id = COALESCE(player_crosswalk.nba_id, excluded.nba_id),
+                method = excluded.method, score = excluded.score, updated_at = CURRENT_TIMESTAMP
+        """, list(crosswalk.values()))
+        return player_ids
+
+def resolve_players(conn: sqlite3.Connection, names: Sequence[str], positions: Optional[Sequence] = None,
+                    bbref_ids: Optional[Sequence] = None, nba_ids: Optional[Sequence] = None) -> List[int]:
+    """One-shot IdentityResolver(conn).assign(...)."""
+    return IdentityResolver(conn).assign(names, positions, bbref_ids, nba_ids)
+
+if __name__ == "__main__":
+    import sys
+    conn = sqlite3.connect(sys.argv[1] if len(sys.argv) > 1 else "../db/husseyquation.sqlite")
+    create_tables(conn)
+    resolver = IdentityResolver(conn)
+    for name in sys.argv[2:] or ["Alperen Sengun", "Nikola Jokic", "Gary Trent"]:
+        print(f"{name!r}: {resolver.resolve([name])[0]}")
@@ -7,7 +7,8 @@ import pandas as pd
 import sqlite3
 from pathlib import Path
 from datetime import datetime
-import re
+
+from identity import bbref_ids, resolve_players, create_tables as create_identity_tables
 
 def clear_existing_2023_data(conn):
     """Clear existing 2023 data if any"""
@@ -45,6 +46,7 @@ def import_2022_2023_season(csv_path, db_path):
     
     # Connect to database
     conn = sqlite3.connect(db_path)
+    create_identity_tables(conn)
     
     # Clear existing data
     clear_existing_2023_data(conn)
@@ -67,6 +69,14 @@ def import_2022_2023_season(csv_path, db_path):
     
     print(f"Created snapshot {snapshot_id} for 2022-23 season")
     
+    # Match every name against existing players (accents, suffixes, spelling
+    # variants across seasons) in one batch before the row loop
+    names = df['Player'].astype(str).str.strip()
+    valid = (names != '') & (names != 'Player')
+    player_ids = dict(zip(names[valid].index, resolve_players(
+        conn, names[valid].tolist(), df.loc[valid, 'Pos'].tolist(), bbref_ids(df[valid])
+    )))
+
     # Process each player
     for idx, row in df.iterrows():
         try:
@@ -77,27 +87,7 @@ def import_2022_2023_season(csv_path, db_path):
             team = row['Tm'].strip() if row['Tm'] else 'UNK'
             position = row['Pos'].strip() if row['Pos'] else ''
             
-            # Create a simple player ID based on name
-            player_id_str = re.sub(r'[^a-zA-Z0-9]', '', player_name.lower())[:10]
-            
-            # Insert or get player
-            cursor.execute('''
-                INSERT OR IGNORE INTO players (nba_player_id, full_name, primary_pos)
-                VALUES (?, ?, ?)
-            ''', (player_id_str, player_name, position))
-            
-            # Get player_id
-            cursor.execute('SELECT player_id FROM players WHERE full_name = ?', (player_name,))
-            player_result = cursor.fetchone()
-            if not player_result:
-                # Insert if not found
-                cursor.execute('''
-                    INSERT INTO players (nba_player_id, full_name, primary_pos)
-                    VALUES (?, ?, ?)
-                ''', (f"2022_{idx}", player_name, position))
-                player_id = cursor.lastrowid
-            else:
-                player_id = player_result[0]
+            player_id = player_ids[idx]
             
             # Insert team
             cursor.execute('INSERT OR IGNORE INTO teams (abbr) VALUES (?)', (team,))
@@ -205,19 +195,11 @@ def import_2022_2023_season(csv_path, db_path):
         print(f"{rank:4d} | {name:<20} | {team:3s} | {score:7.1f} | {per:4.1f} | {ws:4.1f} | {bpm:5.1f} | {vorp:4.1f}")
     
     # Update normalized names for new players
-    from normalize_player_names import normalize_name
-    cursor.execute('SELECT player_id, full_name FROM players WHERE normalized_name IS NULL')
-    new_players = cursor.fetchall()
-    
-    if new_players:
-        print(f"\nUpdating normalized names for {len(new_players)} new players...")
-        for player_id, full_name in new_players:
-            normalized = normalize_name(full_name)
-            cursor.execute(
-                'UPDATE players SET normalized_name = ? WHERE player_id = ?',
-                (normalized, player_id)
-            )
-        conn.commit()
+    from normalize_player_names import ensure_normalized_column, normalize_players
+    ensure_normalized_column(conn)
+    updated = normalize_players(conn, only_missing=True)
+    if updated:
+        print(f"\nNormalized names for {updated} new players")
     
     conn.close()
     return snapshot_id
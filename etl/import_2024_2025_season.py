@@ -7,7 +7,8 @@ import pandas as pd
 import sqlite3
 from pathlib import Path
 from datetime import datetime
-import re
+
+from identity import bbref_ids, resolve_players, create_tables as create_identity_tables
 
 def create_tables(conn):
     """Create the necessary database tables"""
@@ -82,9 +83,12 @@ def create_tables(conn):
         )
     ''')
     
-    # Add year-over-year comparison view
+    # Add year-over-year comparison view. Players rows from different imports
+    # share a person_id, so the previous season joins on that.
+    create_identity_tables(conn)
+    cursor.execute('DROP VIEW IF EXISTS year_over_year_comparison')
     cursor.execute('''
-        CREATE VIEW IF NOT EXISTS year_over_year_comparison AS
+        CREATE VIEW year_over_year_comparison AS
         SELECT 
             current.player_id,
             p.full_name as player_name,
@@ -96,14 +100,17 @@ def create_tables(conn):
             (previous.huss_score - current.huss_score) as score_change
         FROM player_snapshot_ranks current
         JOIN players p ON current.player_id = p.player_id
-        LEFT JOIN player_snapshot_ranks previous ON 
-            current.player_id = previous.player_id 
-            AND previous.snapshot_id = (
+        LEFT JOIN (
+            SELECT pp.person_id, pr.huss_rank, pr.huss_score
+            FROM player_snapshot_ranks pr
+            JOIN players pp ON pr.player_id = pp.player_id
+            WHERE pr.snapshot_id = (
                 SELECT snapshot_id FROM snapshots 
                 WHERE season_id = 2024 
                 ORDER BY snapshot_date DESC 
                 LIMIT 1
             )
+        ) previous ON previous.person_id = p.person_id
         WHERE current.snapshot_id = (
             SELECT snapshot_id FROM snapshots 
             WHERE season_id = 2025 
@@ -151,6 +158,14 @@ def import_2024_2025_season(csv_path, db_path):
     
     print(f"Created snapshot {snapshot_id} for 2024-25 season")
     
+    # Match every name against existing players (accents, suffixes, spelling
+    # variants across seasons) in one batch before the row loop
+    names = df['Player'].astype(str).str.strip()
+    valid = (names != '') & (names != 'Player')
+    player_ids = dict(zip(names[valid].index, resolve_players(
+        conn, names[valid].tolist(), df.loc[valid, 'Pos'].tolist(), bbref_ids(df[valid])
+    )))
+
     # Process each player
     for idx, row in df.iterrows():
         try:
@@ -161,27 +176,7 @@ def import_2024_2025_season(csv_path, db_path):
             team = row['Tm'].strip() if row['Tm'] else 'UNK'
             position = row['Pos'].strip() if row['Pos'] else ''
             
-            # Create a simple player ID based on name
-            player_id_str = re.sub(r'[^a-zA-Z0-9]', '', player_name.lower())[:10]
-            
-            # Insert player
-            cursor.execute('''
-                INSERT OR IGNORE INTO players (nba_player_id, full_name, primary_pos)
-                VALUES (?, ?, ?)
-            ''', (player_id_str, player_name, position))
-            
-            # Get player_id
-            cursor.execute('SELECT player_id FROM players WHERE full_name = ?', (player_name,))
-            player_result = cursor.fetchone()
-            if not player_result:
-                # Insert if not found
-                cursor.execute('''
-                    INSERT INTO players (nba_player_id, full_name, primary_pos)
-                    VALUES (?, ?, ?)
-                ''', (f"generated_{idx}", player_name, position))
-                player_id = cursor.lastrowid
-            else:
-                player_id = player_result[0]
+            player_id = player_ids[idx]
             
             # Insert team
             cursor.execute('INSERT OR IGNORE INTO teams (abbr) VALUES (?)', (team,))
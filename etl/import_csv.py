@@ -7,7 +7,8 @@ import pandas as pd
 import sqlite3
 from pathlib import Path
 from datetime import datetime
-import re
+
+from identity import bbref_ids, resolve_players, create_tables as create_identity_tables
 
 def create_tables(conn):
     """Create the necessary database tables"""
@@ -82,15 +83,9 @@ def create_tables(conn):
         )
     ''')
     
+    create_identity_tables(conn)
     conn.commit()
 
-def extract_player_id(href):
-    """Extract player ID from Basketball Reference URL"""
-    if not href or pd.isna(href):
-        return None
-    match = re.search(r'/players/[a-z]/([^.]+)\.html', href)
-    return match.group(1) if match else None
-
 def map_csv_columns(df):
     """Map the CSV columns to meaningful names based on Basketball Reference structure"""
     # Based on the sample data, this appears to be a Basketball Reference advanced stats table
@@ -162,32 +157,19 @@ def import_csv_data(csv_path, db_path):
     ''', (season_id, snapshot_date, 'basketball_reference_csv'))
     snapshot_id = cursor.lastrowid
     
+    # Match every player against existing ones (bbref id first, then name) in
+    # one batch before the row loop
+    valid = df['player_name'].notna() & (df['player_name'] != 'Player')
+    player_ids = dict(zip(df.index[valid], resolve_players(
+        conn, df.loc[valid, 'player_name'].str.strip().tolist(), df.loc[valid, 'pos'].tolist(), bbref_ids(df[valid])
+    )))
+
     # Process each player
     for idx, row in df.iterrows():
-        if pd.isna(row['player_name']) or row['player_name'] == 'Player':
+        if not valid[idx]:
             continue
-            
-        # Extract player ID from URL
-        player_id_str = extract_player_id(row['player_url'])
-        
-        # Insert player
-        cursor.execute('''
-            INSERT OR IGNORE INTO players (nba_player_id, full_name, primary_pos)
-            VALUES (?, ?, ?)
-        ''', (player_id_str, row['player_name'], row['pos']))
-        
-        # Get player_id
-        cursor.execute('SELECT player_id FROM players WHERE nba_player_id = ? OR full_name = ?', (player_id_str, row['player_name']))
-        player_result = cursor.fetchone()
-        if not player_result:
-            # Insert with a generated ID if lookup fails
-            cursor.execute('''
-                INSERT INTO players (nba_player_id, full_name, primary_pos)
-                VALUES (?, ?, ?)
-            ''', (f"generated_{idx}", row['player_name'], row['pos']))
-            player_id = cursor.lastrowid
-        else:
-            player_id = player_result[0]
+
+        player_id = player_ids[idx]
         
         # Insert team
         cursor.execute('INSERT OR IGNORE INTO teams (abbr) VALUES (?)', (row['team'],))
@@ -7,7 +7,8 @@ import pandas as pd
 import sqlite3
 from pathlib import Path
 from datetime import datetime
-import re
+
+from identity import bbref_ids, resolve_players, create_tables as create_identity_tables
 
 def create_tables(conn):
     """Create the necessary database tables"""
@@ -82,6 +83,7 @@ def create_tables(conn):
         )
     ''')
     
+    create_identity_tables(conn)
     conn.commit()
 
 def import_new_csv_data(csv_path, db_path):
@@ -121,6 +123,14 @@ def import_new_csv_data(csv_path, db_path):
     
     print(f"Created snapshot {snapshot_id}")
     
+    # Match every name against existing players (accents, suffixes, spelling
+    # variants across seasons) in one batch before the row loop
+    names = df['Player'].astype(str).str.strip()
+    valid = (names != '') & (names != 'Player')
+    player_ids = dict(zip(names[valid].index, resolve_players(
+        conn, names[valid].tolist(), df.loc[valid, 'Pos'].tolist(), bbref_ids(df[valid])
+    )))
+
     # Process each player
     for idx, row in df.iterrows():
         try:
@@ -131,27 +141,7 @@ def import_new_csv_data(csv_path, db_path):
             team = row['Tm'].strip() if row['Tm'] else 'UNK'
             position = row['Pos'].strip() if row['Pos'] else ''
             
-            # Create a simple player ID based on name
-            player_id_str = re.sub(r'[^a-zA-Z0-9]', '', player_name.lower())[:10]
-            
-            # Insert player
-            cursor.execute('''
-                INSERT OR IGNORE INTO players (nba_player_id, full_name, primary_pos)
-                VALUES (?, ?, ?)
-            ''', (player_id_str, player_name, position))
-            
-            # Get player_id
-            cursor.execute('SELECT player_id FROM players WHERE full_name = ?', (player_name,))
-            player_result = cursor.fetchone()
-            if not player_result:
-                # Insert if not found
-                cursor.execute('''
-                    INSERT INTO players (nba_player_id, full_name, primary_pos)
-                    VALUES (?, ?, ?)
-                ''', (f"generated_{idx}", player_name, position))
-                player_id = cursor.lastrowid
-            else:
-                player_id = player_result[0]
+            player_id = player_ids[idx]
             
             # Insert team
             cursor.execute('INSERT OR IGNORE INTO teams (abbr) VALUES (?)', (team,))
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Incrementally maintained all-time leaderboards.
+
+Every time a season-final snapshot is written, the per-player running
+aggregates in player_career_aggregates are adjusted by that season's
+contribution only, and the ready-to-serve rows in leaderboard_rows are
+rebuilt from those aggregates. leaderboard_meta.version is bumped on each
+change so the API can reload (and re-ETag) without polling row contents.
+
+Aggregates are per person (players.person_id, see identity.py), so a player
+imported under a different players row in some seasons still has one
+career line; leaderboard_rows.player_id is the person's canonical row.
+"""
+
+from __future__ import annotations
+import sqlite3
+from typing import Iterable, List, Optional, Tuple
+
+BOARD_SIZE = 25
+TOP_N = 10
+
+BOARDS = ("best_single_seasons", "most_number_ones", "most_top_tens")
+
+# (player_id, huss_rank, huss_score, qualified)
+FinalRow = Tuple[int, Optional[int], Optional[float], bool]
+
+# qualified, ranked season-final rows keyed by person
+COUNTED = """
+    SELECT COALESCE(p.person_id, f.player_id) AS person, f.season_id, f.huss_rank, f.huss_score
+    FROM season_final_ranks f
+    LEFT JOIN players p ON p.player_id = f.player_id
+    WHERE f.qualified = 1 AND f.huss_rank IS NOT NULL
+"""
+
+def create_tables(conn: sqlite3.Connection) -> None:
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS player_career_aggregates (
+            player_id INTEGER PRIMARY KEY REFERENCES players(player_id),  -- players.person_id
+            seasons_ranked INTEGER NOT NULL DEFAULT 0,
+            number_ones INTEGER NOT NULL DEFAULT 0,
+            top_tens INTEGER NOT NULL DEFAULT 0,
+            best_huss_score REAL,
+            best_huss_season INTEGER
+        );
+
+        CREATE TABLE IF NOT EXISTS leaderboard_rows (
+            board TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            player_id INTEGER REFERENCES players(player_id),
+            player_name TEXT,
+            season_id INTEGER,
+            value REAL,
+            PRIMARY KEY (board, position)
+        );
+
+        CREATE TABLE IF NOT EXISTS leaderboard_meta (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP
+        );
+
+        INSERT OR IGNORE INTO leaderboard_meta (id, version) VALUES (1, 0);
+
+        CREATE INDEX IF NOT EXISTS ix_career_ones ON player_career_aggregates (number_ones DESC);
+        CREATE INDEX IF NOT EXISTS ix_career_tens ON player_career_aggregates (top_tens DESC);
+    """)
+
+def _by_person(conn: sqlite3.Connection, rows: List[FinalRow]) -> List[FinalRow]:
+    """Re-key rows from player_id to person_id."""
+    ids = sorted({r[0] for r in rows})
+    person = dict(conn.execute(
+        f"SELECT player_id, COALESCE(person_id, player_id) FROM players WHERE player_id IN ({','.join('?' * len(ids))})",
+        ids,
+    )) if ids else {}
+    return [(person.get(r[0], r[0]),) + tuple(r[1:]) for r in rows]
+
+def _counted(row: FinalRow) -> bool:
+    return bool(row[3]) and row[1] is not None
+
+def _adjust(conn: sqlite3.Connection, rows: Iterable[FinalRow], sign: int) -> None:
+    conn.executemany("""
+        INSERT INTO player_career_aggregates (player_id, seasons_ranked, number_ones, top_tens)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(player_id) DO UPDATE SET
+            seasons_ranked = seasons_ranked + excluded.seasons_ranked,
+            number_ones = number_ones + excluded.number_ones,
+            top_tens = top_tens + excluded.top_tens
+    """, [
+        (r[0], sign, sign * int(r[1] == 1), sign * int(r[1] <= TOP_N))
+        for r in rows if _counted(r)
+    ])
+
+def _refresh_best(conn: sqlite3.Connection, season_id: int, rows: List[FinalRow], old_rows: List[FinalRow]) -> None:
+    # Players whose best season was the one being replaced have to look at
+    # their other seasons again; that's an indexed lookup per affected player.
+    stale = [r[0] for r in old_rows if _counted(r)]
+    stale_best = [
+        pid for (pid,) in conn.execute(
+            f"SELECT player_id FROM player_career_aggregates WHERE best_huss_season = ? "
+            f"AND player_id IN ({','.join('?' * len(stale))})",
+            (season_id, *stale),
+        )
+    ] if stale else []
+    for pid in stale_best:
+        best = conn.execute("""
+            SELECT f.season_id, f.huss_score
+            FROM players p
+            JOIN season_final_ranks f ON f.player_id = p.player_id
+            WHERE p.person_id = ? AND f.season_id != ? AND f.qualified = 1 AND f.huss_score IS NOT NULL
+            ORDER BY f.huss_score ASC, f.season_id ASC
+            LIMIT 1
+        """, (pid, season_id)).fetchone()
+        conn.execute(
+            "UPDATE player_career_aggregates SET best_huss_score = ?, best_huss_season = ? WHERE player_id = ?",
+            (best[1] if best else None, best[0] if best else None, pid),
+        )
+
+    conn.executemany("""
+        UPDATE player_career_aggregates
+        SET best_huss_score = ?, best_huss_season = ?
+        WHERE player_id = ? AND (best_huss_score IS NULL OR ? < best_huss_score)
+    """, [(r[2], season_id, r[0], r[2]) for r in rows if _counted(r) and r[2] is not None])
+
+def _rebuild_best_seasons(conn: sqlite3.Connection, season_id: int, rows: List[FinalRow], replacing: bool) -> None:
+    if replacing:
+        # The season's old entries may have pushed other seasons off the
+        # board, so the standing board can't be trusted; re-select the
+        # other seasons' best from season_final_ranks.
+        current = conn.execute(f"""
+            SELECT person, season_id, huss_score FROM ({COUNTED})
+            WHERE season_id != ? AND huss_score IS NOT NULL
+            ORDER BY huss_score, season_id
+            LIMIT ?
+        """, (season_id, BOARD_SIZE)).fetchall()
+    else:
+        # A new season can only add entries: merge the standing board with
+        # this season's best candidates.
+        current = conn.execute("""
+            SELECT player_id, season_id, value FROM leaderboard_rows
+            WHERE board = 'best_single_seasons'
+        """).fetchall()
+    fresh = sorted(
+        ((r[0], season_id, r[2]) for r in rows if _counted(r) and r[2] is not None),
+        key=lambda r: r[2],
+    )[:BOARD_SIZE]
+    merged = sorted(current + fresh, key=lambda r: (r[2], r[1]))[:BOARD_SIZE]
+
+    conn.execute("DELETE FROM leaderboard_rows WHERE board = 'best_single_seasons'")
+    conn.executemany("""
+        INSERT INTO leaderboard_rows (board, position, player_id, player_name, season_id, value)
+        SELECT 'best_single_seasons', ?, player_id, full_name, ?, ? FROM players WHERE player_id = ?
+    """, [(i, season, value, pid) for i, (pid, season, value) in enumerate(merged, 1)])
+
+def _rebuild_count_board(conn: sqlite3.Connection, board: str, column: str) -> None:
+    conn.execute("DELETE FROM leaderboard_rows WHERE board = ?", (board,))
+    top = conn.execute(f"""
+        SELECT a.player_id, p.full_name, a.{column}
+        FROM player_career_aggregates a
+        JOIN players p ON a.player_id = p.player_id
+        WHERE a.{column} > 0
+        ORDER BY a.{column} DESC, a.best_huss_score ASC
+        LIMIT ?
+    """, (BOARD_SIZE,)).fetchall()
+    conn.executemany("""
+        INSERT INTO leaderboard_rows (board, position, player_id, player_name, season_id, value)
+        VALUES (?, ?, ?, ?, NULL, ?)
+    """, [(board, i, pid, name, value) for i, (pid, name, value) in enumerate(top, 1)])
+
+def apply_season_final(conn: sqlite3.Connection, season_id: int, rows: List[FinalRow]) -> int:
+    """
+    Fold one season's final ranks into the running aggregates.
+
+    Must run before season_final_ranks is overwritten for season_id, so a
+    re-run of the same season can back out its previous contribution.
+    Returns the new leaderboard version.
+    """
+    old_rows: List[FinalRow] = _by_person(conn, conn.execute("""
+        SELECT player_id, huss_rank, huss_score, qualified
+        FROM season_final_ranks WHERE season_id = ?
+    """, (season_id,)).fetchall())
+    rows = _by_person(conn, rows)
+
+    _adjust(conn, old_rows, -1)
+    _adjust(conn, rows, +1)
+    _refresh_best(conn, season_id, rows, old_rows)
+
+    _rebuild_best_seasons(conn, season_id, rows, replacing=bool(old_rows))
+    _rebuild_count_board(conn, "most_number_ones", "number_ones")
+    _rebuild_count_board(conn, "most_top_tens", "top_tens")
+
+    conn.execute("""
+        UPDATE leaderboard_meta SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE id = 1
+    """)
+    return conn.execute("SELECT version FROM leaderboard_meta WHERE id = 1").fetchone()[0]
+
+def rebuild(conn: sqlite3.Connection) -> int:
+    """
+    Recompute the aggregates and boards from every season_final_ranks row,
+    keyed by person. Season-final rows themselves are left as they are.
+    Returns the new leaderboard version.
+    """
+    with conn:
+        conn.execute("DELETE FROM player_career_aggregates")
+        conn.execute(f"""
+            INSERT INTO player_career_aggregates (player_id, seasons_ranked, number_ones, top_tens)
+            SELECT person, COUNT(*), SUM(huss_rank = 1), SUM(huss_rank <= ?)
+            FROM ({COUNTED}) GROUP BY person
+        """, (TOP_N,))
+        conn.execute(f"""
+            UPDATE player_career_aggregates
+            SET (best_huss_score, best_huss_season) = (
+                SELECT c.huss_score, c.season_id FROM ({COUNTED}) c
+                WHERE c.person = player_career_aggregates.player_id AND c.huss_score IS NOT NULL
+                ORDER BY c.huss_score ASC, c.season_id ASC
+                LIMIT 1
+            )
+        """)
+
+        conn.execute("DELETE FROM leaderboard_rows WHERE board = 'best_single_seasons'")
+        conn.execute(f"""
+            INSERT INTO leaderboard_rows (board, position, player_id, player_name, season_id, value)
+            SELECT 'best_single_seasons', ROW_NUMBER() OVER (ORDER BY c.huss_score, c.season_id),
+                   c.person, p.full_name, c.season_id, c.huss_score
+            FROM ({COUNTED}) c
+            JOIN players p ON p.player_id = c.person
+            WHERE c.huss_score IS NOT NULL
+            ORDER BY c.huss_score, c.season_id
+            LIMIT ?
+        """, (BOARD_SIZE,))
+        _rebuild_count_board(conn, "most_number_ones", "number_ones")
+        _rebuild_count_board(conn, "most_top_tens", "top_tens")
+
+        conn.execute("""
+            UPDATE leaderboard_meta SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE id = 1
+        """)
+    return conn.execute("SELECT version FROM leaderboard_meta WHERE id = 1").fetchone()[0]
+
+def finalize_from_snapshots(conn: sqlite3.Connection, before_season: int) -> None:
+    """
+    One-off bootstrap: treat the latest stored snapshot of every completed
+    season as its season-final snapshot.
+    """
+    import store
+
+    seasons = [s for (s,) in conn.execute(
+        "SELECT DISTINCT season_id FROM snapshots WHERE season_id < ? ORDER BY season_id", (before_season,)
+    )]
+    # re-key what's already there (e.g. backfilled seasons without snapshots) by person,
+    # so the per-season replacements below back out matching contributions
+    rebuild(conn)
+    for season_id in seasons:
+        ranked = store.latest_snapshot_ranks(conn, season_id)
+        count = store.write_season_final(conn, season_id, ranked)
+        print(f"Season {season_id}: {count} season-final rows")
+
+if __name__ == "__main__":
+    import store
+    from run_daily import ACTIVE_SEASON
+
+    conn = store.connect()
+    finalize_from_snapshots(conn, ACTIVE_SEASON)
+    version = conn.execute("SELECT version FROM leaderboard_meta WHERE id = 1").fetchone()[0]
+    print(f"Leaderboards at version {version}")
+    conn.close()
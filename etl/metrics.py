@@ -1,132 +1,242 @@
+"""
+PER, Win Shares, WS/48, BPM and VORP in one vectorized pass.
+
+Team and league aggregates are computed once per call and broadcast to
+players by team code; every formula then works on plain NumPy arrays, so no
+intermediate DataFrame copies are made and a whole season evaluates in a few
+milliseconds (cheap enough for every snapshot and every backfilled season).
+
+Team context is either passed in (one row per team abbreviation, from the
+pulled team box scores -- see TEAM_COLUMNS; opp_* columns, `poss` and `g`
+are used when present) or summed from the player totals. Without opponent
+columns each team faces a league-average opponent over the same possessions.
+
+References: Hollinger PER and Oliver/BBR Win Shares as documented by
+Basketball-Reference; BPM 2.0 box coefficients (Myers), evaluated at a
+neutral position (3.0) because the pull has no position estimate.
+"""
+
 from __future__ import annotations
+from typing import Dict
 import pandas as pd
 import numpy as np
 
-def compute_per(season_totals: pd.DataFrame) -> pd.Series:
+# counting stats every team context carries (pts = 2*fgm + fg3m + ftm)
+TEAM_COLUMNS = ["mp", "fga", "fgm", "fg3a", "fg3m", "fta", "ftm",
+                "oreb", "dreb", "trb", "ast", "stl", "blk", "tov", "pf", "pts"]
+OPP_COLUMNS = ["fga", "fgm", "fg3m", "fta", "ftm", "oreb", "dreb", "tov", "pts"]
+
+# BPM 2.0 per-100 coefficients at position 1 (PG) and 5 (C)
+BPM_COEFFS = {
+    "adj_pts": (0.860, 0.860),
+    "fga":     (-0.560, -0.780),
+    "fta":     (-0.246, -0.343),
+    "fg3m":    (0.389, 0.389),
+    "ast":     (0.580, 1.034),
+    "tov":     (-0.964, -0.964),
+    "oreb":    (0.613, 0.181),
+    "dreb":    (0.116, 0.181),
+    "stl":     (1.369, 1.008),
+    "blk":     (1.327, 0.703),
+    "pf":      (-0.367, -0.367),
+}
+BPM_POSITION = 3.0
+REPLACEMENT_BPM = -2.0
+SEASON_GAMES = 82
+
+def _div(a, b):
+    """a / b with 0 wherever b == 0 (no warnings, no NaN/inf)."""
+    a, b = np.broadcast_arrays(np.asarray(a, dtype=float), np.asarray(b, dtype=float))
+    return np.divide(a, b, out=np.zeros(a.shape), where=b != 0)
+
+def _points(df: pd.DataFrame) -> np.ndarray:
+    return 2 * df["fgm"].to_numpy(float) + df["fg3m"].to_numpy(float) + df["ftm"].to_numpy(float)
+
+def team_aggregates(season_totals: pd.DataFrame) -> pd.DataFrame:
+    """Team totals (TEAM_COLUMNS) summed from player season totals, indexed by team."""
+    teams = season_totals["team"].fillna("").to_numpy()
+    codes, index = pd.factorize(teams)
+    out = {}
+    for col in TEAM_COLUMNS:
+        values = _points(season_totals) if col == "pts" else season_totals[col].fillna(0).to_numpy(float)
+        out[col] = np.bincount(codes, weights=values, minlength=len(index))
+    return pd.DataFrame(out, index=pd.Index(index, name="team"))
+
+def _possessions(t: Dict[str, np.ndarray], o: Dict[str, np.ndarray]) -> np.ndarray:
+    """BBR team possession estimate, averaged over both sides of the ball."""
+    def side(a, b):
+        orb_pct = _div(a["oreb"], a["oreb"] + b["dreb"])
+        return a["fga"] + 0.4 * a["fta"] - 1.07 * orb_pct * (a["fga"] - a["fgm"]) + a["tov"]
+    return 0.5 * (side(t, o) + side(o, t))
+
+def league_context(teams: pd.DataFrame) -> Dict[str, float]:
+    """League-wide sums from a team context frame (rates are added by season_context())."""
+    lg = {c: float(teams[c].sum()) for c in TEAM_COLUMNS}
+    lg["games"] = float(teams["g"].sum()) if "g" in teams else lg["mp"] / 240
+    return lg
+
+def _team_arrays(teams: pd.DataFrame, lg: Dict[str, float]) -> Dict[str, np.ndarray]:
+    """Per-team arrays (own stats, opp_* stats, poss, pace, games, net rating)."""
+    t = {c: teams[c].fillna(0).to_numpy(float) for c in TEAM_COLUMNS}
+
+    # league-average opponent over the same number of plays when the pull had no opp stats
+    plays = t["fga"] - t["oreb"] + t["tov"] + 0.44 * t["fta"]
+    lg_plays = lg["fga"] - lg["oreb"] + lg["tov"] + 0.44 * lg["fta"]
+    o = {}
+    for c in OPP_COLUMNS + ["stl", "blk", "pf", "mp"]:
+        if f"opp_{c}" in teams:
+            o[c] = teams[f"opp_{c}"].fillna(0).to_numpy(float)
+        elif c == "mp":
+            o[c] = t["mp"]
+        else:
+            o[c] = plays * _div(lg[c], lg_plays)
+
+    poss = teams["poss"].fillna(0).to_numpy(float) if "poss" in teams else _possessions(t, o)
+    games = teams["g"].fillna(0).to_numpy(float) if "g" in teams else t["mp"] / 240
+    out = {**t, **{f"opp_{c}": v for c, v in o.items()}}
+    out["poss"] = poss
+    out["g"] = games
+    out["pace"] = 48 * _div(poss, t["mp"] / 5)
+    out["net_rtg"] = 100 * _div(t["pts"] - o["pts"], poss)
+    out["drtg"] = 100 * _div(o["pts"], poss)
+    return out
+
+def season_context(teams: pd.DataFrame):
+    """(league dict, per-team arrays) with possessions, pace and points per possession/game."""
+    lg = league_context(teams)
+    tm = _team_arrays(teams, lg)
+    lg["poss"] = float(tm["poss"].sum())
+    lg["pace"] = 48 * lg["poss"] / (lg["mp"] / 5) if lg["mp"] else 0.0
+    lg["ppp"] = lg["pts"] / lg["poss"] if lg["poss"] else 0.0
+    lg["ppg"] = lg["pts"] / lg["games"] if lg["games"] else 0.0
+    return lg, tm
+
+def compute_all_metrics(season_totals: pd.DataFrame,
+                        team_context: pd.DataFrame | None = None) -> pd.DataFrame:
     """
-    Return a PER Series aligned to season_totals.index.
-    Steps (simplified outline):
-      1) Compute uPER from counting stats (fg, 3pt, ft, tov, ast, trb, stl, blk, pf, …)
-      2) Adjust for pace/league factors (needs league-level aggregates)
-      3) Normalize so league-average PER = 15.00 (scale factor)
-    Reference: Basketball-Reference PER explainer + Hollinger notes.
+    Return a DataFrame aligned to season_totals.index with columns
+    ["PER","WS","WS/48","BPM","VORP"].
     """
-    # Simplified PER calculation (placeholder implementation)
-    # Full PER requires league-level context and complex formulas
-    df = season_totals.copy()
-    
-    # Basic per-minute efficiency 
-    df['pts_per_min'] = df['pts'] / df['mp'].replace(0, np.nan) if 'pts' in df else 0
-    df['ast_per_min'] = df['ast'] / df['mp'].replace(0, np.nan)
-    df['trb_per_min'] = df['trb'] / df['mp'].replace(0, np.nan)
-    df['stl_per_min'] = df['stl'] / df['mp'].replace(0, np.nan)
-    df['blk_per_min'] = df['blk'] / df['mp'].replace(0, np.nan)
-    df['tov_per_min'] = df['tov'] / df['mp'].replace(0, np.nan)
-    df['fg_miss_per_min'] = (df['fga'] - df['fgm']) / df['mp'].replace(0, np.nan)
-    
-    # Simplified efficiency calculation
-    uper = (
-        df['pts_per_min'] * 1.0 +
-        df['ast_per_min'] * 1.5 +
-        df['trb_per_min'] * 1.2 +
-        df['stl_per_min'] * 2.0 +
-        df['blk_per_min'] * 2.0 -
-        df['tov_per_min'] * 1.5 -
-        df['fg_miss_per_min'] * 0.5
-    ).fillna(0)
-    
-    # Normalize to league average = 15.0
-    league_avg = uper.mean() if uper.mean() > 0 else 1
-    per = (uper / league_avg) * 15.0
-    
-    return per.rename("PER")
+    teams = team_context if team_context is not None else team_aggregates(season_totals)
+    lg, tm_all = season_context(teams)
+
+    # broadcast team rows to players; unknown teams get a league-average team
+    idx = teams.index.get_indexer(season_totals["team"].fillna(""))
+    n = len(teams)
+    idx = np.where(idx < 0, n, idx)
+    tm = {k: np.append(v, v.mean() if n else 0.0)[idx] for k, v in tm_all.items()}
+
+    col = lambda c: season_totals[c].fillna(0).to_numpy(float)
+    mp, fga, fgm, fg3m = col("mp"), col("fga"), col("fgm"), col("fg3m")
+    fta, ftm, orb, drb = col("fta"), col("ftm"), col("oreb"), col("dreb")
+    trb, ast, stl, blk = col("trb"), col("ast"), col("stl"), col("blk")
+    tov, pf = col("tov"), col("pf")
+    pts = 2 * fgm + fg3m + ftm
+    min_share = _div(mp, tm["mp"] / 5)  # fraction of team minutes on the floor
+
+    # PER (Hollinger): unadjusted, pace-adjusted, scaled to league average 15
+    factor = 2 / 3 - _div(0.5 * _div(lg["ast"], lg["fgm"]), 2 * _div(lg["fgm"], lg["ftm"]))
+    vop = _div(lg["pts"], lg["fga"] - lg["oreb"] + lg["tov"] + 0.44 * lg["fta"])
+    drb_pct = _div(lg["trb"] - lg["oreb"], lg["trb"])
+    tm_ast_fg = _div(tm["ast"], tm["fgm"])
+    uper = _div(
+        fg3m
+        + (2 / 3) * ast
+        + (2 - factor * tm_ast_fg) * fgm
+        + ftm * 0.5 * (1 + (1 - tm_ast_fg) + (2 / 3) * tm_ast_fg)
+        - vop * tov
+        - vop * drb_pct * (fga - fgm)
+        - vop * 0.44 * (0.44 + 0.56 * drb_pct) * (fta - ftm)
+        + vop * (1 - drb_pct) * (trb - orb)
+        + vop * drb_pct * orb
+        + vop * stl
+        + vop * drb_pct * blk
+        - pf * (_div(lg["ftm"], lg["pf"]) - 0.44 * _div(lg["fta"], lg["pf"]) * vop),
+        mp,
+    )
+    aper = _div(lg["pace"], tm["pace"]) * uper
+    lg_aper = _div((aper * mp).sum(), mp.sum())
+    per = aper * _div(15.0, lg_aper)
+
+    # Offensive Win Shares: points produced vs. 0.92 * league points per possession
+    ft_pct = _div(ftm, fta)
+    tm_ft_pct = _div(tm["ftm"], tm["fta"])
+    tm_orb_pct = _div(tm["oreb"], tm["oreb"] + tm["opp_dreb"])
+    q_ast = (min_share * 1.14 * _div(tm["ast"] - ast, tm["fgm"])
+             + _div(_div(tm["ast"], tm["mp"]) * mp * 5 - ast, _div(tm["fgm"], tm["mp"]) * mp * 5 - fgm)
+             * (1 - min_share))
+    fg_share = 1 - 0.5 * _div(pts - ftm, 2 * fga) * q_ast
+    ast_share = 0.5 * _div((tm["pts"] - tm["ftm"]) - (pts - ftm), 2 * (tm["fga"] - fga))
+    tm_scoring_poss = tm["fgm"] + (1 - (1 - tm_ft_pct) ** 2) * tm["fta"] * 0.4
+    tm_play_pct = _div(tm_scoring_poss, tm["fga"] + tm["fta"] * 0.4 + tm["tov"])
+    tm_orb_weight = _div((1 - tm_orb_pct) * tm_play_pct,
+                         (1 - tm_orb_pct) * tm_play_pct + tm_orb_pct * (1 - tm_play_pct))
+    orb_keep = 1 - _div(tm["oreb"], tm_scoring_poss) * tm_orb_weight * tm_play_pct
+
+    sc_poss = ((fgm * fg_share + ast_share * ast + (1 - (1 - ft_pct) ** 2) * 0.4 * fta) * orb_keep
+               + orb * tm_orb_weight * tm_play_pct)
+    tot_poss = sc_poss + (fga - fgm) * (1 - 1.07 * tm_orb_pct) + (1 - ft_pct) ** 2 * 0.4 * fta + tov
+    pprod = ((2 * (fgm + 0.5 * fg3m) * fg_share
+              + 2 * _div(tm["fgm"] - fgm + 0.5 * (tm["fg3m"] - fg3m), tm["fgm"] - fgm) * ast_share * ast
+              + ftm) * orb_keep
+             + orb * tm_orb_weight * tm_play_pct * _div(tm["pts"], tm_scoring_poss))
+
+    marginal_ppw = 0.32 * lg["ppg"] * _div(tm["pace"], lg["pace"])
+    ows = _div(pprod - 0.92 * lg["ppp"] * tot_poss, marginal_ppw)
+
+    # Defensive Win Shares: individual defensive rating from stops (Oliver)
+    dor_pct = _div(tm["opp_oreb"], tm["opp_oreb"] + tm["dreb"])
+    dfg_pct = _div(tm["opp_fgm"], tm["opp_fga"])
+    fm_wt = _div(dfg_pct * (1 - dor_pct), dfg_pct * (1 - dor_pct) + (1 - dfg_pct) * dor_pct)
+    stops = (stl + blk * fm_wt * (1 - 1.07 * dor_pct) + drb * (1 - fm_wt)
+             + (_div(tm["opp_fga"] - tm["opp_fgm"] - tm["blk"], tm["mp"]) * fm_wt * (1 - 1.07 * dor_pct)
+                + _div(tm["opp_tov"] - tm["stl"], tm["mp"])) * mp
+             + _div(pf, tm["pf"]) * 0.4 * tm["opp_fta"] * (1 - _div(tm["opp_ftm"], tm["opp_fta"])) ** 2)
+    stop_pct = _div(stops * tm["opp_mp"], tm["poss"] * mp)
+    d_pts_per_sc_poss = _div(tm["opp_pts"], tm["opp_fgm"]
+                             + (1 - (1 - _div(tm["opp_ftm"], tm["opp_fta"])) ** 2) * tm["opp_fta"] * 0.4)
+    drtg = tm["drtg"] + 0.2 * (100 * d_pts_per_sc_poss * (1 - stop_pct) - tm["drtg"])
+    dws = _div(mp, tm["mp"]) * tm["poss"] * _div(1.08 * lg["ppp"] - drtg / 100, marginal_ppw)
+    dws = np.where(mp > 0, dws, 0.0)
+
+    ws = ows + dws
+    ws48 = _div(ws * 48, mp)
+
+    # BPM 2.0 box score: per-100 rates while on court, then team-adjusted so the
+    # minutes-weighted team sum matches the team's net rating
+    w = (BPM_POSITION - 1) / 4
+    coef = {k: lo + (hi - lo) * w for k, (lo, hi) in BPM_COEFFS.items()}
+    tsa = fga + 0.44 * fta
+    adj_pts = (_div(pts, tsa) - _div(lg["pts"], lg["fga"] + 0.44 * lg["fta"]) + 1) * tsa
+    on_court_poss = tm["poss"] * min_share
+    per100 = lambda x: 100 * _div(x, on_court_poss)
+    raw_bpm = (coef["adj_pts"] * per100(adj_pts) + coef["fga"] * per100(fga) + coef["fta"] * per100(fta)
+               + coef["fg3m"] * per100(fg3m) + coef["ast"] * per100(ast) + coef["tov"] * per100(tov)
+               + coef["oreb"] * per100(orb) + coef["dreb"] * per100(drb) + coef["stl"] * per100(stl)
+               + coef["blk"] * per100(blk) + coef["pf"] * per100(pf))
+
+    weighted = raw_bpm * min_share
+    team_sum = np.bincount(idx, weights=weighted, minlength=n + 1)[idx]
+    bpm = raw_bpm + (tm["net_rtg"] * 1.2 - team_sum) / 5
+    bpm = np.where(mp > 0, bpm, 0.0)
+
+    # VORP: points per 100 over replacement, scaled to share of team minutes and an 82-game season
+    vorp = (bpm - REPLACEMENT_BPM) * min_share * _div(tm["g"], SEASON_GAMES)
+
+    return pd.DataFrame({"PER": per, "WS": ws, "WS/48": ws48, "BPM": bpm, "VORP": vorp},
+                        index=season_totals.index)
+
+def compute_per(season_totals: pd.DataFrame,
+                team_context: pd.DataFrame | None = None) -> pd.Series:
+    """PER aligned to season_totals.index (see compute_all_metrics)."""
+    return compute_all_metrics(season_totals, team_context)["PER"]
 
 def compute_win_shares(season_totals: pd.DataFrame,
                        team_context: pd.DataFrame | None = None) -> pd.DataFrame:
-    """
-    Compute Win Shares (WS) and WS/48.
-    Outline:
-      - Offensive WS: based on offensive rating & possessions produced
-      - Defensive WS: based on defensive rating & team defense context
-      - WS = oWS + dWS; WS48 = WS * 48 / MP (guard MP==0)
-    Reference: BBR WS methodology.
-    Returns DataFrame with columns ["WS","WS/48"].
-    """
-    df = season_totals.copy()
-    
-    # Simplified Win Shares calculation
-    # True WS requires team and league context
-    
-    # Estimate possessions and efficiency
-    df['poss_used'] = df['fga'] - df['oreb'] + df['tov'] + 0.44 * df['fta']
-    df['pts_produced'] = df['fgm'] * 2 + df['fg3m'] + df['ftm']
-    
-    # Simple offensive contribution
-    df['off_efficiency'] = df['pts_produced'] / df['poss_used'].replace(0, np.nan)
-    league_off_avg = 1.1  # approximate
-    df['ows'] = ((df['off_efficiency'] - league_off_avg) * df['poss_used'] / 100).fillna(0)
-    
-    # Simple defensive contribution (based on defensive stats)
-    df['def_contribution'] = df['stl'] + df['blk'] + df['dreb'] * 0.2
-    df['dws'] = df['def_contribution'] / 100
-    
-    # Total Win Shares
-    ws = (df['ows'] + df['dws']).fillna(0).rename("WS")
-    ws48 = (ws * 48 / df['mp'].replace(0, np.nan)).fillna(0).rename("WS/48")
-    
-    return pd.DataFrame({"WS": ws, "WS/48": ws48})
+    """Columns ["WS","WS/48"] (see compute_all_metrics)."""
+    return compute_all_metrics(season_totals, team_context)[["WS", "WS/48"]]
 
 def compute_bmp_vorp(season_totals: pd.DataFrame,
                      league_context: pd.DataFrame | None = None) -> pd.DataFrame:
-    """
-    Compute BPM (v2.0) and VORP.
-    Outline:
-      - Fit/apply box-score regression with position & era adjustments
-      - VORP scales BPM by playing time vs replacement level (-2.0 BPM)
-    Reference: Sports-Reference BPM 2.0 explainer.
-    
-    Note: This is an approximate implementation. Full BPM 2.0 requires
-    proprietary regression coefficients and adjustments not publicly available.
-    """
-    df = season_totals.copy()
-    
-    # Calculate per-100-possession stats (simplified)
-    df['poss_est'] = df['fga'] - df['oreb'] + df['tov'] + 0.44 * df['fta']
-    df['poss_per_min'] = df['poss_est'] / df['mp'].replace(0, np.nan)
-    
-    # Scale to per-100 possessions
-    scale = 100 / (df['poss_per_min'] * df['mp']).replace(0, np.nan).fillna(1)
-    
-    # Basic box score stats per 100 possessions
-    df['ast_100'] = df['ast'] * scale
-    df['trb_100'] = df['trb'] * scale  
-    df['stl_100'] = df['stl'] * scale
-    df['blk_100'] = df['blk'] * scale
-    df['tov_100'] = df['tov'] * scale
-    df['pts_100'] = df['fgm'] * 2 + df['fg3m'] + df['ftm']
-    df['pts_100'] = df['pts_100'] * scale
-    
-    # Simplified BPM regression (approximate coefficients)
-    bmp = (
-        df['pts_100'] * 0.123 +
-        df['ast_100'] * 0.324 +
-        df['trb_100'] * 0.183 +
-        df['stl_100'] * 0.691 +
-        df['blk_100'] * 0.456 -
-        df['tov_100'] * 0.255
-    ).fillna(0)
-    
-    # Center around league average (0.0)
-    if bmp.std() > 0:
-        bmp = (bmp - bmp.mean())
-    
-    # VORP: (BPM - replacement level) * fraction of team possessions
-    replacement_level = -2.0
-    team_poss_per_game = 100  # approximate
-    games_in_season = 82
-    
-    vorp = ((bmp - replacement_level) * 
-           (df['mp'] / (games_in_season * 48)) * 
-           (games_in_season * team_poss_per_game / 100) / 30.5).fillna(0)
-    
-    return pd.DataFrame({"BPM": bmp.rename("BPM"), "VORP": vorp.rename("VORP")})
\ No newline at end of file
+    """Columns ["BPM","VORP"]; league_context is the per-team context frame (see compute_all_metrics)."""
+    return compute_all_metrics(season_totals, league_context)[["BPM", "VORP"]]
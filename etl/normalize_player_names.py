@@ -1,12 +1,35 @@
 #!/usr/bin/env python3
 """
 Normalize player names to handle accent/diacritic variations
+
+normalize_name() folds Latin characters through a translation table built
+once at import (lowercase, accents stripped, punctuation dropped) and is
+memoized, so the same few thousand names cost one dict lookup each. It is
+also registered as a SQLite function, so the whole players table is
+normalized by a single UPDATE inside the database.
 """
 
 import sqlite3
 import unicodedata
 import re
+from functools import lru_cache
+
+INDEX_DDL = "CREATE INDEX IF NOT EXISTS ix_players_normalized_name ON players (normalized_name)"
+
+# letters NFD doesn't decompose into base + combining mark
+_EXTRA_FOLDS = {"ß": "ss", "æ": "ae", "œ": "oe", "ø": "o", "đ": "d", "ð": "d", "ł": "l", "ı": "i", "þ": "th"}
+
+def _fold_char(c):
+    """Slow path for one character: lowercase, strip combining marks, keep [a-z0-9] and whitespace."""
+    c = c.lower()
+    c = _EXTRA_FOLDS.get(c, c)
+    c = ''.join(ch for ch in unicodedata.normalize('NFD', c) if unicodedata.category(ch) != 'Mn')
+    return ' ' if c.isspace() else re.sub(r'[^a-z0-9]', '', c)
+
+# ASCII through Latin Extended-B covers every name in the league's history
+_TRANSLATE = str.maketrans({chr(cp): _fold_char(chr(cp)) for cp in range(0x250)})
 
+@lru_cache(maxsize=65536)
 def normalize_name(name):
     """
     Normalize a player name by:
@@ -17,72 +40,64 @@ def normalize_name(name):
     """
     if not name:
         return ""
-    
-    # Convert to lowercase
-    normalized = name.lower()
-    
-    # Remove accents/diacritics using Unicode normalization
-    normalized = unicodedata.normalize('NFD', normalized)
-    normalized = ''.join(c for c in normalized if unicodedata.category(c) != 'Mn')
-    
-    # Remove non-alphanumeric characters except spaces
-    normalized = re.sub(r'[^a-z0-9\s]', '', normalized)
-    
-    # Remove extra whitespace and strip
-    normalized = ' '.join(normalized.split())
-    
-    return normalized
+    normalized = name.translate(_TRANSLATE)
+    if not normalized.isascii():
+        # outside the table (Greek, Cyrillic, ...): fold the leftovers one by one
+        normalized = ''.join(c if c.isascii() else _fold_char(c) for c in normalized)
+    return ' '.join(normalized.split())
 
-def update_normalized_names(db_path):
-    """Update all players with normalized names"""
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    # First, add the normalized_name column if it doesn't exist
+def register(conn):
+    """Make normalize_name(text) callable from SQL on this connection."""
+    conn.create_function("normalize_name", 1, normalize_name, deterministic=True)
+
+def ensure_normalized_column(conn):
+    """Add players.normalized_name and its index if missing."""
     try:
-        cursor.execute('ALTER TABLE players ADD COLUMN normalized_name TEXT')
+        conn.execute('ALTER TABLE players ADD COLUMN normalized_name TEXT')
         print("Added normalized_name column to players table")
     except sqlite3.OperationalError:
-        print("normalized_name column already exists")
-    
-    # Get all players
-    cursor.execute('SELECT player_id, full_name FROM players')
-    players = cursor.fetchall()
-    
-    print(f"Updating normalized names for {len(players)} players...")
-    
-    for player_id, full_name in players:
-        normalized = normalize_name(full_name)
-        cursor.execute(
-            'UPDATE players SET normalized_name = ? WHERE player_id = ?',
-            (normalized, player_id)
-        )
-    
-    conn.commit()
-    
+        pass
+    conn.execute(INDEX_DDL)
+
+def normalize_players(conn, only_missing=False):
+    """Recompute normalized_name in one UPDATE; returns the number of rows changed."""
+    register(conn)
+    where = "normalized_name IS NULL" if only_missing else "normalized_name IS NOT normalize_name(full_name)"
+    with conn:
+        cursor = conn.execute(f"UPDATE players SET normalized_name = normalize_name(full_name) WHERE {where}")
+    return cursor.rowcount
+
+def update_normalized_names(db_path):
+    """Update all players with normalized names"""
+    conn = sqlite3.connect(db_path)
+    ensure_normalized_column(conn)
+
+    players = conn.execute('SELECT COUNT(*) FROM players').fetchone()[0]
+    print(f"Updating normalized names for {players} players...")
+    changed = normalize_players(conn)
+    print(f"{changed} rows updated")
+
     # Count normalized name differences
-    cursor.execute('''
-        SELECT COUNT(*) 
-        FROM players 
+    diff_count = conn.execute('''
+        SELECT COUNT(*)
+        FROM players
         WHERE full_name != normalized_name
-    ''')
-    diff_count = cursor.fetchone()[0]
+    ''').fetchone()[0]
     print(f"\n{diff_count} players had names that needed normalization")
-    
+
     # Check for the specific Alperen case
-    cursor.execute('''
-        SELECT COUNT(*) 
-        FROM players 
+    alperen_count = conn.execute('''
+        SELECT COUNT(*)
+        FROM players
         WHERE full_name LIKE '%Alperen%' OR normalized_name LIKE '%alperen%'
-    ''')
-    alperen_count = cursor.fetchone()[0]
+    ''').fetchone()[0]
     if alperen_count > 0:
         print(f"Found {alperen_count} Alperen name variations")
-    
+
     conn.close()
-    return len(players)
+    return players
 
 if __name__ == "__main__":
     db_path = "../db/husseyquation.sqlite"
     count = update_normalized_names(db_path)
-    print(f"\nNormalized names updated for {count} players")
\ No newline at end of file
+    print(f"\nNormalized names updated for {count} players")
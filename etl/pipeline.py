@@ -1,4 +1,5 @@
 from __future__ import annotations
+import hashlib
 import pandas as pd
 import numpy as np
 
@@ -7,6 +8,17 @@ METRICS = ["PER","WS","WS/48","BPM","VORP"]
 def qualify(df: pd.DataFrame, min_minutes: int = 1000) -> pd.Series:
     return (df["mp"].fillna(0) >= min_minutes)
 
+def content_hash(totals: pd.DataFrame) -> str:
+    """
+    Stable hash of pulled season totals: same players + same numbers -> same hash,
+    regardless of row/column order or float noise past 4 decimals.
+    """
+    df = totals.copy()
+    df["nba_player_id"] = df["nba_player_id"].astype(str)
+    df = df.sort_values("nba_player_id")[sorted(df.columns)]
+    payload = df.to_csv(index=False, float_format="%.4f")
+    return "sha256:" + hashlib.sha256(payload.encode()).hexdigest()
+
 def dense_rank_desc(s: pd.Series) -> pd.Series:
     return s.rank(method="dense", ascending=False)
 
@@ -31,7 +43,10 @@ def with_trend(curr: pd.DataFrame, prev: pd.DataFrame | None) -> pd.DataFrame:
         curr["delta_14d"] = 0
         return curr
     prev_slim = prev[["nba_player_id","huss_rank"]].rename(columns={"huss_rank":"prev_rank"})
-    out = curr.merge(prev_slim, on="nba_player_id", how="left")
+    # ids read back from the DB are text; pulled ids may be ints
+    prev_rank = prev_slim.set_index(prev_slim["nba_player_id"].astype(str))["prev_rank"]
+    out = curr.copy()
+    out["prev_rank"] = out["nba_player_id"].astype(str).map(prev_rank)
     out["delta_1d"] = (out["prev_rank"] - out["huss_rank"]).fillna(0).astype(int)
     # You'll compute 7d/14d using snapshots table when wiring DB reads.
     out["delta_7d"] = 0
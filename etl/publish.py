@@ -0,0 +1,84 @@
+from __future__ import annotations
+import json
+import os
+import sqlite3
+from typing import Any, Dict
+import pandas as pd
+import requests
+import columnar
+
+# API endpoint told about each new snapshot (it pushes a Server-Sent Event to
+# open dashboards), e.g. http://localhost:8000/api/internal/snapshots/published
+API_PUBLISH_URL = os.getenv("API_PUBLISH_URL")
+PUBLISH_TOKEN = os.getenv("PUBLISH_TOKEN")
+# PostgreSQL the API serves from, if any; API workers LISTEN on NOTIFY_CHANNEL
+DATABASE_URL = os.getenv("DATABASE_URL")
+NOTIFY_CHANNEL = "huss_snapshots"
+
+def publish(conn: sqlite3.Connection, snapshot_id: int) -> None:
+    """
+    Everything that has to happen after a snapshot is committed to the DB
+    for readers to see it.
+    """
+    path = columnar.export_snapshot(conn, snapshot_id)
+    print(f"Published snapshot {snapshot_id} -> {path}")
+    path = columnar.write_store()
+    print(f"Store version {columnar.store_version()} -> {path}")
+    event = record_publish(conn, snapshot_id)
+    notify_postgres(event)
+    notify_api(event)
+
+def record_publish(conn: sqlite3.Connection, snapshot_id: int) -> Dict[str, Any]:
+    """Append to publish_log (SQLite readers watch it) and return the event."""
+    season, snapshot_date = conn.execute(
+        "SELECT season_id, snapshot_date FROM snapshots WHERE snapshot_id = ?", (snapshot_id,)
+    ).fetchone()
+    with conn:
+        conn.execute(
+            "INSERT INTO publish_log (season_id, snapshot_id, snapshot_date) VALUES (?, ?, ?)",
+            (season, snapshot_id, snapshot_date),
+        )
+    return {"season": season, "snapshot_id": snapshot_id, "snapshot_date": snapshot_date}
+
+def notify_postgres(event: Dict[str, Any]) -> None:
+    """NOTIFY listening API workers. Best effort, like notify_api."""
+    if not DATABASE_URL:
+        return
+    try:
+        import psycopg2
+        pg = psycopg2.connect(DATABASE_URL)
+        try:
+            pg.autocommit = True
+            with pg.cursor() as cur:
+                cur.execute("SELECT pg_notify(%s, %s)", (NOTIFY_CHANNEL, json.dumps(event)))
+        finally:
+            pg.close()
+        print(f"Sent {NOTIFY_CHANNEL} notification for snapshot {event['snapshot_id']}")
+    except Exception as e:
+        print(f"Could not notify PostgreSQL listeners of snapshot {event['snapshot_id']}: {e}")
+
+def notify_api(event: Dict[str, Any]) -> None:
+    """Tell the API a snapshot is live. Best effort: clients still see it on their next request."""
+    if not API_PUBLISH_URL:
+        return
+    snapshot_id = event["snapshot_id"]
+    try:
+        response = requests.post(
+            API_PUBLISH_URL,
+            json=event,
+            headers={"X-Publish-Token": PUBLISH_TOKEN or ""},
+            timeout=10,
+        )
+        response.raise_for_status()
+        print(f"Notified API of snapshot {snapshot_id} ({response.json().get('subscribers')} subscribers)")
+    except requests.RequestException as e:
+        print(f"Could not notify API of snapshot {snapshot_id}: {e}")
+
+
+def publish_windows(season: int, rankings: Dict[str, pd.DataFrame], as_of: str) -> None:
+    """Replace the season's rolling-window rankings (windows.rank_windows output)."""
+    for window, ranked in rankings.items():
+        if ranked.empty:
+            continue
+        path = columnar.write_window_files(ranked, season, window, as_of)
+        print(f"Published {window} window -> {path}")
@@ -1,29 +1,50 @@
 from __future__ import annotations
-from typing import List, Dict
+import os
+from typing import List, Dict, Optional, Tuple
 import pandas as pd
 from nba_api.stats.endpoints import leaguegamelog, boxscoretraditionalv3, boxscoreadvancedv3
-from time import sleep
+from nba_api.stats.library.http import NBAStatsHTTP
+import fetch
+from gamecache import GameCache
 
-def get_season_game_ids(season_end_year: int) -> List[str]:
+# e.g. http://127.0.0.1:8765/stats/{endpoint} to pull from a local replay.py stand-in
+if os.getenv("NBA_STATS_BASE_URL"):
+    NBAStatsHTTP.base_url = os.environ["NBA_STATS_BASE_URL"]
+
+STAT_COLUMNS = ["mp","fga","fgm","fg3a","fg3m","fta","ftm",
+                "oreb","dreb","trb","ast","stl","blk","tov","pf"]
+
+def get_season_games(season_end_year: int, date_from: Optional[str] = None) -> pd.DataFrame:
     """
-    Returns NBA.com GameIDs for a season (e.g., 2025 for 2024-25 season).
+    Returns one row per NBA.com game (GAME_ID, GAME_DATE) for a season
+    (e.g., 2025 for 2024-25 season), optionally only games on or after
+    date_from (YYYY-MM-DD).
     """
     season_str = f"{season_end_year-1}-{str(season_end_year)[-2:]}"
-    gl = leaguegamelog.LeagueGameLog(season=season_str, season_type_all_star="Regular Season")
+    date_from_nullable = pd.Timestamp(date_from).strftime("%m/%d/%Y") if date_from else ""
+    gl = leaguegamelog.LeagueGameLog(season=season_str, season_type_all_star="Regular Season",
+                                     date_from_nullable=date_from_nullable)
     df = gl.get_data_frames()[0]
-    # NBA GameIDs look like "00222xxxxx" for regular season
-    return df["GAME_ID"].dropna().astype(str).unique().tolist()
+    # NBA GameIDs look like "00222xxxxx" for regular season; the log has one row per team
+    games = df[["GAME_ID","GAME_DATE"]].dropna(subset=["GAME_ID"]).drop_duplicates("GAME_ID")
+    games["GAME_ID"] = games["GAME_ID"].astype(str)
+    return games.reset_index(drop=True)
+
+def get_season_game_ids(season_end_year: int) -> List[str]:
+    """
+    Returns NBA.com GameIDs for a season (e.g., 2025 for 2024-25 season).
+    """
+    return get_season_games(season_end_year)["GAME_ID"].tolist()
 
 def fetch_box_traditional(game_id: str) -> Dict[str, pd.DataFrame]:
     """
     Traditional per-game box (minutes, points, FGA, FTA, REB, AST, STL, BLK, TOV, PF, etc.).
     """
     resp = boxscoretraditionalv3.BoxScoreTraditionalV3(game_id=game_id)
-    frames = resp.get_data_frames()
-    # frames: [PlayerTraditional, TeamTraditional, ...] – rely on index order
+    # V3 data sets: PlayerStats, TeamStarterBenchStats, TeamStats – use the named ones
     return {
-        "player_trad": frames[0].copy(),
-        "team_trad": frames[1].copy()
+        "player_trad": resp.player_stats.get_data_frame(),
+        "team_trad": resp.team_stats.get_data_frame()
     }
 
 def fetch_box_advanced(game_id: str) -> Dict[str, pd.DataFrame]:
@@ -31,74 +52,203 @@ def fetch_box_advanced(game_id: str) -> Dict[str, pd.DataFrame]:
     Advanced per-game box (pace, ortg/drtg, usage, etc.).
     """
     resp = boxscoreadvancedv3.BoxScoreAdvancedV3(game_id=game_id)
-    frames = resp.get_data_frames()
     return {
-        "player_adv": frames[0].copy(),
-        "team_adv": frames[1].copy()
+        "player_adv": resp.player_stats.get_data_frame(),
+        "team_adv": resp.team_stats.get_data_frame()
     }
 
-def build_season_totals(season_end_year: int, throttle_sec: float = 0.6) -> pd.DataFrame:
+# Minimal rename/select of the V3 box score columns; keep only what metric calcs use
+PLAYER_KEEP = {
+    "gameId":"game_id",
+    "personId":"nba_player_id",
+    "player":"player",
+    "teamId":"nba_team_id",
+    "teamTricode":"team",
+    "minutes":"mp",
+    "fieldGoalsAttempted":"fga","fieldGoalsMade":"fgm",
+    "threePointersAttempted":"fg3a","threePointersMade":"fg3m",
+    "freeThrowsAttempted":"fta","freeThrowsMade":"ftm",
+    "reboundsOffensive":"oreb","reboundsDefensive":"dreb","reboundsTotal":"trb",
+    "assists":"ast","steals":"stl","blocks":"blk",
+    "turnovers":"tov","foulsPersonal":"pf",
+    # advanced
+    "pace":"pace","offensiveRating":"ortg","defensiveRating":"drtg","usagePercentage":"usg_pct"
+}
+
+# team box: same counting stats + points, and pace/possessions from the advanced box
+TEAM_KEEP = {
+    "gameId":"game_id",
+    "teamId":"nba_team_id",
+    "teamTricode":"team",
+    "minutes":"mp",
+    "fieldGoalsAttempted":"fga","fieldGoalsMade":"fgm",
+    "threePointersAttempted":"fg3a","threePointersMade":"fg3m",
+    "freeThrowsAttempted":"fta","freeThrowsMade":"ftm",
+    "reboundsOffensive":"oreb","reboundsDefensive":"dreb","reboundsTotal":"trb",
+    "assists":"ast","steals":"stl","blocks":"blk",
+    "turnovers":"tov","foulsPersonal":"pf","points":"pts",
+    "possessions":"poss","pace":"pace","offensiveRating":"ortg","defensiveRating":"drtg"
+}
+# advanced-box columns merged onto the traditional rows (the rest would collide)
+PLAYER_ADV = ["gameId","teamId","personId","pace","offensiveRating","defensiveRating","usagePercentage"]
+TEAM_ADV = ["gameId","teamId","possessions","pace","offensiveRating","defensiveRating"]
+TEAM_STAT_COLUMNS = STAT_COLUMNS + ["pts"]
+TEXT_COLUMNS = ["game_id","game_date","player","team","nba_player_id","nba_team_id"]
+
+def parse_min(x):
+    """Minutes as float; accepts mm:ss strings."""
+    if isinstance(x, str) and ":" in x:
+        m,s = x.split(":")
+        return int(m) + int(s)/60.0
+    return pd.to_numeric(x, errors="coerce")
+
+def _normalize(frames: List[pd.DataFrame], keep: Dict[str, str], game_dates: Dict[str, str],
+               strict: bool = True) -> pd.DataFrame:
+    if not frames:
+        return pd.DataFrame(columns=list(keep.values()) + ["game_date"])
+    all_games = pd.concat(frames, ignore_index=True).rename(columns=keep)
+    # strict: every column must be present; otherwise missing optional ones become NaN
+    df = (all_games[list(keep.values())] if strict else all_games.reindex(columns=list(keep.values()))).copy()
+    df["game_id"] = df["game_id"].astype(str)
+    df["game_date"] = pd.to_datetime(df["game_id"].map(game_dates))
+    # coerce numerics, handle mm:ss minutes
+    df["mp"] = df["mp"].apply(parse_min)
+    num_cols = [c for c in df.columns if c not in TEXT_COLUMNS]
+    df[num_cols] = df[num_cols].apply(pd.to_numeric, errors="coerce")
+    return df
+
+def fetch_season_rows(season_end_year: int, throttle_sec: float = fetch.MIN_DELAY_SEC,
+                      use_cache: bool = True) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """
-    Loops game_ids → joins traditional + advanced → aggregates to per-player season totals.
-    Returns DataFrame with counting stats needed for PER/WS/BPM/VORP.
+    Loops games → joins traditional + advanced → (player rows, team rows), one
+    normalized row per player/team per game (game_id, game_date, counting stats).
+    Team rows come from the same two box score calls, so context costs no extra fetches.
+
+    With use_cache, games already in the on-disk GameCache are not refetched:
+    only games dated on/after the last processed one (or the oldest missing one)
+    are discovered, and only their new IDs hit the box score endpoints.
     """
-    game_ids = get_season_game_ids(season_end_year)
-    rows = []
-    for gid in game_ids:
+    missing = fetch.MissingGames(season_end_year)
+    cache = GameCache(season_end_year) if use_cache else None
+    date_from = None
+    if cache is not None and cache.last_game_date:
+        date_from = min(d for d in [cache.last_game_date, missing.earliest_date()] if d)
+    games = get_season_games(season_end_year, date_from)
+    if cache is not None:
+        games = games[~games["GAME_ID"].isin(cache.game_ids)]
+    game_dates = dict(zip(games["GAME_ID"], games["GAME_DATE"]))
+    fetcher = fetch.Fetcher(min_delay=throttle_sec)
+    player_rows, team_rows, fetched = [], [], []
+    # games a previous run couldn't fetch go first
+    order = missing.first(games["GAME_ID"])
+    for i, gid in enumerate(order):
         try:
-            trad = fetch_box_traditional(gid)
-            adv  = fetch_box_advanced(gid)
-        except Exception:
-            # endpoints can hiccup; skip this game and continue
+            trad = fetcher.call(fetch_box_traditional, gid)
+            adv  = fetcher.call(fetch_box_advanced, gid)
+        except fetch.CircuitOpen as e:
+            # endpoint is down; leave it alone and let the next run pick these up first
+            for rest in order[i:]:
+                missing.record(rest, e, game_dates.get(rest))
+            print(f"Circuit open after {fetcher.consecutive_failures} failed requests; deferring {len(order) - i} games")
+            break
+        except fetch.FetchError as e:
+            missing.record(gid, e, game_dates.get(gid))
             continue
-        # join player-level traditional and advanced by PLAYER_ID / TEAM_ID
-        p = pd.merge(
-            trad["player_trad"],
-            adv["player_adv"],
-            on=["PLAYER_ID","TEAM_ID","GAME_ID"],
-            how="left",
-            suffixes=("_trad","_adv")
-        )
-        rows.append(p)
-        sleep(throttle_sec)  # be polite; endpoints are undocumented
-
-    all_games = pd.concat(rows, ignore_index=True) if rows else pd.DataFrame()
-    # Minimal rename/select; normalize minutes to integer, etc.
-    # Keep only columns needed for metric calcs; you'll refine as you implement metrics.
-    keep = {
-        "PLAYER_ID":"nba_player_id",
-        "PLAYER_NAME":"player",
-        "TEAM_ID":"nba_team_id",
-        "TEAM_ABBREVIATION":"team",
-        "MIN":"mp",
-        "FGA":"fga","FGM":"fgm",
-        "FG3A":"fg3a","FG3M":"fg3m",
-        "FTA":"fta","FTM":"ftm",
-        "OREB":"oreb","DREB":"dreb","REB":"trb",
-        "AST":"ast","STL":"stl","BLK":"blk",
-        "TOV":"tov","PF":"pf",
-        # advanced (examples; keep what you'll use)
-        "PACE":"pace","OFF_RATING":"ortg","DEF_RATING":"drtg","USG_PCT":"usg_pct"
-    }
-    df = all_games.rename(columns=keep)[list(keep.values())].copy()
-    # coerce numerics, handle mm:ss minutes
-    def parse_min(x):
-        if isinstance(x, str) and ":" in x:
-            m,s = x.split(":")
-            return int(m) + int(s)/60.0
-        return pd.to_numeric(x, errors="coerce")
+        missing.resolve(gid)
+        fetched.append(gid)
+        # join player-level traditional and advanced by personId / teamId
+        player_trad = trad["player_trad"]
+        player_trad["player"] = (player_trad["firstName"].fillna("") + " " + player_trad["familyName"].fillna("")).str.strip()
+        player_adv = adv["player_adv"]
+        player_rows.append(pd.merge(
+            player_trad,
+            player_adv[[c for c in PLAYER_ADV if c in player_adv.columns]],
+            on=["personId","teamId","gameId"],
+            how="left"
+        ))
+        # team-level: traditional counting stats + advanced pace/possessions/ratings
+        team_adv = adv["team_adv"]
+        team_rows.append(pd.merge(trad["team_trad"], team_adv[[c for c in TEAM_ADV if c in team_adv.columns]],
+                                  on=["teamId","gameId"], how="left"))
 
-    df["mp"] = df["mp"].apply(parse_min)
-    num_cols = [c for c in df.columns if c not in ["player","team","nba_player_id","nba_team_id"]]
-    df[num_cols] = df[num_cols].apply(pd.to_numeric, errors="coerce")
+    missing.save()
+    print(f"Fetched {len(player_rows)}/{len(order)} games "
+          f"({fetcher.stats['requests']} requests, {fetcher.stats['retries']} retries, "
+          f"{fetcher.stats['throttled']} throttled; {len(missing)} missing, final delay {fetcher.delay:.1f}s)")
+    players = _normalize(player_rows, PLAYER_KEEP, game_dates)
+    teams = _normalize(team_rows, TEAM_KEEP, game_dates, strict=False)
+    if cache is None:
+        return players, teams
+    return cache.append(players, teams, fetched)
+
+def fetch_game_rows(season_end_year: int, throttle_sec: float = fetch.MIN_DELAY_SEC) -> pd.DataFrame:
+    """
+    One normalized row per player per game (game_id, game_date, counting stats).
+    Input for season totals and rolling windows.
+    """
+    return fetch_season_rows(season_end_year, throttle_sec)[0]
 
+def aggregate_season_totals(game_rows: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per-player season totals from fetch_game_rows() output.
+    Returns DataFrame with counting stats needed for PER/WS/BPM/VORP.
+    """
     # aggregate to season totals by player
-    agg_map = {c:"sum" for c in ["mp","fga","fgm","fg3a","fg3m","fta","ftm",
-                                 "oreb","dreb","trb","ast","stl","blk","tov","pf"]}
+    agg_map = {c:"sum" for c in STAT_COLUMNS}
     # keep simple team context by most frequent team code
-    totals = df.groupby(["nba_player_id","player"]).agg(agg_map)
+    totals = game_rows.groupby(["nba_player_id","player"]).agg(agg_map)
     # attach a representative team (mode)
-    team_mode = df.groupby(["nba_player_id"])["team"].agg(lambda s: s.mode().iat[0] if not s.mode().empty else None)
+    team_mode = game_rows.groupby(["nba_player_id"])["team"].agg(lambda s: s.mode().iat[0] if not s.mode().empty else None)
     totals["team"] = team_mode
     totals = totals.reset_index()
-    return totals
\ No newline at end of file
+    return totals
+
+def aggregate_team_context(team_rows: pd.DataFrame, counted: Optional[pd.Series] = None) -> pd.DataFrame:
+    """
+    Per-team season context from fetch_season_rows() team rows, indexed by team
+    abbreviation: own totals, opp_* totals (the other side of each game), games,
+    possessions, pace and offensive/defensive rating. Shape expected by
+    metrics.compute_all_metrics(team_context=...).
+
+    counted (a boolean mask over team_rows) limits which team-games are
+    summed, e.g. each team's last N games for a rolling window; the opp_*
+    side still comes from every row, whether or not the opponent counts it.
+    """
+    if team_rows.empty:
+        return pd.DataFrame(columns=["g"] + TEAM_STAT_COLUMNS, index=pd.Index([], name="team"))
+
+    sides = team_rows[["game_id","nba_team_id","team"] + TEAM_STAT_COLUMNS + ["poss"]]
+    opp = sides.drop(columns=["team"]).rename(
+        columns={c: f"opp_{c}" for c in TEAM_STAT_COLUMNS + ["poss"]} | {"nba_team_id": "opp_team_id"}
+    )
+    if counted is not None:
+        sides = sides[counted]
+    games = sides.merge(opp, on="game_id")
+    games = games[games["nba_team_id"] != games["opp_team_id"]]
+
+    sum_cols = TEAM_STAT_COLUMNS + [f"opp_{c}" for c in TEAM_STAT_COLUMNS]
+    teams = games.groupby("team")[sum_cols].sum()
+    teams.insert(0, "g", games.groupby("team")["game_id"].nunique())
+    # possessions from the advanced box when every game has them; metrics estimates otherwise
+    if games["poss"].notna().all() and games["opp_poss"].notna().all():
+        teams["poss"] = 0.5 * (games.groupby("team")["poss"].sum() + games.groupby("team")["opp_poss"].sum())
+        teams["pace"] = 48 * teams["poss"] / (teams["mp"] / 5)
+        teams["ortg"] = 100 * teams["pts"] / teams["poss"]
+        teams["drtg"] = 100 * teams["opp_pts"] / teams["poss"]
+    return teams
+
+def build_season_context(season_end_year: int, throttle_sec: float = fetch.MIN_DELAY_SEC,
+                         use_cache: bool = True) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    One pass over the season's box scores → (player season totals, team context).
+    """
+    player_rows, team_rows = fetch_season_rows(season_end_year, throttle_sec, use_cache)
+    return aggregate_season_totals(player_rows), aggregate_team_context(team_rows)
+
+def build_season_totals(season_end_year: int, throttle_sec: float = fetch.MIN_DELAY_SEC,
+                        use_cache: bool = True) -> pd.DataFrame:
+    """
+    Loops game_ids → joins traditional + advanced → aggregates to per-player season totals.
+    Returns DataFrame with counting stats needed for PER/WS/BPM/VORP.
+    """
+    return build_season_context(season_end_year, throttle_sec, use_cache)[0]
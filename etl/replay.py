@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+Local record/replay stand-in for stats.nba.com, so the pull can be profiled
+and load-tested offline and reproducibly.
+
+It serves the three endpoints the ETL uses (LeagueGameLog,
+BoxScoreTraditionalV3, BoxScoreAdvancedV3) from fixture files, with optional
+latency and fault injection:
+
+    python replay.py synth --fixtures ../db/replay                 # synthetic season
+    python replay.py record --fixtures ../db/replay                # proxy + capture stats.nba.com
+    python replay.py serve --fixtures ../db/replay --latency-ms 80 --error-rate 0.02
+
+then point nba_api at it:
+
+    NBA_STATS_BASE_URL=http://127.0.0.1:8765/stats/{endpoint} ETL_MIN_DELAY_SEC=0 python backfill.py
+
+Fixtures are raw JSON bodies at <fixtures>/<endpoint>/<key>.json, keyed by
+GameID for box scores and by Season for the game log (served filtered by
+DateFrom/DateTo, so incremental pulls replay too). GET /_stats reports what
+the server has done.
+
+nba_api does not surface HTTP status codes, so injected 500s/429s reach the
+Fetcher as parse errors and exercise its retry path; dropped connections
+(--drop-rate) surface as ConnectionError and exercise the throttle path.
+"""
+
+from __future__ import annotations
+import argparse
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+import numpy as np
+
+REPLAY_DIR = os.getenv("ETL_REPLAY_DIR", "../db/replay")
+UPSTREAM = "https://stats.nba.com/stats"
+DEFAULT_PORT = 8765
+
+# query parameter that identifies a fixture; other endpoints are keyed by a hash of the query
+KEY_PARAMS = {
+    "leaguegamelog": "Season",
+    "boxscoretraditionalv3": "GameID",
+    "boxscoreadvancedv3": "GameID",
+}
+
+def fixture_key(endpoint: str, params: Dict[str, str]) -> str:
+    if endpoint in KEY_PARAMS:
+        return params.get(KEY_PARAMS[endpoint], "")
+    return hashlib.md5(urlencode(sorted(params.items())).encode()).hexdigest()
+
+class FixtureStore:
+    """Fixture bodies on disk, held in memory once read so replay cost stays out of the profile."""
+
+    def __init__(self, root: str = REPLAY_DIR):
+        self.root = root
+        self._bodies: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def path(self, endpoint: str, key: str) -> str:
+        return os.path.join(self.root, endpoint, f"{key}.json")
+
+    def get(self, endpoint: str, key: str) -> Optional[bytes]:
+        path = self.path(endpoint, key)
+        with self._lock:
+            if path not in self._bodies:
+                if not os.path.exists(path):
+                    return None
+                with open(path, "rb") as f:
+                    self._bodies[path] = f.read()
+            return self._bodies[path]
+
+    def put(self, endpoint: str, key: str, body: bytes) -> None:
+        path = self.path(endpoint, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".tmp", "wb") as f:
+            f.write(body)
+        os.replace(path + ".tmp", path)
+        with self._lock:
+            self._bodies[path] = body
+
+def filter_game_log(body: bytes, params: Dict[str, str]) -> bytes:
+    """Apply LeagueGameLog's DateFrom/DateTo (MM/DD/YYYY) to a full-season log."""
+    date_from, date_to = params.get("DateFrom"), params.get("DateTo")
+    if not date_from and not date_to:
+        return body
+    log = json.loads(body)
+    result = log["resultSets"][0]
+    col = result["headers"].index("GAME_DATE")
+    lo = datetime.strptime(date_from, "%m/%d/%Y").date().isoformat() if date_from else ""
+    hi = datetime.strptime(date_to, "%m/%d/%Y").date().isoformat() if date_to else "9999"
+    result["rowSet"] = [row for row in result["rowSet"] if lo <= row[col][:10] <= hi]
+    return json.dumps(log).encode()
+
+class ReplayServer:
+    """Threaded HTTP stand-in; use as a context manager to run it in the background."""
+
+    def __init__(self, fixtures: str = REPLAY_DIR, host: str = "127.0.0.1", port: int = DEFAULT_PORT,
+                 latency_ms: float = 0, jitter_ms: float = 0, error_rate: float = 0,
+                 throttle_rate: float = 0, drop_rate: float = 0,
+                 upstream: Optional[str] = None, seed: Optional[int] = None):
+        self.store = FixtureStore(fixtures)
+        self.latency = latency_ms / 1000.0
+        self.jitter = jitter_ms / 1000.0
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.drop_rate = drop_rate
+        self.upstream = upstream
+        self.random = random.Random(seed)
+        self.stats = {"requests": 0, "served": 0, "recorded": 0, "missing": 0,
+                      "errors": 0, "throttled": 0, "dropped": 0}
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.replay = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """Value for NBA_STATS_BASE_URL / NBAStatsHTTP.base_url."""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/stats/{{endpoint}}"
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def fault(self) -> Optional[str]:
+        """Injected delay, then which fault (if any) this request gets."""
+        with self._lock:
+            delay = self.latency + self.random.uniform(0, self.jitter)
+            roll = self.random.random()
+        if delay > 0:
+            time.sleep(delay)
+        for name, rate in (("dropped", self.drop_rate), ("throttled", self.throttle_rate),
+                           ("errors", self.error_rate)):
+            if roll < rate:
+                return name
+            roll -= rate
+        return None
+
+    def record(self, endpoint: str, params: Dict[str, str], key: str) -> Optional[bytes]:
+        import requests
+        from nba_api.stats.library.http import STATS_HEADERS
+
+        upstream_params = dict(params)
+        if endpoint == "leaguegamelog":
+            # capture the whole season; date windows are applied on replay
+            upstream_params.update(DateFrom="", DateTo="")
+        resp = requests.get(f"{self.upstream.rstrip('/')}/{endpoint}", params=sorted(upstream_params.items()),
+                            headers=STATS_HEADERS, timeout=30)
+        if resp.status_code != 200:
+            return None
+        self.store.put(endpoint, key, resp.content)
+        self.count("recorded")
+        return resp.content
+
+    def start(self) -> "ReplayServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "ReplayServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # headers and body go out as separate writes; without this, Nagle + delayed ACK adds ~40ms per request
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str = "application/json") -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        replay: ReplayServer = self.server.replay
+        url = urlparse(self.path)
+        if url.path == "/_stats":
+            return self._send(200, json.dumps(replay.stats).encode())
+
+        replay.count("requests")
+        endpoint = url.path.rstrip("/").rsplit("/", 1)[-1].lower()
+        params = dict(parse_qsl(url.query, keep_blank_values=True))
+
+        fault = replay.fault()
+        if fault:
+            replay.count(fault)
+            if fault == "dropped":
+                self.close_connection = True
+                return
+            if fault == "throttled":
+                return self._send(429, b"Too Many Requests", "text/plain")
+            return self._send(500, b'{"Message":"An error has occurred."}')
+
+        key = fixture_key(endpoint, params)
+        body = replay.store.get(endpoint, key)
+        if body is None and replay.upstream:
+            body = replay.record(endpoint, params, key)
+        if body is None:
+            replay.count("missing")
+            return self._send(404, json.dumps({"Message": f"no fixture for {endpoint} {key}"}).encode())
+        if endpoint == "leaguegamelog":
+            body = filter_game_log(body, params)
+        replay.count("served")
+        self._send(200, body)
+
+# Synthetic fixtures: a full season in the V2 (game log) and V3 (box score) response shapes
+
+TEAM_CODES = ["ATL","BOS","BKN","CHA","CHI","CLE","DAL","DEN","DET","GSW","HOU","IND","LAC","LAL","MEM",
+              "MIA","MIL","MIN","NOP","NYK","OKC","ORL","PHI","PHX","POR","SAC","SAS","TOR","UTA","WAS"]
+FIRST_TEAM_ID = 1610612737
+
+GAME_LOG_HEADERS = ["SEASON_ID","TEAM_ID","TEAM_ABBREVIATION","TEAM_NAME","GAME_ID","GAME_DATE","MATCHUP",
+                    "WL","MIN","FGM","FGA","FG_PCT","FG3M","FG3A","FG3_PCT","FTM","FTA","FT_PCT","OREB",
+                    "DREB","REB","AST","STL","BLK","TOV","PF","PTS","PLUS_MINUS","VIDEO_AVAILABLE"]
+
+# per-minute rates for an average player; each player gets a fixed skill multiplier
+RATES = {"fga": 0.33, "fta": 0.09, "oreb": 0.045, "dreb": 0.13, "ast": 0.09,
+         "stl": 0.03, "blk": 0.02, "tov": 0.05, "pf": 0.08}
+FG3_SHARE, FG_PCT, FG3_PCT, FT_PCT = 0.38, 0.49, 0.36, 0.78
+
+def _clock(seconds: int) -> str:
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+def _pct(made: int, att: int) -> float:
+    return round(made / att, 3) if att else 0.0
+
+def _traditional(s: Dict[str, int]) -> Dict[str, object]:
+    return {
+        "minutes": _clock(s["sec"]),
+        "fieldGoalsMade": s["fgm"], "fieldGoalsAttempted": s["fga"], "fieldGoalsPercentage": _pct(s["fgm"], s["fga"]),
+        "threePointersMade": s["fg3m"], "threePointersAttempted": s["fg3a"],
+        "threePointersPercentage": _pct(s["fg3m"], s["fg3a"]),
+        "freeThrowsMade": s["ftm"], "freeThrowsAttempted": s["fta"], "freeThrowsPercentage": _pct(s["ftm"], s["fta"]),
+        "reboundsOffensive": s["oreb"], "reboundsDefensive": s["dreb"], "reboundsTotal": s["oreb"] + s["dreb"],
+        "assists": s["ast"], "steals": s["stl"], "blocks": s["blk"], "turnovers": s["tov"],
+        "foulsPersonal": s["pf"], "points": s["pts"], "plusMinusPoints": s.get("pm", 0),
+    }
+
+def _possessions(s: Dict[str, int]) -> float:
+    return s["fga"] - s["oreb"] + s["tov"] + 0.44 * s["fta"]
+
+def _advanced(s: Dict[str, int], team_poss: float, opp_pts: int, team_sec: int) -> Dict[str, object]:
+    share = s["sec"] / team_sec if team_sec else 0.0
+    poss = team_poss * share * 5
+    pace = 48 * team_poss / (team_sec / 60 / 5) if team_sec else 0.0
+    ortg = round(100 * s["pts"] / poss, 1) if poss else 0.0
+    drtg = round(100 * opp_pts / team_poss, 1) if team_poss else 0.0
+    return {
+        "minutes": _clock(s["sec"]), "offensiveRating": ortg, "defensiveRating": drtg,
+        "netRating": round(ortg - drtg, 1), "usagePercentage": round(_possessions(s) / poss, 3) if poss else 0.0,
+        "pace": round(pace, 2), "possessions": round(poss), "estimatedPace": round(pace, 2),
+        "trueShootingPercentage": _pct(s["pts"], 2 * (s["fga"] + 0.44 * s["fta"])),
+        "effectiveFieldGoalPercentage": _pct(s["fgm"] + 0.5 * s["fg3m"], s["fga"]),
+    }
+
+def _team_box(rng: np.random.Generator, roster: np.ndarray, skill: np.ndarray) -> list:
+    """Per-player stat dicts for one team in one game; minutes sum to 240."""
+    n_play = min(len(roster), int(rng.integers(9, 12)))
+    weights = rng.gamma(6.0, 1.0 / (1 + 0.18 * np.arange(n_play)))
+    seconds = np.floor(240 * 60 * weights / weights.sum()).astype(int)
+    seconds[0] += 240 * 60 - seconds.sum()
+    rows = []
+    for j in range(n_play):
+        minutes, k = seconds[j] / 60, skill[j]
+        counts = {name: int(rng.poisson(rate * minutes * k)) for name, rate in RATES.items()}
+        fg3a = int(rng.binomial(counts["fga"], FG3_SHARE))
+        fg3m = int(rng.binomial(fg3a, FG3_PCT * min(k, 1.2)))
+        fg2m = int(rng.binomial(counts["fga"] - fg3a, FG_PCT * min(k, 1.2)))
+        ftm = int(rng.binomial(counts["fta"], FT_PCT))
+        rows.append({"person_id": int(roster[j]), "sec": int(seconds[j]), **counts,
+                     "fg3a": fg3a, "fg3m": fg3m, "fgm": fg2m + fg3m, "ftm": ftm,
+                     "pts": 2 * fg2m + 3 * fg3m + ftm})
+    return rows
+
+def _sum(rows: list) -> Dict[str, int]:
+    keys = ["sec","fga","fgm","fg3a","fg3m","fta","ftm","oreb","dreb","ast","stl","blk","tov","pf","pts"]
+    return {k: sum(r[k] for r in rows) for k in keys}
+
+def synthesize(root: str = REPLAY_DIR, season_end_year: int = 2025, games: int = 1230,
+               players_per_team: int = 15, seed: int = 0) -> int:
+    """Write a deterministic synthetic season of fixtures; returns the number of games."""
+    rng = np.random.default_rng(seed)
+    store = FixtureStore(root)
+    season = f"{season_end_year-1}-{str(season_end_year)[-2:]}"
+    n_teams = len(TEAM_CODES)
+    rosters = (np.arange(n_teams)[:, None] * 1000 + np.arange(players_per_team)[None, :]) + 1_000_000
+    skill = rng.lognormal(-0.1, 0.25, size=rosters.shape)
+    # roster order doubles as the rotation: better players play more
+    order = np.argsort(-skill, axis=1)
+    rosters = np.take_along_axis(rosters, order, axis=1)
+    skill = np.take_along_axis(skill, order, axis=1)
+
+    opening = date(season_end_year - 1, 10, 22)
+    per_day = max(1, n_teams // 4)
+    log_rows = []
+    for g in range(games):
+        gid = f"002{str(season_end_year - 1)[-2:]}{g + 1:05d}"
+        game_date = (opening + timedelta(days=g // per_day)).isoformat()
+        home, away = rng.choice(n_teams, size=2, replace=False)
+        sides = {}
+        for team_key, t in (("homeTeam", home), ("awayTeam", away)):
+            rows = _team_box(rng, rosters[t], skill[t])
+            sides[team_key] = (t, rows, _sum(rows))
+        poss = {k: 0.5 * (_possessions(sides["homeTeam"][2]) + _possessions(sides["awayTeam"][2])) for k in sides}
+        opp = {"homeTeam": "awayTeam", "awayTeam": "homeTeam"}
+
+        trad, adv = {}, {}
+        for team_key, (t, rows, total) in sides.items():
+            opp_total = sides[opp[team_key]][2]
+            total["pm"] = total["pts"] - opp_total["pts"]
+            code = TEAM_CODES[t]
+            meta = {"teamId": FIRST_TEAM_ID + int(t), "teamCity": code, "teamName": code,
+                    "teamTricode": code, "teamSlug": code.lower()}
+            trad_players, adv_players = [], []
+            for n, r in enumerate(rows):
+                pid = r["person_id"]
+                person = {"personId": pid, "firstName": "Synthetic", "familyName": f"Player {pid}",
+                          "nameI": f"S. Player {pid}", "playerSlug": f"synthetic-player-{pid}",
+                          "position": "", "comment": "", "jerseyNum": str(n)}
+                trad_players.append({**person, "statistics": _traditional(r)})
+                adv_players.append({**person, "statistics": _advanced(r, poss[team_key], opp_total["pts"], total["sec"])})
+            trad[team_key] = {**meta, "players": trad_players, "statistics": _traditional(total)}
+            team_adv = _advanced(total, poss[team_key], opp_total["pts"], total["sec"])
+            team_adv["possessions"] = round(poss[team_key])
+            adv[team_key] = {**meta, "players": adv_players, "statistics": team_adv}
+
+            tr = _traditional(total)
+            matchup = f"{code} vs. {TEAM_CODES[away]}" if team_key == "homeTeam" else f"{code} @ {TEAM_CODES[home]}"
+            log_rows.append([f"2{season_end_year - 1}", FIRST_TEAM_ID + int(t), code, code, gid, game_date, matchup,
+                             "W" if total["pm"] > 0 else "L", 240, tr["fieldGoalsMade"], tr["fieldGoalsAttempted"],
+                             tr["fieldGoalsPercentage"], tr["threePointersMade"], tr["threePointersAttempted"],
+                             tr["threePointersPercentage"], tr["freeThrowsMade"], tr["freeThrowsAttempted"],
+                             tr["freeThrowsPercentage"], tr["reboundsOffensive"], tr["reboundsDefensive"],
+                             tr["reboundsTotal"], tr["assists"], tr["steals"], tr["blocks"], tr["turnovers"],
+                             tr["foulsPersonal"], tr["points"], total["pm"], 1])
+
+        ids = {"gameId": gid, "homeTeamId": FIRST_TEAM_ID + int(home), "awayTeamId": FIRST_TEAM_ID + int(away)}
+        store.put("boxscoretraditionalv3", gid, json.dumps({"boxScoreTraditional": {**ids, **trad}}).encode())
+        store.put("boxscoreadvancedv3", gid, json.dumps({"boxScoreAdvanced": {**ids, **adv}}).encode())
+
+    game_log = {"resource": "leaguegamelog", "parameters": {"Season": season},
+                "resultSets": [{"name": "LeagueGameLog", "headers": GAME_LOG_HEADERS, "rowSet": log_rows}]}
+    store.put("leaguegamelog", season, json.dumps(game_log).encode())
+    return games
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("mode", choices=["serve", "record", "synth"])
+    parser.add_argument("--fixtures", default=REPLAY_DIR)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency-ms", type=float, default=0, help="added to every response")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="uniform extra latency on top")
+    parser.add_argument("--error-rate", type=float, default=0, help="fraction of requests answered 500")
+    parser.add_argument("--throttle-rate", type=float, default=0, help="fraction answered 429")
+    parser.add_argument("--drop-rate", type=float, default=0, help="fraction whose connection is closed unanswered")
+    parser.add_argument("--upstream", default=UPSTREAM, help="record mode: where to fetch missing fixtures")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--season", type=int, default=2025, help="synth mode: season end year")
+    parser.add_argument("--games", type=int, default=1230, help="synth mode: number of games")
+    parser.add_argument("--players-per-team", type=int, default=15, help="synth mode")
+    args = parser.parse_args()
+
+    if args.mode == "synth":
+        n = synthesize(args.fixtures, args.season, args.games, args.players_per_team, args.seed or 0)
+        print(f"Wrote {n} synthetic games for {args.season} to {args.fixtures}")
+        return
+
+    server = ReplayServer(args.fixtures, args.host, args.port, args.latency_ms, args.jitter_ms,
+                          args.error_rate, args.throttle_rate, args.drop_rate,
+                          upstream=args.upstream if args.mode == "record" else None, seed=args.seed)
+    print(f"Replaying {args.fixtures} ({args.mode}) at {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print(json.dumps(server.stats))
+
+if __name__ == "__main__":
+    main()
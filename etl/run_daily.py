@@ -2,36 +2,55 @@ from __future__ import annotations
 import os
 import pandas as pd
 from datetime import date
-from pull import build_season_totals
-from metrics import compute_per, compute_win_shares, compute_bmp_vorp
-from pipeline import qualify, compute_ranks_and_huss, with_trend
+from pull import fetch_season_rows, aggregate_season_totals, aggregate_team_context
+from metrics import compute_all_metrics
+from pipeline import qualify, compute_ranks_and_huss, with_trend, content_hash
+import store
+from publish import publish, publish_windows
+from windows import rank_windows
 
 ACTIVE_SEASON = int(os.getenv("ACTIVE_SEASON", "2025"))
 
 def main():
-    # 1) pull season totals from nba_api
-    totals = build_season_totals(ACTIVE_SEASON)
+    # 1) pull per-game player + team rows from nba_api; aggregate season totals and team context
+    game_rows, team_rows = fetch_season_rows(ACTIVE_SEASON)
+    totals = aggregate_season_totals(game_rows)
     if totals.empty:
         print("No data pulled; exiting.")
         return
 
-    # 2) compute metrics
-    per  = compute_per(totals)
-    wsdf = compute_win_shares(totals)
-    bmpdf= compute_bmp_vorp(totals)
+    # unchanged source data (off-day, All-Star break) -> nothing to recompute
+    source_hash = content_hash(totals)
+    conn = store.connect()
+    latest_id, latest_hash = store.latest_snapshot_hash(conn, ACTIVE_SEASON)
+    if latest_hash == source_hash:
+        store.touch_snapshot(conn, latest_id)
+        conn.close()
+        print(f"Season totals unchanged since snapshot {latest_id}; skipping.")
+        return
 
-    df = totals.join(per).join(wsdf).join(bmpdf)
+    # 2) compute all five metrics in one pass against the real team/league context
+    teams = aggregate_team_context(team_rows)
+    store.write_team_context(conn, ACTIVE_SEASON, teams)
+    df = totals.join(compute_all_metrics(totals, teams))
 
     # 3) qualification + ranks + composite
     df["qualified"] = qualify(df, min_minutes=1000)
     ranked = compute_ranks_and_huss(df)
 
-    # 4) TODO: read yesterday's snapshot from DB for trends
-    prev = pd.DataFrame()
+    # 4) read the previous snapshot (reconstructed if delta-stored) for trends
+    prev = store.latest_snapshot_ranks(conn, ACTIVE_SEASON)
     ranked = with_trend(ranked, prev)
 
-    # 5) TODO: upsert to Postgres (stats + ranks) within a transaction
-    # 6) print quick log (top 5)
+    # 5) write stats + ranks within a transaction (delta rows unless a keyframe is due)
+    snapshot_id = store.write_snapshot(conn, ACTIVE_SEASON, date.today().isoformat(), ranked, source_hash)
+
+    # 6) publish columnar copy for readers, plus rolling windows off the same game rows
+    publish(conn, snapshot_id)
+    publish_windows(ACTIVE_SEASON, rank_windows(game_rows, team_rows=team_rows), date.today().isoformat())
+    conn.close()
+
+    # 7) print quick log (top 5)
     top5 = ranked.sort_values("huss_rank").head(5)[["player","team","huss_rank","huss_score"]]
     print("Top 5 HussEyquation Rankings:")
     print(top5.to_string(index=False))
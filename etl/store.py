@@ -0,0 +1,358 @@
+from __future__ import annotations
+import os
+import sqlite3
+from typing import Dict, List, Optional, Tuple
+import pandas as pd
+
+import identity
+import leaderboards
+from normalize_player_names import register as register_normalize, INDEX_DDL as NORMALIZED_NAME_INDEX
+
+DATABASE_PATH = os.getenv("DATABASE_PATH", "../db/husseyquation.sqlite")
+
+# 'delta' stores a full keyframe every KEYFRAME_INTERVAL snapshots and only the
+# changed player rows in between; 'full' writes every row of every snapshot.
+SNAPSHOT_STORAGE = os.getenv("SNAPSHOT_STORAGE", "delta")
+KEYFRAME_INTERVAL = int(os.getenv("KEYFRAME_INTERVAL", "7"))
+
+STAT_COLUMNS = ["team_id", "g", "mp", "per", "ws", "ws48", "bpm", "vorp"]
+RANK_VALUE_COLUMNS = ["per_rank", "ws_rank", "ws48_rank", "bpm_rank", "vorp_rank",
+                      "huss_score", "huss_rank", "qualified"]
+# stored precision (matches db/schema.sql numeric scales); rows that only
+# differ beyond it count as unchanged for delta storage
+PRECISION = {"per": 2, "ws": 2, "ws48": 4, "bpm": 2, "vorp": 2, "huss_score": 3}
+
+# pipeline column -> player_snapshot_ranks / season_final_ranks column
+RANK_COLUMNS = {
+    "per_rank": "per_rank",
+    "ws_rank": "ws_rank",
+    "ws48_rank": "ws48_rank",
+    "bmp_rank": "bpm_rank",
+    "vorp_rank": "vorp_rank",
+}
+
+def connect(db_path: str = DATABASE_PATH) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA foreign_keys = ON")
+    create_tables(conn)
+    return conn
+
+def create_tables(conn: sqlite3.Connection) -> None:
+    """Create the ETL-owned tables that the CSV importers don't know about."""
+    register_normalize(conn)
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS season_final_ranks (
+            season_id INTEGER REFERENCES seasons(season_id),
+            player_id INTEGER REFERENCES players(player_id),
+            per_rank INTEGER,
+            ws_rank INTEGER,
+            ws48_rank INTEGER,
+            bpm_rank INTEGER,
+            vorp_rank INTEGER,
+            huss_score REAL,
+            huss_rank INTEGER,
+            qualified BOOLEAN DEFAULT 1,
+            PRIMARY KEY (season_id, player_id)
+        );
+
+        CREATE INDEX IF NOT EXISTS ix_final_player ON season_final_ranks (player_id, season_id);
+
+        CREATE TABLE IF NOT EXISTS team_season_context (
+            season_id INTEGER REFERENCES seasons(season_id),
+            team_id INTEGER REFERENCES teams(team_id),
+            g INTEGER,
+            pts INTEGER,
+            opp_pts INTEGER,
+            poss REAL,
+            pace REAL,
+            ortg REAL,
+            drtg REAL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (season_id, team_id)
+        );
+
+        -- one row per publish, written after the snapshot files are in place;
+        -- API workers poll for new rows (api/changes.py)
+        CREATE TABLE IF NOT EXISTS publish_log (
+            publish_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            season_id INTEGER REFERENCES seasons(season_id),
+            snapshot_id INTEGER REFERENCES snapshots(snapshot_id),
+            snapshot_date DATE,
+            published_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+    """)
+    for table, column in (
+        ("snapshots", "keyframe_id INTEGER"),  # NULL = self-contained snapshot (everything written before delta mode)
+        ("snapshots", "last_checked_at TIMESTAMP"),  # last run that found the source data unchanged
+        ("players", "normalized_name TEXT"),  # accent-folded name for cross-season matching
+    ):
+        try:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column}")
+        except sqlite3.OperationalError:
+            pass
+    conn.execute(NORMALIZED_NAME_INDEX)
+    # rows from importers that predate normalize-on-insert (index makes this a no-op scan)
+    conn.execute("UPDATE players SET normalized_name = normalize_name(full_name) WHERE normalized_name IS NULL")
+    conn.executescript("""
+        CREATE INDEX IF NOT EXISTS ix_stats_player ON player_snapshot_stats (player_id, snapshot_id);
+        CREATE INDEX IF NOT EXISTS ix_ranks_player ON player_snapshot_ranks (player_id, snapshot_id);
+
+        -- every snapshot of a keyframe chain up to and including snapshot_id
+        CREATE VIEW IF NOT EXISTS snapshot_chain AS
+        SELECT s.snapshot_id, c.snapshot_id AS member_id
+        FROM snapshots s
+        JOIN snapshots c
+          ON COALESCE(c.keyframe_id, c.snapshot_id) = COALESCE(s.keyframe_id, s.snapshot_id)
+         AND c.snapshot_id <= s.snapshot_id;
+
+        -- full per-snapshot rows: the newest row of each player within the chain
+        CREATE VIEW IF NOT EXISTS resolved_snapshot_stats AS
+        SELECT ch.snapshot_id, st.player_id, st.team_id, st.g, st.mp,
+               st.per, st.ws, st.ws48, st.bpm, st.vorp
+        FROM snapshot_chain ch
+        JOIN player_snapshot_stats st ON st.snapshot_id = ch.member_id
+        WHERE st.snapshot_id = (
+            SELECT MAX(x.snapshot_id) FROM snapshot_chain xc
+            JOIN player_snapshot_stats x ON x.snapshot_id = xc.member_id AND x.player_id = st.player_id
+            WHERE xc.snapshot_id = ch.snapshot_id
+        );
+
+        CREATE VIEW IF NOT EXISTS resolved_snapshot_ranks AS
+        SELECT ch.snapshot_id, r.player_id, r.per_rank, r.ws_rank, r.ws48_rank, r.bpm_rank,
+               r.vorp_rank, r.huss_score, r.huss_rank, r.qualified
+        FROM snapshot_chain ch
+        JOIN player_snapshot_ranks r ON r.snapshot_id = ch.member_id
+        WHERE r.snapshot_id = (
+            SELECT MAX(x.snapshot_id) FROM snapshot_chain xc
+            JOIN player_snapshot_ranks x ON x.snapshot_id = xc.member_id AND x.player_id = r.player_id
+            WHERE xc.snapshot_id = ch.snapshot_id
+        );
+    """)
+    identity.create_tables(conn)
+    leaderboards.create_tables(conn)
+    conn.commit()
+
+def ensure_season(conn: sqlite3.Connection, season_id: int, status: str = "historical") -> None:
+    conn.execute(
+        "INSERT OR IGNORE INTO seasons (season_id, status) VALUES (?, ?)",
+        (season_id, status),
+    )
+
+def ensure_team(conn: sqlite3.Connection, abbr: Optional[str]) -> Optional[int]:
+    if not abbr:
+        return None
+    conn.execute("INSERT OR IGNORE INTO teams (abbr) VALUES (?)", (abbr,))
+    return conn.execute("SELECT team_id FROM teams WHERE abbr = ?", (abbr,)).fetchone()[0]
+
+def ensure_players(conn: sqlite3.Connection, df: pd.DataFrame) -> Dict[str, int]:
+    """
+    Map every nba_player_id in df to players.player_id through the identity
+    resolver (so a player first imported from a CSV keeps their player_id),
+    inserting players nobody matches. Returns {nba_player_id: player_id}.
+    """
+    ids = df["nba_player_id"].astype(str).tolist()
+    names = df["player"].tolist() if "player" in df else [None] * len(ids)
+    positions = df["position"].tolist() if "position" in df else [None] * len(ids)
+
+    player_ids = identity.resolve_players(
+        conn, [name or pid for pid, name in zip(ids, names)], positions, nba_ids=ids
+    )
+    return dict(zip(ids, player_ids))
+
+def _rank_rows(ranked: pd.DataFrame, player_ids: Dict[str, int]) -> List[Tuple]:
+    rows = []
+    for rec in ranked.to_dict("records"):
+        player_id = player_ids.get(str(rec["nba_player_id"]))
+        if player_id is None:
+            continue
+        rows.append((
+            player_id,
+            *(int(rec[c]) if pd.notna(rec.get(c)) else None for c in RANK_COLUMNS),
+            float(rec["huss_score"]) if pd.notna(rec.get("huss_score")) else None,
+            int(rec["huss_rank"]) if pd.notna(rec.get("huss_rank")) else None,
+            bool(rec.get("qualified", True)),
+        ))
+    return rows
+
+def write_season_final(conn: sqlite3.Connection, season_id: int, ranked: pd.DataFrame) -> int:
+    """
+    Replace season_final_ranks for one season and fold the change into the
+    all-time leaderboards in the same transaction. Returns rows written.
+    """
+    ensure_season(conn, season_id)
+    player_ids = ensure_players(conn, ranked)
+    rows = _rank_rows(ranked, player_ids)
+
+    with conn:
+        leaderboards.apply_season_final(conn, season_id, [
+            (r[0], r[7], r[6], r[8]) for r in rows  # player_id, huss_rank, huss_score, qualified
+        ])
+        conn.execute("DELETE FROM season_final_ranks WHERE season_id = ?", (season_id,))
+        conn.executemany("""
+            INSERT INTO season_final_ranks
+            (season_id, player_id, per_rank, ws_rank, ws48_rank, bpm_rank, vorp_rank,
+             huss_score, huss_rank, qualified)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [(season_id, *r) for r in rows])
+    return len(rows)
+
+TEAM_CONTEXT_COLUMNS = ["g", "pts", "opp_pts", "poss", "pace", "ortg", "drtg"]
+
+def write_team_context(conn: sqlite3.Connection, season_id: int, teams: pd.DataFrame) -> int:
+    """Upsert pull.aggregate_team_context() output for one season. Returns rows written."""
+    ensure_season(conn, season_id)
+    rows = []
+    for abbr, rec in teams.reindex(columns=TEAM_CONTEXT_COLUMNS).iterrows():
+        team_id = ensure_team(conn, abbr)
+        if team_id is not None:
+            rows.append((season_id, team_id, *(_clean(rec[c]) for c in TEAM_CONTEXT_COLUMNS)))
+    with conn:
+        conn.executemany(f"""
+            INSERT INTO team_season_context (season_id, team_id, {", ".join(TEAM_CONTEXT_COLUMNS)})
+            VALUES (?, ?, {", ".join("?" * len(TEAM_CONTEXT_COLUMNS))})
+            ON CONFLICT (season_id, team_id) DO UPDATE SET
+            {", ".join(f"{c} = excluded.{c}" for c in TEAM_CONTEXT_COLUMNS)},
+            updated_at = CURRENT_TIMESTAMP
+        """, rows)
+    return len(rows)
+
+def latest_snapshot_id(conn: sqlite3.Connection, season_id: int) -> Optional[int]:
+    row = conn.execute("""
+        SELECT snapshot_id FROM snapshots
+        WHERE season_id = ?
+        ORDER BY snapshot_date DESC, snapshot_id DESC
+        LIMIT 1
+    """, (season_id,)).fetchone()
+    return row[0] if row else None
+
+def latest_snapshot_hash(conn: sqlite3.Connection, season_id: int) -> Tuple[Optional[int], Optional[str]]:
+    snapshot_id = latest_snapshot_id(conn, season_id)
+    if snapshot_id is None:
+        return None, None
+    row = conn.execute("SELECT source_hash FROM snapshots WHERE snapshot_id = ?", (snapshot_id,)).fetchone()
+    return snapshot_id, row[0]
+
+def touch_snapshot(conn: sqlite3.Connection, snapshot_id: int) -> None:
+    with conn:
+        conn.execute(
+            "UPDATE snapshots SET last_checked_at = CURRENT_TIMESTAMP WHERE snapshot_id = ?", (snapshot_id,)
+        )
+
+def latest_snapshot_ranks(conn: sqlite3.Connection, season_id: int) -> pd.DataFrame:
+    """Latest stored snapshot of a season in pipeline column names."""
+    return pd.read_sql_query("""
+        SELECT p.nba_player_id, p.full_name AS player,
+               r.per_rank, r.ws_rank, r.ws48_rank, r.bpm_rank AS bmp_rank, r.vorp_rank,
+               r.huss_score, r.huss_rank, r.qualified
+        FROM resolved_snapshot_ranks r
+        JOIN players p ON r.player_id = p.player_id
+        WHERE r.snapshot_id = ?
+    """, conn, params=(latest_snapshot_id(conn, season_id),))
+
+def _chain(conn: sqlite3.Connection, snapshot_id: int) -> Tuple[int, int]:
+    """(keyframe_id, chain length) of the snapshot's keyframe chain up to and including it."""
+    keyframe_id = conn.execute(
+        "SELECT COALESCE(keyframe_id, snapshot_id) FROM snapshots WHERE snapshot_id = ?", (snapshot_id,)
+    ).fetchone()[0]
+    length = conn.execute(
+        "SELECT COUNT(*) FROM snapshots WHERE COALESCE(keyframe_id, snapshot_id) = ? AND snapshot_id <= ?",
+        (keyframe_id, snapshot_id),
+    ).fetchone()[0]
+    return keyframe_id, length
+
+def _chain_rows(conn: sqlite3.Connection, table: str, columns: List[str], keyframe_id: int,
+                snapshot_id: int) -> Dict[int, Tuple]:
+    """
+    A snapshot's full rows, the same as its resolved_* view: the chain's
+    rows read once in snapshot order, newer rows replacing older ones.
+    """
+    rows: Dict[int, Tuple] = {}
+    for row in conn.execute(f"""
+        SELECT t.player_id, {", ".join("t." + c for c in columns)}
+        FROM snapshots c
+        JOIN {table} t ON t.snapshot_id = c.snapshot_id
+        WHERE COALESCE(c.keyframe_id, c.snapshot_id) = ? AND c.snapshot_id <= ?
+        ORDER BY t.snapshot_id
+    """, (keyframe_id, snapshot_id)):
+        rows[row[0]] = tuple(row[1:])
+    return rows
+
+def _clean(value, column: Optional[str] = None):
+    if hasattr(value, "item"):
+        value = value.item()
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return None
+    if isinstance(value, float) and column in PRECISION:
+        return round(value, PRECISION[column])
+    return value
+
+def _snapshot_rows(conn: sqlite3.Connection, ranked: pd.DataFrame) -> Tuple[Dict[int, Tuple], Dict[int, Tuple]]:
+    player_ids = ensure_players(conn, ranked)
+    team_ids = {abbr: ensure_team(conn, abbr) for abbr in ranked["team"].dropna().unique()} if "team" in ranked else {}
+
+    stats, ranks = {}, {}
+    for rec in ranked.to_dict("records"):
+        player_id = player_ids.get(str(rec["nba_player_id"]))
+        if player_id is None:
+            continue
+        mp = _clean(rec.get("mp"))
+        stats[player_id] = tuple(_clean(v, c) for c, v in zip(STAT_COLUMNS, (
+            team_ids.get(rec.get("team")), rec.get("g"), int(mp) if mp is not None else None,
+            rec.get("PER"), rec.get("WS"), rec.get("WS/48"), rec.get("BPM"), rec.get("VORP"),
+        )))
+        ranks[player_id] = tuple(_clean(v, c) for c, v in zip(RANK_VALUE_COLUMNS, (
+            *(int(rec[c]) if pd.notna(rec.get(c)) else None for c in RANK_COLUMNS),
+            rec.get("huss_score"),
+            int(rec["huss_rank"]) if pd.notna(rec.get("huss_rank")) else None,
+            int(bool(rec.get("qualified", True))),
+        )))
+    return stats, ranks
+
+def write_snapshot(conn: sqlite3.Connection, season_id: int, snapshot_date: str, ranked: pd.DataFrame,
+                   source_hash: Optional[str] = None, storage: str = SNAPSHOT_STORAGE) -> int:
+    """
+    Persist one daily snapshot (stats + ranks) in a single transaction.
+
+    In delta storage only the player rows that differ from the previous
+    snapshot's rows (its keyframe chain, read once) are written; the
+    resolved_* views (or latest_snapshot_ranks) rebuild the full snapshot on
+    read. A new keyframe
+    is started every KEYFRAME_INTERVAL snapshots, or whenever a player drops
+    out, since deltas can't express removals.
+    """
+    ensure_season(conn, season_id, status="active")
+    stats, ranks = _snapshot_rows(conn, ranked)
+
+    prev_id = latest_snapshot_id(conn, season_id) if storage == "delta" else None
+    prev_keyframe, chain_length = _chain(conn, prev_id) if prev_id is not None else (None, 0)
+    keyframe = prev_id is None or chain_length >= KEYFRAME_INTERVAL
+    if not keyframe:
+        prev_stats = _chain_rows(conn, "player_snapshot_stats", STAT_COLUMNS, prev_keyframe, prev_id)
+        prev_ranks = _chain_rows(conn, "player_snapshot_ranks", RANK_VALUE_COLUMNS, prev_keyframe, prev_id)
+        if set(prev_stats) - set(stats) or set(prev_ranks) - set(ranks):
+            keyframe = True
+        else:
+            stats = {pid: row for pid, row in stats.items() if prev_stats.get(pid) != row}
+            ranks = {pid: row for pid, row in ranks.items() if prev_ranks.get(pid) != row}
+
+    with conn:
+        cur = conn.execute(
+            "INSERT INTO snapshots (season_id, snapshot_date, source_hash) VALUES (?, ?, ?)",
+            (season_id, snapshot_date, source_hash),
+        )
+        snapshot_id = cur.lastrowid
+        keyframe_id = snapshot_id if keyframe else prev_keyframe
+        conn.execute("UPDATE snapshots SET keyframe_id = ? WHERE snapshot_id = ?", (keyframe_id, snapshot_id))
+
+        conn.executemany(f"""
+            INSERT INTO player_snapshot_stats (snapshot_id, player_id, {", ".join(STAT_COLUMNS)})
+            VALUES (?, ?, {", ".join("?" * len(STAT_COLUMNS))})
+        """, [(snapshot_id, pid, *row) for pid, row in stats.items()])
+        conn.executemany(f"""
+            INSERT INTO player_snapshot_ranks (snapshot_id, player_id, {", ".join(RANK_VALUE_COLUMNS)})
+            VALUES (?, ?, {", ".join("?" * len(RANK_VALUE_COLUMNS))})
+        """, [(snapshot_id, pid, *row) for pid, row in ranks.items()])
+
+    kind = "keyframe" if keyframe else "delta"
+    print(f"Snapshot {snapshot_id} ({kind}): {len(stats)} stat rows, {len(ranks)} rank rows written")
+    return snapshot_id
@@ -27,7 +27,7 @@ def test_alperen_database():
         print(f"  Season {season}: '{full_name}' -> '{normalized_name}' (Rank {rank})")
     
     # Test the normalized matching query manually
-    print("\nTesting normalized matching query:")
+    print("\nTesting person_id matching query:")
     cursor.execute('''
         SELECT 
             p2025.full_name as name_2025,
@@ -38,7 +38,7 @@ def test_alperen_database():
         FROM players p2025
         JOIN player_snapshot_ranks r2025 ON p2025.player_id = r2025.player_id
         JOIN snapshots s2025 ON r2025.snapshot_id = s2025.snapshot_id AND s2025.season_id = 2025
-        JOIN players p2024 ON p2025.normalized_name = p2024.normalized_name
+        JOIN players p2024 ON p2025.person_id = p2024.person_id
         JOIN player_snapshot_ranks r2024 ON p2024.player_id = r2024.player_id  
         JOIN snapshots s2024 ON r2024.snapshot_id = s2024.snapshot_id AND s2024.season_id = 2024
         WHERE p2025.normalized_name LIKE '%alperen%'
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Rolling-window rankings ("last 10 games", "last 30 days") from per-game rows.
+
+GameWindows sorts the season's player-game rows once by (player, date) and
+keeps a running prefix sum of every counting stat. The totals for any
+contiguous window are then prefix[end] - prefix[start] per player, so every
+window is a few vectorized lookups instead of a fresh groupby. The window
+totals have the same shape as pull.aggregate_season_totals(), so they feed
+straight into metrics.compute_all_metrics and pipeline.compute_ranks_and_huss.
+
+Given the season's team rows too, each window gets its own team context
+(pull.aggregate_team_context over each team's games in the window), so
+pace, possessions and team ratings match the stretch being ranked, as the
+season ranking uses the season's.
+"""
+
+from __future__ import annotations
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from metrics import compute_all_metrics
+from pipeline import qualify, compute_ranks_and_huss
+from pull import STAT_COLUMNS, aggregate_team_context
+
+# name -> window spec; "games" = each player's last N games, "days" = calendar days up to as_of
+WINDOWS = {
+    "last10": {"games": 10},
+    "last30d": {"days": 30},
+}
+
+# season-total qualification (1000 MP over 82 games), pro-rated to the window length
+SEASON_MIN_MINUTES = 1000
+SEASON_GAMES = 82
+
+class GameWindows:
+    def __init__(self, game_rows: pd.DataFrame, team_rows: Optional[pd.DataFrame] = None):
+        df = game_rows.sort_values(["nba_player_id", "game_date", "game_id"], kind="stable")
+        codes, self.players = pd.factorize(df["nba_player_id"])
+        self.codes = codes
+        self.days = df["game_date"].to_numpy("datetime64[D]").astype(np.int64)
+        self.names = df["player"].to_numpy()
+        self.teams = df["team"].to_numpy()
+
+        values = df[STAT_COLUMNS].fillna(0).to_numpy(float)
+        self.prefix = np.zeros((len(df) + 1, len(STAT_COLUMNS)))
+        np.cumsum(values, axis=0, out=self.prefix[1:])
+
+        # [start, stop) row range of each player (rows are grouped by player code)
+        player_range = np.arange(len(self.players))
+        self.start = np.searchsorted(codes, player_range, side="left")
+        self.stop = np.searchsorted(codes, player_range, side="right")
+        # (player, day) packed into one sortable key for date lookups
+        self._span = (self.days.max() - self.days.min() + 2) if len(df) else 1
+        self._base = self.days.min() if len(df) else 0
+        self.keys = codes.astype(np.int64) * self._span + (self.days - self._base)
+
+        self.team_rows = None
+        if team_rows is not None and len(team_rows):
+            self.team_rows = team_rows.sort_values(["team", "game_date", "game_id"], kind="stable").reset_index(drop=True)
+            self.team_days = self.team_rows["game_date"].to_numpy("datetime64[D]").astype(np.int64)
+
+    def _last_day(self, as_of: Optional[str]) -> int:
+        return int(np.datetime64(as_of, "D").astype(np.int64)) if as_of else int(self.days.max())
+
+    def _key(self, day: int) -> np.ndarray:
+        offset = np.clip(day - self._base, -1, self._span - 1)
+        return np.arange(len(self.players), dtype=np.int64) * self._span + offset
+
+    def totals(self, games: Optional[int] = None, days: Optional[int] = None,
+               as_of: Optional[str] = None) -> pd.DataFrame:
+        """Per-player totals over a window ending at as_of (default: latest game)."""
+        if not len(self.players):
+            return pd.DataFrame(columns=["nba_player_id", "player", *STAT_COLUMNS, "team", "games"])
+        last_day = self._last_day(as_of)
+
+        end = np.searchsorted(self.keys, self._key(last_day), side="right")
+        if games is not None:
+            begin = np.maximum(self.start, end - games)
+        elif days is not None:
+            begin = np.searchsorted(self.keys, self._key(last_day - days + 1), side="left")
+        else:
+            begin = self.start
+        begin = np.minimum(begin, end)
+
+        played = end - begin
+        mask = played > 0
+        sums = self.prefix[end[mask]] - self.prefix[begin[mask]]
+        last_row = end[mask] - 1
+
+        out = pd.DataFrame(sums, columns=STAT_COLUMNS)
+        out.insert(0, "player", self.names[last_row])
+        out.insert(0, "nba_player_id", self.players[mask])
+        out["team"] = self.teams[last_row]  # team of the most recent game in the window
+        out["games"] = played[mask]
+        return out
+
+    def team_context(self, games: Optional[int] = None, days: Optional[int] = None,
+                     as_of: Optional[str] = None) -> Optional[pd.DataFrame]:
+        """Team context over the same window as totals(); None without team rows (league defaults)."""
+        if self.team_rows is None or not len(self.players):
+            return None
+        last_day = self._last_day(as_of)
+        played = self.team_days <= last_day
+        rows = self.team_rows[played]
+        if games is not None:
+            # each team's last N games up to as_of
+            counted = rows.groupby("team").cumcount(ascending=False) < games
+        elif days is not None:
+            counted = pd.Series(self.team_days[played] > last_day - days, index=rows.index)
+        else:
+            counted = None
+        return aggregate_team_context(rows, counted)
+
+def rank_window(windows: GameWindows, spec: Dict[str, int], as_of: Optional[str] = None) -> pd.DataFrame:
+    """Metrics, qualification and HussEyquation ranks for one window."""
+    totals = windows.totals(spec.get("games"), spec.get("days"), as_of)
+    if totals.empty:
+        return totals
+    teams = windows.team_context(spec.get("games"), spec.get("days"), as_of)
+    df = totals.join(compute_all_metrics(totals, teams))
+    # pro-rate the season minutes bar to the window (longest team stretch in it)
+    window_games = int(df["games"].max())
+    df["qualified"] = qualify(df, min_minutes=SEASON_MIN_MINUTES * window_games / SEASON_GAMES)
+    return compute_ranks_and_huss(df)
+
+def rank_windows(game_rows: pd.DataFrame, windows: Dict[str, Dict[str, int]] = WINDOWS,
+                 as_of: Optional[str] = None, team_rows: Optional[pd.DataFrame] = None) -> Dict[str, pd.DataFrame]:
+    """Rank every window off a single prefix-sum build (team_rows: fetch_season_rows() team side)."""
+    game_windows = GameWindows(game_rows, team_rows)
+    return {name: rank_window(game_windows, spec, as_of) for name, spec in windows.items()}
+
+if __name__ == "__main__":
+    import os
+    from pull import fetch_season_rows
+
+    season = int(os.getenv("ACTIVE_SEASON", "2025"))
+    game_rows, team_rows = fetch_season_rows(season)
+    for name, ranked in rank_windows(game_rows, team_rows=team_rows).items():
+        print(f"Top 5 ({name}):")
+        print(ranked.sort_values("huss_rank").head(5)[["player","team","games","huss_rank","huss_score"]].to_string(index=False))
@@ -1,4 +1,8 @@
 import { NextRequest, NextResponse } from 'next/server'
+import type { IncomingMessage } from 'node:http'
+import { request as httpRequest } from 'node:http'
+import { request as httpsRequest } from 'node:https'
+import { Readable } from 'node:stream'
 
 export async function GET(request: NextRequest) {
   try {
@@ -41,4 +45,53 @@ export async function GET(request: NextRequest) {
       { status: 500 }
     )
   }
-}
\ No newline at end of file
+}
+// Several seasons/players in one round trip: forwards the JSON body to /api/batch
+// (see the API README for its shape) and streams the reply back untouched. fetch()
+// would decompress the gzip payload, so this goes through node:http(s) instead.
+export async function POST(request: NextRequest) {
+  try {
+    const baseApiUrl = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000'
+    const body = Buffer.from(await request.arrayBuffer())
+
+    const upstream = await new Promise<IncomingMessage>((resolve, reject) => {
+      const url = new URL('/api/batch', baseApiUrl)
+      const send = url.protocol === 'https:' ? httpsRequest : httpRequest
+      const req = send(url, {
+        method: 'POST',
+        headers: {
+          'Accept': 'application/json',
+          'Accept-Encoding': request.headers.get('accept-encoding') || 'identity',
+          'Content-Type': 'application/json',
+          'Content-Length': body.length,
+        },
+      }, resolve)
+      req.on('error', reject)
+      req.end(body)
+    })
+
+    // status (including 422 for requests over the batch limits), body and encoding as the API sent them
+    const headers = new Headers({
+      'Access-Control-Allow-Origin': '*',
+      'Access-Control-Allow-Methods': 'GET, POST',
+      'Access-Control-Allow-Headers': 'Content-Type',
+    })
+    for (const name of ['content-type', 'content-encoding', 'content-length', 'etag', 'vary']) {
+      const value = upstream.headers[name]
+      if (typeof value === 'string') {
+        headers.set(name, value)
+      }
+    }
+
+    return new NextResponse(Readable.toWeb(upstream) as ReadableStream<Uint8Array>, {
+      status: upstream.statusCode || 502,
+      headers,
+    })
+  } catch (error) {
+    console.error('Proxy API error:', error)
+    return NextResponse.json(
+      { error: 'Failed to fetch data from backend API' },
+      { status: 502 }
+    )
+  }
+}